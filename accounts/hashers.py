@@ -0,0 +1,100 @@
+"""
+Política de hash de contraseñas.
+
+El costo de PBKDF2 se toma de settings.PASSWORD_PBKDF2_ITERATIONS (el de
+PASSWORD_HASH_POLICY en PASSWORD_HASH_POLICIES, o fijado a mano). Como
+`must_update` compara las iteraciones del hash guardado con las
+configuradas, un login correcto vuelve a hashear la contraseña tanto si la
+política subió el costo como si lo bajó, y también si el hash es de otro
+algoritmo de PASSWORD_HASHERS (ver User.check_password).
+
+Sin la contraseña en claro no hay forma de rehashear antes del login:
+`audit` (comando audit_password_hashes) solo identifica las cuentas con hash
+desactualizado y `sync_password_hash` corrige la columna duplicada
+`password_hash` en bloque.
+
+Solo se usan variantes de PBKDF2: la columna `password_hash` admite 100
+caracteres y un hash de scrypt no entra.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    PBKDF2SHA1PasswordHasher,
+    get_hasher,
+    identify_hasher,
+    is_password_usable,
+)
+from django.db.models import F
+
+
+class PolicyPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 con las iteraciones de la política (mismo prefijo que el de Django)."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class PolicyPBKDF2SHA1PasswordHasher(PBKDF2SHA1PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+def describe(encoded):
+    """(algoritmo, costo) de un hash; ('inutilizable', None) o ('desconocido', None) si no aplica."""
+    if not encoded or not is_password_usable(encoded):
+        return "inutilizable", None
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return "desconocido", None
+    decoded = hasher.decode(encoded)
+    return hasher.algorithm, decoded.get("iterations") or decoded.get("work_factor")
+
+
+def is_outdated(encoded):
+    """True si el hash no es del hasher preferido o no tiene el costo configurado."""
+    if not encoded or not is_password_usable(encoded):
+        return False
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = get_hasher("default")
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+# ===== auditoría =====
+
+class Audit:
+    """Conteos de una pasada sobre los usuarios."""
+
+    def __init__(self):
+        self.total = 0
+        self.by_hash = Counter()  # (algoritmo, costo) -> usuarios
+        self.outdated = []        # usernames con hash de otro algoritmo o costo
+        self.drift = 0            # password_hash distinto de password
+
+
+def audit(users, chunk_size=2000):
+    """Recorre `users` (queryset de User) leyendo solo las columnas de contraseña."""
+    report = Audit()
+    rows = users.order_by().values_list("username", "password", "password_hash")
+    # identify_hasher/must_update cuestan microsegundos: no se verifica ninguna contraseña
+    for username, password, password_hash in rows.iterator(chunk_size=chunk_size):
+        report.total += 1
+        report.by_hash[describe(password)] += 1
+        if is_outdated(password):
+            report.outdated.append(username)
+        if password_hash != password:
+            report.drift += 1
+    return report
+
+
+def sync_password_hash(users):
+    """Copia `password` en `password_hash` donde difieren, con un solo UPDATE."""
+    return users.exclude(password_hash=F("password")).update(password_hash=F("password"))
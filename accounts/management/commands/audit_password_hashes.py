@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts import hashers
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Cuenta los hashes de contraseña por algoritmo y costo, identifica las cuentas con un hash "
+        "distinto de la política configurada (se actualizan en su próximo login) y, con --sync, "
+        "corrige password_hash donde no coincide con password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--list", action="store_true",
+                            help="Muestra los usernames con hash desactualizado.")
+        parser.add_argument("--sync", action="store_true",
+                            help="Copia password en password_hash donde difieren (un solo UPDATE).")
+        parser.add_argument("--chunk-size", type=int, default=2000,
+                            help="Filas por lectura (default: 2000).")
+
+    def handle(self, *args, **options):
+        report = hashers.audit(User.objects.all(), chunk_size=options["chunk_size"])
+
+        self.stdout.write(f"Política: {settings.PASSWORD_HASH_POLICY} "
+                          f"({settings.PASSWORD_PBKDF2_ITERATIONS} iteraciones)")
+        for (algorithm, cost), count in report.by_hash.most_common():
+            self.stdout.write(f"  {algorithm:<16} {cost if cost is not None else '-':>10}  {count} usuarios")
+
+        style = self.style.WARNING if report.outdated else self.style.SUCCESS
+        self.stdout.write(style(f"{len(report.outdated)} de {report.total} usuarios con hash desactualizado"))
+        if options["list"]:
+            for username in report.outdated:
+                self.stdout.write(f"  {username}")
+
+        if options["sync"]:
+            updated = hashers.sync_password_hash(User.objects.all())
+            self.stdout.write(self.style.SUCCESS(f"[OK] password_hash corregido en {updated} usuarios"))
+        elif report.drift:
+            self.stdout.write(self.style.WARNING(
+                f"{report.drift} usuarios con password_hash distinto de password (usar --sync)"))
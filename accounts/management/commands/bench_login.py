@@ -0,0 +1,98 @@
+import os
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+
+BENCH_PASSWORD = "bench-login-Passw0rd"
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide logins por segundo por núcleo con cada política de hash (PASSWORD_HASH_POLICIES). "
+        "Por defecto mide solo la verificación de la contraseña; con --username mide el POST "
+        "completo a la vista de login con ese usuario, dentro de una transacción que se revierte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--policies", default=",".join(settings.PASSWORD_HASH_POLICIES),
+                            help="Políticas a comparar, separadas por coma (default: todas).")
+        parser.add_argument("--logins", type=int, default=20,
+                            help="Logins medidos por política (default: 20).")
+        parser.add_argument("--username",
+                            help="Usuario existente para medir la vista completa. Su contraseña se "
+                                 "cambia solo dentro de la transacción de prueba.")
+
+    def handle(self, *args, **options):
+        policies = [name.strip() for name in options["policies"].split(",") if name.strip()]
+        unknown = set(policies) - set(settings.PASSWORD_HASH_POLICIES)
+        if unknown:
+            raise CommandError(f"Políticas desconocidas: {', '.join(sorted(unknown))}.")
+        if options["username"] and not User.objects.filter(pk=options["username"]).exists():
+            raise CommandError(f"No existe el usuario '{options['username']}'.")
+
+        rows = []
+        for policy in policies:
+            iterations = settings.PASSWORD_HASH_POLICIES[policy]
+            with override_settings(PASSWORD_HASH_POLICY=policy, PASSWORD_PBKDF2_ITERATIONS=iterations):
+                if options["username"]:
+                    latencies, queries = self._view_latencies(options["username"], options["logins"])
+                else:
+                    latencies, queries = self._hash_latencies(options["logins"]), None
+            median = statistics.median(latencies)
+            rows.append((policy, iterations, median, max(latencies), 1000 / median, queries))
+
+        cores = os.cpu_count() or 1
+        self.stdout.write(f"{'política':<10}{'iteraciones':>13}{'p50 ms':>10}{'máx ms':>10}"
+                          f"{'logins/s/núcleo':>17}{f'logins/s ({cores} núcleos)':>24}{'consultas':>11}")
+        for policy, iterations, median, worst, rate, queries in rows:
+            self.stdout.write(f"{policy:<10}{iterations:>13}{median:>10.1f}{worst:>10.1f}"
+                              f"{rate:>17.1f}{rate * cores:>24.0f}{queries if queries is not None else '-':>11}")
+        if not options["username"]:
+            self.stdout.write("Solo verificación de contraseña; usar --username para el request completo.")
+
+    def _hash_latencies(self, logins):
+        encoded = make_password(BENCH_PASSWORD)
+        latencies = []
+        for _ in range(logins):
+            began = time.perf_counter()
+            if not check_password(BENCH_PASSWORD, encoded):
+                raise CommandError("La verificación de la contraseña de prueba falló.")
+            latencies.append((time.perf_counter() - began) * 1000)
+        return latencies
+
+    def _view_latencies(self, username, logins):
+        """POST /accounts/login/ con un cliente nuevo por login; nada queda guardado."""
+        url = reverse("login")
+        latencies = []
+        queries = 0
+        try:
+            with transaction.atomic():
+                user = User.objects.get(pk=username)
+                user.set_password(BENCH_PASSWORD)  # ya con el costo de la política: sin rehash al medir
+                user.save()
+                for _ in range(logins):
+                    client = Client(SERVER_NAME="localhost")
+                    with CaptureQueriesContext(connection) as captured:
+                        began = time.perf_counter()
+                        response = client.post(url, {"username": username, "password": BENCH_PASSWORD})
+                        latencies.append((time.perf_counter() - began) * 1000)
+                    if response.status_code != 302:
+                        raise CommandError(f"El login de '{username}' no redirigió ({response.status_code}).")
+                    queries = len(captured)
+                raise _Rollback
+        except _Rollback:
+            pass
+        return latencies, queries
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import provisioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea usuarios en bloque desde un CSV/JSON (username, password, role, id, first_name, "
+        "last_name, email, birth_date, birth_place, campus y, para empleados/admins, "
+        "contract_type, employee_type, faculty). Hashea las contraseñas en paralelo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Archivo .csv o .json con una fila por usuario.")
+        parser.add_argument("--workers", type=int,
+                            help="Procesos para hashear contraseñas (default: todos los núcleos).")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Usuarios por transacción (default: 1000).")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Valida y hashea sin escribir en la base.")
+
+    def handle(self, *args, **options):
+        try:
+            report = provisioning.provision(
+                options["path"],
+                workers=options["workers"],
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+        except (provisioning.ProvisionError, OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for stage in report.stages:
+            self.stdout.write(
+                f"{stage.name}: {stage.rows} filas en {stage.seconds:.2f}s ({stage.rate:.1f} filas/s)")
+        for message in report.errors[:provisioning.MAX_REPORTED_ERRORS]:
+            self.stderr.write(message)
+        if len(report.errors) > provisioning.MAX_REPORTED_ERRORS:
+            self.stderr.write(f"... y {len(report.errors) - provisioning.MAX_REPORTED_ERRORS} errores más")
+
+        style = self.style.SUCCESS if not report.errors else self.style.WARNING
+        self.stdout.write(style(
+            f"[OK] {report.created} creados, {report.skipped} ya existían, {len(report.errors)} con errores"))
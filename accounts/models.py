@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.auth.hashers import check_password, identify_hasher, is_password_usable
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 
 from locations.models import Faculty, Area
@@ -64,11 +65,40 @@ class User(AbstractBaseUser, PermissionsMixin):
         Sobrescribe el campo password_hash con el hash real
         de Django para mantener compatibilidad con el sistema
         y con el nombre de columna original del SQL.
+
+        Solo se hashea si `password` no es ya un hash de algún hasher
+        configurado (no únicamente PBKDF2); así no se re-hashea lo que
+        set_password o provision_users ya calcularon.
         """
-        if self.password and not self.password.startswith('pbkdf2_'):
-            self.set_password(self.password)
+        if self.password and is_password_usable(self.password):
+            try:
+                identify_hasher(self.password)
+            except ValueError:
+                self.set_password(self.password)
+        if self.password:
             self.password_hash = self.password  # sincroniza
         super().save(*args, **kwargs)
+
+    def check_password(self, raw_password):
+        """
+        Como el de Django, pero si el hash está desactualizado respecto de la
+        política (ver accounts/hashers.py) el nuevo se guarda en `password` y
+        `password_hash` con un único UPDATE. Los logins con el hash al día no
+        escriben nada.
+        """
+        def setter(raw_password):
+            self.set_password(raw_password)
+            self._password = None
+            self.password_hash = self.password
+            self.save(update_fields=["password", "password_hash"])
+
+        return check_password(raw_password, self.password, setter)
+
+
+# Lookup desde User a la facultad de un estudiante: la de los programas de los
+# grupos en que está inscrito (puede ser más de una). Lo usan todas las
+# funciones que filtran o agrupan usuarios por facultad.
+STUDENT_FACULTY = 'student__enrollment__group__subject__program__area__faculty_id'
     
 class Student(models.Model):
     id = models.CharField(max_length=15, primary_key=True)
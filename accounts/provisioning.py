@@ -0,0 +1,335 @@
+"""
+Alta masiva de usuarios (un semestre de estudiantes, la planta docente).
+
+Etapas:
+1. Lectura y validación: las filas se convierten en Student/Employee/User
+   sin escribir en la base; las claves foráneas (ciudad, sede, facultad, tipos) se
+   validan con una consulta por tabla, no por fila. Los usernames e ids de
+   persona que ya existen se descartan aquí, antes de pagar el hash.
+2. Hash de contraseñas en un ProcessPoolExecutor con todos los núcleos. El
+   hash es lo caro (PBKDF2 con cientos de miles de iteraciones); el resto es
+   I/O.
+3. Inserción por lotes: en cada transacción se crean primero los
+   Student/Employee y luego los User que apuntan a ellos con bulk_create.
+   Cada User tiene exactamente una persona, como exige USERS_ONE_ROLE_CHK,
+   y bulk_create no pasa por User.save(), así que no se vuelve a hashear.
+   Tampoco emite post_save: los contadores de fitness/counters.py se
+   actualizan con un $inc por lote confirmado.
+
+Cada etapa reporta su duración y filas por segundo.
+"""
+
+import csv
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connections, transaction
+
+from accounts.models import Employee, Student, User
+from humanResources.models import ContractType, EmployeeType
+from locations.models import Campus, City, Faculty
+
+ROLES = ("STUDENT", "EMPLOYEE", "ADMIN")
+HASH_CHUNK_SIZE = 32
+MAX_REPORTED_ERRORS = 20
+
+logger = logging.getLogger(__name__)
+
+# columna de entrada -> (modelo referenciado, atributo en Student/Employee)
+REFERENCES = {
+    "birth_place": (City, "birth_place_id"),
+    "campus": (Campus, "campus_id"),
+    "faculty": (Faculty, "faculty_id"),
+    "contract_type": (ContractType, "contract_type_id"),
+    "employee_type": (EmployeeType, "employee_type_id"),
+}
+STUDENT_FIELDS = ("id", "first_name", "last_name", "email", "birth_date", "birth_place", "campus")
+EMPLOYEE_FIELDS = ("id", "first_name", "last_name", "email", "contract_type", "employee_type",
+                   "faculty", "campus", "birth_place")
+
+
+class ProvisionError(Exception):
+    """Archivo de entrada ilegible."""
+
+
+class Stage:
+    """Duración y throughput de una etapa."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.monotonic() - self._started
+
+    @property
+    def rate(self):
+        return self.rows / self.seconds if self.seconds else float(self.rows)
+
+
+class Report:
+    def __init__(self):
+        self.stages = []
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    def stage(self, name):
+        stage = Stage(name)
+        self.stages.append(stage)
+        return stage
+
+    def error(self, message):
+        self.errors.append(message)
+
+
+# ===== lectura =====
+
+def read_rows(path):
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ProvisionError(f"{path}: se esperaba una lista de objetos.")
+        return data
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def _person(model, fields, row):
+    values = {}
+    for field in fields:
+        value = row.get(field)
+        if field in REFERENCES:
+            values[REFERENCES[field][1]] = value
+        elif field == "birth_date":
+            values[field] = date.fromisoformat(value) if value else None
+        else:
+            values[field] = value
+    return model(**values)
+
+
+def _code(field, value):
+    """Código convertido al tipo de la clave, o None si falta o no es convertible."""
+    try:
+        return field.to_python(value)
+    except ValidationError:
+        return None
+
+
+def _check_references(people, report):
+    """Descarta las filas con claves foráneas inexistentes (una consulta por tabla)."""
+    found = {}
+    for model, attname in REFERENCES.values():
+        field = model._meta.pk
+        codes = set()
+        for _, person, _ in people:
+            code = _code(field, getattr(person, attname)) if hasattr(person, attname) else None
+            if code is not None:
+                setattr(person, attname, code)
+                codes.add(code)
+        # Los valores no convertibles quedan como llegaron y no aparecen en `found`
+        found[attname] = set(model.objects.filter(pk__in=codes).values_list("pk", flat=True))
+
+    kept = []
+    for number, person, user in people:
+        missing = [
+            f"{attname[:-3]}={getattr(person, attname)}"
+            for attname, codes in found.items()
+            if hasattr(person, attname) and getattr(person, attname) not in codes
+        ]
+        if missing:
+            report.error(f"Fila {number}: no existen {', '.join(missing)}.")
+        else:
+            kept.append((number, person, user))
+    return kept
+
+
+def build(rows, report):
+    """
+    [(número de fila, persona, User sin contraseña)] válidos. ADMIN, como
+    EMPLOYEE, necesita un Employee (USERS_ONE_ROLE_CHK).
+    """
+    people = []
+    seen_usernames, seen_ids = set(), set()
+    for number, row in enumerate(rows, start=1):
+        username = (row.get("username") or "").strip()
+        role = (row.get("role") or "STUDENT").strip().upper()
+        try:
+            if not username:
+                raise ValidationError("falta username")
+            if role not in ROLES:
+                raise ValidationError(f"rol inválido '{role}'")
+            if username in seen_usernames or row.get("id") in seen_ids:
+                raise ValidationError("username o id repetido en el archivo")
+
+            if role == "STUDENT":
+                person = _person(Student, STUDENT_FIELDS, row)
+            else:
+                person = _person(Employee, EMPLOYEE_FIELDS, row)
+            person.clean_fields(exclude=list(REFERENCES))
+
+            user = User(username=username, role=role, is_staff=role == "ADMIN")
+            user._raw_password = row.get("password") or None
+            user.clean_fields(exclude=["password", "password_hash", "student", "employee"])
+        except (ValidationError, ValueError) as e:
+            messages = e.messages if isinstance(e, ValidationError) else [str(e)]
+            report.error(f"Fila {number}: {'; '.join(messages)}")
+            continue
+
+        seen_usernames.add(username)
+        seen_ids.add(person.id)
+        people.append((number, person, user))
+    return _check_references(people, report)
+
+
+# ===== hash =====
+
+def _init_worker(settings_module):
+    """Inicializa Django en cada proceso (necesario con 'spawn', p. ej. en Windows)."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    import django
+    django.setup()
+
+
+def _hash(password):
+    return make_password(password)
+
+
+def hash_passwords(passwords, workers=None):
+    """Hashes en el mismo orden que `passwords`; None produce una contraseña inutilizable."""
+    connections.close_all()  # que los procesos hijos no hereden conexiones abiertas
+    settings_module = os.environ.get("DJANGO_SETTINGS_MODULE", "universidad_fit.settings")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(settings_module,)) as executor:
+        return list(executor.map(_hash, passwords, chunksize=HASH_CHUNK_SIZE))
+
+
+# ===== inserción =====
+
+def _batches(items, size):
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _existing_people(batch):
+    """Ids de Student/Employee del lote que ya existen (una consulta por modelo)."""
+    existing = set()
+    for model in (Student, Employee):
+        ids = [person.id for _, person, _ in batch if isinstance(person, model)]
+        if ids:
+            existing |= {(model, pk) for pk in model.objects.filter(pk__in=ids).values_list("pk", flat=True)}
+    return existing
+
+
+def _count_users(users, report):
+    """bulk_create no emite post_save: los contadores de la plataforma se suman por lote."""
+    from fitness import counters
+
+    try:
+        counters.users_created(users)
+    except Exception as e:
+        # Igual que en fitness/signals.py: reconcile_counters corrige la diferencia
+        logger.warning("No se pudieron actualizar los contadores tras el alta masiva: %s", e)
+        report.error(f"Contadores sin actualizar para {len(users)} usuarios (ejecutar reconcile_counters).")
+
+
+def _drop_existing(batch, report):
+    """
+    Quita, fila por fila, los usernames y los ids de Student/Employee que ya
+    existen (una consulta para usuarios y una por modelo de persona).
+    """
+    usernames = [user.username for _, _, user in batch]
+    existing = set(User.objects.filter(pk__in=usernames).values_list("pk", flat=True))
+    people = _existing_people(batch)
+    kept = []
+    for entry in batch:
+        number, person, user = entry
+        if user.username in existing:
+            report.skipped += 1
+        elif (type(person), person.id) in people:
+            report.error(f"Fila {number}: ya existe un {type(person).__name__} con id {person.id}.")
+        else:
+            kept.append(entry)
+    return kept
+
+
+def skip_existing(entries, report, batch_size=1000):
+    """Antes del hash: volver a importar un archivo no vuelve a pagar PBKDF2 por lo ya creado."""
+    kept = []
+    for batch in _batches(entries, batch_size):
+        kept.extend(_drop_existing(batch, report))
+    return kept
+
+
+def insert(entries, report, batch_size=1000):
+    """
+    Inserta por lotes (una transacción por lote). Vuelve a descartar lo que
+    ya exista por si otra carga lo creó después de skip_existing.
+    """
+    inserted = 0
+    for batch in _batches(entries, batch_size):
+        kept = _drop_existing(batch, report)
+        if not kept:
+            continue
+
+        students = [person for _, person, _ in kept if isinstance(person, Student)]
+        employees = [person for _, person, _ in kept if isinstance(person, Employee)]
+        users = []
+        for _, person, user in kept:
+            # La instancia (no solo el id): los contadores leen employee.employee_type_id
+            if isinstance(person, Student):
+                user.student = person
+            else:
+                user.employee = person
+            users.append(user)
+
+        try:
+            with transaction.atomic():
+                Student.objects.bulk_create(students)
+                Employee.objects.bulk_create(employees)
+                User.objects.bulk_create(users)
+        except DatabaseError as e:
+            first, last = kept[0][0], kept[-1][0]
+            report.error(f"Filas {first}-{last}: lote descartado ({e}).")
+            continue
+        _count_users(users, report)
+        inserted += len(users)
+    report.created += inserted
+    return inserted
+
+
+def provision(path, workers=None, batch_size=1000, dry_run=False):
+    report = Report()
+
+    with report.stage("lectura y validación") as stage:
+        entries = skip_existing(build(read_rows(path), report), report, batch_size)
+        stage.rows = len(entries)
+
+    with report.stage(f"hash ({workers or os.cpu_count()} procesos)") as stage:
+        hashes = hash_passwords([user._raw_password for _, _, user in entries], workers)
+        for (_, _, user), encoded in zip(entries, hashes):
+            user.password = encoded
+            user.password_hash = encoded
+        stage.rows = len(entries)
+
+    if not dry_run:
+        with report.stage("inserción") as stage:
+            stage.rows = insert(entries, report, batch_size)
+    return report
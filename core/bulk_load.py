@@ -0,0 +1,230 @@
+"""
+Carga masiva de datos de referencia de la universidad (países, ciudades,
+sedes, facultades, programas, materias, tipos de contrato/empleado).
+
+Cada tabla se carga en una transacción y como un upsert por conjuntos:
+- PostgreSQL: COPY a una tabla temporal con la misma forma y luego un único
+  INSERT ... SELECT ... ON CONFLICT (pk) DO UPDATE.
+- Otros motores (SQLite): bulk_create(update_conflicts=True) por lotes.
+
+Las filas vienen de <tabla>.csv o <tabla>.json (lista de objetos) con los
+nombres de columna de la base (`country_code`) o del modelo (`country`,
+`country_id`). Las tablas se cargan en orden de dependencias (LOAD_ORDER) y
+se leen en streaming, así que el tamaño del archivo no importa.
+"""
+
+import csv
+import json
+import os
+import tempfile
+import time
+from itertools import islice
+
+from django.apps import apps
+from django.db import DatabaseError, connections, transaction
+
+# (tabla, modelo) en orden de claves foráneas
+LOAD_ORDER = [
+    ("countries", "locations.Country"),
+    ("departments", "locations.Department"),
+    ("cities", "locations.City"),
+    ("campuses", "locations.Campus"),
+    ("faculties", "locations.Faculty"),
+    ("areas", "locations.Area"),
+    ("programs", "academics.Program"),
+    ("subjects", "academics.Subject"),
+    ("contract_types", "humanResources.ContractType"),
+    ("employee_types", "humanResources.EmployeeType"),
+]
+TABLES = dict(LOAD_ORDER)
+NULL = r"\N"
+SPOOL_MAX_SIZE = 16 * 1024 * 1024  # el CSV para COPY pasa a disco más allá de esto
+
+
+class LoadError(Exception):
+    """Entrada inválida para una tabla."""
+
+
+# ===== lectura =====
+
+def find_source(directory, table):
+    for extension in ("csv", "json"):
+        path = os.path.join(directory, f"{table}.{extension}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def read_rows(path):
+    """Dicts de un .csv (con cabecera) o de un .json con una lista de objetos."""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise LoadError(f"{path}: se esperaba una lista de objetos.")
+        yield from data
+        return
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+# ===== columnas =====
+
+def _columns(model):
+    """Campos concretos en orden; el primero es la clave primaria."""
+    fields = [field for field in model._meta.concrete_fields]
+    return sorted(fields, key=lambda field: not field.primary_key)
+
+
+def _aliases(fields):
+    """{nombre aceptado en la entrada: campo}."""
+    aliases = {}
+    for field in fields:
+        for alias in (field.name, field.attname, field.column, field.column.lower()):
+            aliases[alias] = field
+    return aliases
+
+
+def clean_rows(model, rows):
+    """
+    Convierte dicts de entrada en {attname: valor} validados por campo
+    (to_python). Cadenas vacías en campos anulables son NULL.
+    """
+    fields = _columns(model)
+    aliases = _aliases(fields)
+    pk = fields[0]
+
+    for number, row in enumerate(rows, start=1):
+        unknown = set(row) - set(aliases)
+        if unknown:
+            raise LoadError(f"Fila {number}: columnas desconocidas {', '.join(sorted(unknown))}.")
+        values = {}
+        for key, raw in row.items():
+            field = aliases[key]
+            target = field.target_field if field.is_relation else field
+            if raw in ("", None) and field.null:
+                values[field.attname] = None
+                continue
+            try:
+                values[field.attname] = target.to_python(raw)
+            except Exception as e:
+                raise LoadError(f"Fila {number}, columna {key}: {e}")
+        if values.get(pk.attname) is None:
+            raise LoadError(f"Fila {number}: falta la clave primaria '{pk.column}'.")
+        yield values
+
+
+# ===== escritura =====
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _bulk_upsert(model, rows, using, batch_size):
+    fields = _columns(model)
+    pk = fields[0]
+    update_fields = [field.name for field in fields[1:]]
+    manager = model.objects.using(using)
+    total = 0
+    for batch in _batches(rows, batch_size):
+        objects = [model(**values) for values in batch]
+        if update_fields:
+            manager.bulk_create(objects, batch_size=batch_size, update_conflicts=True,
+                                unique_fields=[pk.name], update_fields=update_fields)
+        else:
+            manager.bulk_create(objects, batch_size=batch_size, ignore_conflicts=True)
+        total += len(objects)
+    return total
+
+
+def _copy_upsert(model, rows, using):
+    """COPY a una tabla temporal y un INSERT ... ON CONFLICT por conjuntos."""
+    connection = connections[using]
+    fields = _columns(model)
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    stage = quote(f"stage_{model._meta.db_table}")
+    columns = ", ".join(quote(field.column) for field in fields)
+    pk = quote(fields[0].column)
+
+    total = 0
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+", newline="") as buffer:
+        writer = csv.writer(buffer)
+        for values in rows:
+            writer.writerow([
+                NULL if values.get(field.attname) is None else field.get_db_prep_value(values[field.attname], connection)
+                for field in fields
+            ])
+            total += 1
+        buffer.seek(0)
+
+        if fields[1:]:
+            assignments = ", ".join(f"{quote(f.column)} = EXCLUDED.{quote(f.column)}" for f in fields[1:])
+            conflict = f"DO UPDATE SET {assignments}"
+        else:
+            conflict = "DO NOTHING"
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE TEMP TABLE {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+            cursor.cursor.copy_expert(
+                f"COPY {stage} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')", buffer)
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {stage} "
+                f"ON CONFLICT ({pk}) {conflict}")
+            cursor.execute(f"DROP TABLE {stage}")
+    return total
+
+
+def can_copy(using="default"):
+    connection = connections[using]
+    # copy_expert es de psycopg2; con psycopg 3 se usa bulk_create
+    return connection.vendor == "postgresql" and connection.Database.__name__ == "psycopg2"
+
+
+def load_table(model, rows, using="default", method="auto", batch_size=1000):
+    """
+    Upsert de `rows` (dicts de entrada) en una transacción. Devuelve
+    (filas, método usado). Si algo falla la tabla queda como estaba.
+    """
+    if method == "auto":
+        method = "copy" if can_copy(using) else "bulk"
+    if method == "copy" and not can_copy(using):
+        raise LoadError("COPY solo está disponible con PostgreSQL y psycopg2.")
+
+    cleaned = clean_rows(model, rows)
+    with transaction.atomic(using=using):
+        if method == "copy":
+            count = _copy_upsert(model, cleaned, using)
+        else:
+            count = _bulk_upsert(model, cleaned, using, batch_size)
+    return count, method
+
+
+def load_directory(directory, tables=None, using="default", method="auto", batch_size=1000, report=None):
+    """
+    Carga las tablas de LOAD_ORDER que tengan archivo en `directory`.
+    Devuelve [(tabla, filas, método, segundos)].
+    """
+    results = []
+    for table, label in LOAD_ORDER:
+        if tables and table not in tables:
+            continue
+        path = find_source(directory, table)
+        if path is None:
+            continue
+        started = time.monotonic()
+        try:
+            count, used = load_table(apps.get_model(label), read_rows(path), using, method, batch_size)
+        except (LoadError, DatabaseError) as e:
+            # La transacción de la tabla ya se revirtió; las anteriores quedan cargadas
+            raise LoadError(f"{table}: {e}")
+        result = (table, count, used, time.monotonic() - started)
+        results.append(result)
+        if report:
+            report(*result)
+    return results
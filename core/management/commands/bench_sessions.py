@@ -0,0 +1,78 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+
+ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cache": "core.sessions",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara consultas SQL y latencia por request autenticado con sesiones en la base "
+        "(SESSION_MODE=db) y en caché con escritura a la base (SESSION_MODE=cache)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="Usuario con el que se inicia sesión (default: el primero).")
+        parser.add_argument("--url", default=None,
+                            help="Ruta pedida en cada request (default: el dashboard de fitness).")
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Requests medidos por modo (default: 200).")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True).order_by("pk")
+        if options["username"]:
+            users = users.filter(pk=options["username"])
+        user = users.first()
+        if user is None:
+            raise CommandError("No hay un usuario activo con el que iniciar sesión.")
+        url = options["url"] or reverse("student_dashboard")
+
+        rows = []
+        for mode, engine in ENGINES.items():
+            with override_settings(SESSION_ENGINE=engine, SESSION_CACHE_ALIAS="sessions"):
+                rows.append((mode, *self._measure(user, url, options["requests"])))
+
+        self.stdout.write(f"{user.username} -> {url}, {options['requests']} requests por modo")
+        self.stdout.write(f"{'modo':<8}{'consultas/req':>15}{'de sesión/req':>15}{'p50 ms':>10}{'p95 ms':>10}")
+        for mode, queries, session_queries, p50, p95 in rows:
+            self.stdout.write(f"{mode:<8}{queries:>15.2f}{session_queries:>15.2f}{p50:>10.2f}{p95:>10.2f}")
+
+        saved = rows[0][2] - rows[1][2]
+        self.stdout.write(self.style.SUCCESS(
+            f"Sesiones en caché: {saved:.2f} consultas menos por request "
+            f"({saved * options['requests']:.0f} en {options['requests']} requests)"))
+
+    def _measure(self, user, url, requests):
+        client = Client(SERVER_NAME="localhost")
+        client.force_login(user)  # guarda la sesión (y la deja en caché en modo cache)
+        try:
+            client.get(url)  # calienta la cadena de middleware y los cachés de la app
+            latencies = []
+            queries = session_queries = 0
+            for _ in range(requests):
+                with CaptureQueriesContext(connection) as captured:
+                    began = time.perf_counter()
+                    response = client.get(url)
+                    latencies.append((time.perf_counter() - began) * 1000)
+                if response.status_code >= 400:
+                    raise CommandError(f"{url} respondió {response.status_code}.")
+                queries += len(captured)
+                session_queries += sum("django_session" in query["sql"] for query in captured)
+        finally:
+            client.logout()  # borra la fila de la sesión (y su entrada en caché)
+        return (
+            queries / requests,
+            session_queries / requests,
+            statistics.median(latencies),
+            statistics.quantiles(latencies, n=20)[-1] if requests > 1 else latencies[0],
+        )
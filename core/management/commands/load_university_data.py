@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import bulk_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga datos de referencia (países, ciudades, sedes, facultades, programas, materias, "
+        "tipos de contrato y de empleado) desde <tabla>.csv o <tabla>.json, en orden de "
+        "dependencias y con un upsert por tabla."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Directorio con los archivos <tabla>.csv / <tabla>.json.")
+        parser.add_argument("--tables", nargs="+", choices=list(bulk_load.TABLES),
+                            help="Solo estas tablas (default: todas las que tengan archivo).")
+        parser.add_argument("--method", choices=("auto", "copy", "bulk"), default="auto",
+                            help="copy (PostgreSQL), bulk (bulk_create) o auto (default).")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Filas por INSERT con el método bulk (default: 1000).")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        def report(table, rows, method, seconds):
+            rate = rows / seconds if seconds else rows
+            self.stdout.write(f"{table}: {rows} filas ({method}) en {seconds:.2f}s, {rate:.0f} filas/s")
+
+        try:
+            results = bulk_load.load_directory(
+                options["directory"],
+                tables=options["tables"],
+                using=options["database"],
+                method=options["method"],
+                batch_size=options["batch_size"],
+                report=report,
+            )
+        except (bulk_load.LoadError, OSError) as e:
+            raise CommandError(str(e))
+
+        if not results:
+            raise CommandError(f"No hay archivos de datos en {options['directory']}.")
+        total = sum(rows for _, rows, _, _ in results)
+        self.stdout.write(self.style.SUCCESS(f"[OK] {total} filas en {len(results)} tablas"))
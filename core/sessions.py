@@ -0,0 +1,41 @@
+"""
+Backend de sesiones para SESSION_MODE=cache (SESSION_ENGINE='core.sessions').
+
+Es el `cached_db` de Django: las lecturas salen del caché SESSION_CACHE_ALIAS
+(memoria local, archivos o Redis según settings) y solo van a
+`django_session` si la clave no está; cada escritura va primero a la base y
+después al caché (write-through), así que reiniciar o vaciar el caché no
+cierra sesiones.
+
+Limpieza perezosa: al guardar una sesión, como mucho una vez cada
+SESSION_CLEANUP_INTERVAL segundos se borran las filas vencidas. El turno se
+toma con `cache.add`, que es atómico en Redis y en un mismo proceso, así que
+con Redis solo un proceso hace el DELETE por intervalo; con el caché en
+archivos dos procesos pueden coincidir, y el segundo DELETE no borra nada.
+`clearsessions` sigue funcionando si se prefiere un cron.
+"""
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.db import DatabaseError, transaction
+
+CLEANUP_KEY = "core.sessions.cleanup"
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = "core.sessions"
+
+    def save(self, must_create=False):
+        super().save(must_create)
+        self._lazy_cleanup()
+
+    def _lazy_cleanup(self):
+        interval = settings.SESSION_CLEANUP_INTERVAL
+        if interval <= 0 or not self._cache.add(CLEANUP_KEY, 1, interval):
+            return
+        try:
+            with transaction.atomic():  # savepoint: un error no invalida la transacción del request
+                self.clear_expired()
+        except DatabaseError:
+            # Una limpieza fallida no debe romper el request; se reintenta en el próximo turno
+            self._cache.delete(CLEANUP_KEY)
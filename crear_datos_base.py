@@ -1,113 +1,62 @@
 """
 Script para crear datos base necesarios (City, Campus, etc.)
 Ejecuta: python crear_datos_base.py
+
+Usa el mismo cargador que `manage.py load_university_data` (un upsert por
+tabla), así que se puede ejecutar varias veces sin duplicar datos. Para
+cargar datos reales de una universidad usa el comando con archivos CSV/JSON.
 """
 
 import os
 import django
-from datetime import date
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'universidad_fit.settings')
 django.setup()
 
-from locations.models import Country, Department, City, Campus, Faculty
-from humanResources.models import ContractType, EmployeeType
+from django.apps import apps
+
+from core import bulk_load
+
+DATOS_BASE = {
+    'countries': [{'code': 1, 'name': 'Colombia'}],
+    'departments': [{'code': 1, 'name': 'Valle del Cauca', 'country_code': 1}],
+    'cities': [{'code': 101, 'name': 'Cali', 'dept_code': 1}],
+    'campuses': [{'code': 1, 'name': 'Campus Cali', 'city_code': 101}],
+    'faculties': [{
+        'code': 1,
+        'name': 'Facultad de Ciencias',
+        'location': 'Cali',
+        'phone_number': '555-1234',
+        'dean_id': '1001',
+    }],
+    'contract_types': [{'name': 'Planta'}],
+    'employee_types': [{'name': 'Instructor'}],
+}
+
 
 def crear_datos_base():
     """Crea los datos base necesarios para crear usuarios"""
-    
+
     print("=" * 60)
     print("Creando datos base...")
     print("=" * 60)
-    
-    creados = 0
-    
+
+    total = 0
+
     try:
-        # Crear País
-        country, created = Country.objects.get_or_create(
-            code=1,
-            defaults={'name': 'Colombia'}
-        )
-        if created:
-            print("[OK] País creado: Colombia")
-            creados += 1
-        else:
-            print("[!] País ya existe: Colombia")
-        
-        # Crear Departamento
-        department, created = Department.objects.get_or_create(
-            code=1,
-            defaults={'name': 'Valle del Cauca', 'country': country}
-        )
-        if created:
-            print("[OK] Departamento creado: Valle del Cauca")
-            creados += 1
-        else:
-            print("[!] Departamento ya existe: Valle del Cauca")
-        
-        # Crear Ciudad
-        city, created = City.objects.get_or_create(
-            code=101,
-            defaults={'name': 'Cali', 'department': department}
-        )
-        if created:
-            print("[OK] Ciudad creada: Cali")
-            creados += 1
-        else:
-            print("[!] Ciudad ya existe: Cali")
-        
-        # Crear Campus
-        campus, created = Campus.objects.get_or_create(
-            code=1,
-            defaults={'name': 'Campus Cali', 'city': city}
-        )
-        if created:
-            print("[OK] Campus creado: Campus Cali")
-            creados += 1
-        else:
-            print("[!] Campus ya existe: Campus Cali")
-        
-        # Crear Facultad
-        faculty, created = Faculty.objects.get_or_create(
-            code=1,
-            defaults={
-                'name': 'Facultad de Ciencias',
-                'location': 'Cali',
-                'phone_number': '555-1234',
-                'dean_id': '1001'
-            }
-        )
-        if created:
-            print("[OK] Facultad creada: Facultad de Ciencias")
-            creados += 1
-        else:
-            print("[!] Facultad ya existe: Facultad de Ciencias")
-        
-        # Crear ContractType
-        contract_type, created = ContractType.objects.get_or_create(
-            name='Planta'
-        )
-        if created:
-            print("[OK] Tipo de contrato creado: Planta")
-            creados += 1
-        else:
-            print("[!] Tipo de contrato ya existe: Planta")
-        
-        # Crear EmployeeType
-        employee_type, created = EmployeeType.objects.get_or_create(
-            name='Instructor'
-        )
-        if created:
-            print("[OK] Tipo de empleado creado: Instructor")
-            creados += 1
-        else:
-            print("[!] Tipo de empleado ya existe: Instructor")
-        
+        for table, label in bulk_load.LOAD_ORDER:
+            rows = DATOS_BASE.get(table)
+            if not rows:
+                continue
+            count, method = bulk_load.load_table(apps.get_model(label), rows)
+            print(f"[OK] {table}: {count} filas ({method})")
+            total += count
+
         print("=" * 60)
-        print(f"RESUMEN: {creados} elementos creados")
+        print(f"RESUMEN: {total} filas creadas o actualizadas")
         print("=" * 60)
         print("\nAhora puedes ejecutar: python crear_usuarios.py")
-        
+
     except Exception as e:
         print(f"[ERROR] Error al crear datos base: {e}")
         import traceback
@@ -115,4 +64,3 @@ def crear_datos_base():
 
 if __name__ == '__main__':
     crear_datos_base()
-
@@ -0,0 +1,249 @@
+"""
+Mantenimiento incremental de UserActivitySummary.
+
+Cada inserción de Progress aplica un $inc/$max sobre el resumen del usuario y,
+si cambia la racha, un $set condicionado a que nadie más la haya tocado
+mientras tanto. Solo los casos raros (registros fuera de orden que tapan un
+hueco, borrados dentro de la racha o escrituras concurrentes sobre la racha)
+recalculan las rachas a partir de los días entrenados del usuario.
+"""
+
+from datetime import datetime, timedelta
+
+from pymongo import ReplaceOne, ReturnDocument
+
+from fitness.models import Progress, UserActivitySummary
+
+WEEKS_KEPT = 12  # semanas que se conservan en weekly_counts
+ONE_DAY = timedelta(days=1)
+
+
+def day_of(when):
+    return datetime(when.year, when.month, when.day)
+
+
+def week_key(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def oldest_week_key(today):
+    return week_key(today - timedelta(weeks=WEEKS_KEPT - 1))
+
+
+def _entry_day(entry):
+    return day_of(entry.date or entry.created_at or datetime.utcnow())
+
+
+def _streaks(days):
+    """
+    (current_streak, streak_start, longest_streak) a partir de días únicos
+    ordenados ascendentemente. La racha actual es la que termina en el último día.
+    """
+    current, start, longest = 0, None, 0
+    previous = None
+    for day in days:
+        if previous is not None and day == previous + ONE_DAY:
+            current += 1
+        else:
+            current, start = 1, day
+        longest = max(longest, current)
+        previous = day
+    return current, start, longest
+
+
+# ===== lecturas =====
+
+def streak_as_of(summary, today):
+    """Racha vigente: se pierde si no se entrenó ni hoy ni ayer."""
+    last = (summary or {}).get("last_workout_date")
+    if last is None or day_of(last) < day_of(today) - ONE_DAY:
+        return 0
+    return summary.get("current_streak", 0)
+
+
+def weekly_count(summary, today):
+    return (summary or {}).get("weekly_counts", {}).get(week_key(today), 0)
+
+
+# ===== escrituras =====
+
+def record_created(entries):
+    by_user = {}
+    for entry in entries:
+        by_user.setdefault(entry.user_id, []).append(entry)
+
+    for user_id, user_entries in by_user.items():
+        if len(user_entries) == 1:
+            entry = user_entries[0]
+            _apply_insert(user_id, _entry_day(entry), entry.duration or 0)
+        else:
+            _apply_batch_insert(user_id, user_entries)
+
+
+def record_deleted(entries):
+    for entry in entries:
+        _apply_delete(entry.user_id, _entry_day(entry), entry.duration or 0)
+
+
+def _apply_insert(user_id, day, duration):
+    collection = UserActivitySummary._get_collection()
+    now = datetime.utcnow()
+
+    before = collection.find_one_and_update(
+        {"_id": user_id},
+        {
+            "$inc": {"total_workouts": 1, "total_duration": duration, f"weekly_counts.{week_key(day)}": 1},
+            "$max": {"last_workout_date": day},
+            "$set": {"updated_at": now},
+            "$setOnInsert": {"current_streak": 0, "longest_streak": 0, "streak_start": None},
+        },
+        projection={"current_streak": 1, "streak_start": 1, "last_workout_date": 1, "weekly_counts": 1},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE,
+    ) or {}
+
+    prev_last = before.get("last_workout_date")
+    prev_streak = before.get("current_streak", 0)
+    prev_start = before.get("streak_start")
+
+    if prev_last is None or day > prev_last + ONE_DAY:
+        streak, start = 1, day
+    elif day == prev_last + ONE_DAY:
+        streak, start = prev_streak + 1, prev_start or prev_last
+    elif prev_start is not None and prev_start <= day <= prev_last:
+        streak, start = None, None  # ya estaba dentro de la racha
+    else:
+        # Registro anterior al inicio de la racha: puede unir rachas viejas
+        recompute_streaks(user_id)
+        return
+
+    update = {}
+    if streak is not None:
+        update["$set"] = {"current_streak": streak, "streak_start": start}
+        update["$max"] = {"longest_streak": streak}
+    oldest = oldest_week_key(now)
+    stale = [key for key in before.get("weekly_counts", {}) if key < oldest]
+    if stale:
+        update["$unset"] = {f"weekly_counts.{key}": "" for key in stale}
+    if not update:
+        return
+
+    result = collection.update_one(
+        {"_id": user_id, "current_streak": prev_streak, "streak_start": prev_start},
+        update,
+    )
+    if result.matched_count == 0:
+        # Otra escritura cambió la racha entre las dos operaciones
+        recompute_streaks(user_id)
+
+
+def _apply_batch_insert(user_id, entries):
+    """Sincronizaciones masivas: un solo $inc para los contadores y las rachas recalculadas una vez."""
+    inc = {"total_workouts": len(entries), "total_duration": sum(e.duration or 0 for e in entries)}
+    for entry in entries:
+        key = f"weekly_counts.{week_key(_entry_day(entry))}"
+        inc[key] = inc.get(key, 0) + 1
+
+    UserActivitySummary._get_collection().update_one(
+        {"_id": user_id},
+        {
+            "$inc": inc,
+            "$max": {"last_workout_date": max(_entry_day(e) for e in entries)},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+        upsert=True,
+    )
+    recompute_streaks(user_id)
+
+
+def _apply_delete(user_id, day, duration):
+    collection = UserActivitySummary._get_collection()
+    before = collection.find_one_and_update(
+        {"_id": user_id},
+        {
+            "$inc": {"total_workouts": -1, "total_duration": -duration, f"weekly_counts.{week_key(day)}": -1},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+        projection={"streak_start": 1, "last_workout_date": 1},
+    )
+    if before is None:
+        return
+    start, last = before.get("streak_start"), before.get("last_workout_date")
+    if last is not None and (day == last or (start is not None and start <= day <= last)):
+        recompute_streaks(user_id)
+
+
+def _workout_days(user_ids):
+    """{user_id: [(día, entrenamientos, duración)]} ordenado por día."""
+    pipeline = [
+        {"$match": {"user_id": {"$in": list(user_ids)}}},
+        {"$group": {
+            "_id": {
+                "user_id": "$user_id",
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": {"$ifNull": ["$date", "$created_at"]}}},
+            },
+            "workouts": {"$sum": 1},
+            "duration": {"$sum": {"$ifNull": ["$duration", 0]}},
+        }},
+    ]
+    result = {}
+    for row in Progress._get_collection().aggregate(pipeline):
+        day = datetime.strptime(row["_id"]["day"], "%Y-%m-%d")
+        result.setdefault(row["_id"]["user_id"], []).append((day, row["workouts"], row["duration"]))
+    for rows in result.values():
+        rows.sort()
+    return result
+
+
+def recompute_streaks(user_id):
+    """Recalcula solo las rachas y el último día (tras casos fuera de orden)."""
+    rows = _workout_days([user_id]).get(user_id, [])
+    current, start, longest = _streaks([day for day, _, _ in rows])
+    UserActivitySummary._get_collection().update_one(
+        {"_id": user_id},
+        {"$set": {
+            "current_streak": current,
+            "streak_start": start,
+            "longest_streak": longest,
+            "last_workout_date": rows[-1][0] if rows else None,
+            "updated_at": datetime.utcnow(),
+        }},
+    )
+
+
+def build_summary(user_id, rows, now=None):
+    """Documento completo de resumen a partir de los días entrenados."""
+    now = now or datetime.utcnow()
+    oldest = oldest_week_key(now)
+    weekly = {}
+    for day, workouts, _ in rows:
+        key = week_key(day)
+        if key >= oldest:
+            weekly[key] = weekly.get(key, 0) + workouts
+
+    current, start, longest = _streaks([day for day, _, _ in rows])
+    return {
+        "_id": user_id,
+        "total_workouts": sum(workouts for _, workouts, _ in rows),
+        "total_duration": float(sum(duration for _, _, duration in rows)),
+        "current_streak": current,
+        "streak_start": start,
+        "longest_streak": longest,
+        "last_workout_date": rows[-1][0] if rows else None,
+        "weekly_counts": weekly,
+        "updated_at": now,
+    }
+
+
+def rebuild_users(user_ids):
+    """Reescribe los resúmenes de un lote de usuarios con una agregación y un bulk_write."""
+    days = _workout_days(user_ids)
+    now = datetime.utcnow()
+    operations = [
+        ReplaceOne({"_id": user_id}, build_summary(user_id, days.get(user_id, []), now), upsert=True)
+        for user_id in user_ids
+    ]
+    if operations:
+        UserActivitySummary._get_collection().bulk_write(operations, ordered=False)
+    return len(operations)
@@ -0,0 +1,190 @@
+"""
+Adopción de plantillas con copia al escribir.
+
+Adoptar una plantilla crea una rutina pequeña: nombre, dueño, `adopted_from`
+y una lista dispersa de `overrides` (series/repeticiones/descanso cambiados
+por posición). Los ejercicios siguen viviendo solo en la plantilla, así que
+5.000 adopciones cuestan un documento de ejercicios más 5.000 referencias, y
+las correcciones de la plantilla llegan a todos.
+
+Mientras `exercises` esté vacío la rutina está "enlazada" y su lista efectiva
+se resuelve al leer (una consulta `$in` por página de rutinas). Se copia
+(materializa) solo cuando el dueño cambia la estructura: agrega, quita o
+reordena ejercicios, vacía un valor, o la marca como plantilla. Si la
+plantilla se elimina, sus adopciones enlazadas se materializan antes.
+"""
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from fitness.models import Routine, RoutineExercise, RoutineOverride
+
+OVERRIDE_FIELDS = ("sets", "reps", "rest")
+
+# Rutinas adoptadas que todavía leen los ejercicios de su plantilla
+LINKED = {"exercises.0": {"$exists": False}}
+
+
+def exercise_id(row):
+    """ID del ejercicio de una fila sin desreferenciarlo."""
+    ref = row._data.get("exercise")
+    return str(getattr(ref, "id", ref))
+
+
+def is_linked(routine):
+    return bool(routine.adopted_from) and not routine.exercises
+
+
+def linked_templates(user_id):
+    """{template_id: fecha de adopción} de las adopciones enlazadas del usuario."""
+    cursor = Routine._get_collection().find(
+        {"created_by": user_id, "adopted_from": {"$ne": None}, **LINKED},
+        {"adopted_from": 1, "created_at": 1},
+    )
+    return {doc["adopted_from"]: doc.get("created_at") for doc in cursor}
+
+
+# ===== adopción =====
+
+def adopt(template, user_id):
+    """
+    Devuelve (rutina, creada). Si el usuario ya adoptó la plantilla se
+    devuelve esa rutina en lugar de crear otra.
+    """
+    existing = Routine.objects(adopted_from=str(template.id), created_by=user_id).first()
+    if existing:
+        return existing, False
+
+    routine = Routine(
+        name=template.name,
+        description=template.description,
+        created_by=user_id,
+        user_id=user_id,
+        adopted_from=str(template.id),
+    )
+    routine.save()
+    return routine, True
+
+
+# ===== lectura =====
+
+def _apply(rows, overrides):
+    """Copias de las filas de la plantilla con los overrides que aún coinciden."""
+    by_position = {o.position: o for o in overrides or []}
+    result = []
+    for position, row in enumerate(rows):
+        copy = RoutineExercise._from_son(row.to_mongo())
+        override = by_position.get(position)
+        # Si la plantilla cambió esa posición, el override ya no aplica
+        if override is not None and override.exercise_id == exercise_id(row):
+            for field in OVERRIDE_FIELDS:
+                value = getattr(override, field)
+                if value is not None:
+                    setattr(copy, field, value)
+        result.append(copy)
+    return result
+
+
+def resolve(routines):
+    """
+    Asigna `effective_exercises` a cada rutina: la lista propia o, si está
+    enlazada, la de su plantilla con los overrides aplicados. También asigna
+    `template_name` (None si no es adoptada o la plantilla ya no existe). Una
+    consulta para todas las plantillas involucradas; los ejercicios solo se
+    leen si alguna rutina está enlazada.
+    """
+    routines = list(routines)
+    template_ids = {ObjectId(r.adopted_from) for r in routines
+                    if r.adopted_from and ObjectId.is_valid(r.adopted_from)}
+    templates = {}
+    if template_ids:
+        fields = ("name", "exercises") if any(is_linked(r) for r in routines) else ("name",)
+        templates = {str(t.id): t for t in Routine.objects(id__in=list(template_ids)).only(*fields)}
+
+    for routine in routines:
+        template = templates.get(routine.adopted_from) if routine.adopted_from else None
+        routine.template_name = template.name if template else None
+        if is_linked(routine):
+            routine.effective_exercises = _apply(template.exercises, routine.overrides) if template else []
+        else:
+            routine.effective_exercises = list(routine.exercises)
+    return routines
+
+
+def exercise_counts(template_ids):
+    """{template_id: cantidad de ejercicios} para mostrar rutinas enlazadas sin cargarlas."""
+    ids = [ObjectId(i) for i in set(template_ids) if i and ObjectId.is_valid(i)]
+    if not ids:
+        return {}
+    pipeline = [
+        {"$match": {"_id": {"$in": ids}}},
+        {"$project": {"count": {"$size": {"$ifNull": ["$exercises", []]}}}},
+    ]
+    return {str(doc["_id"]): doc["count"] for doc in Routine._get_collection().aggregate(pipeline)}
+
+
+# ===== escritura =====
+
+def _diff(template_rows, rows):
+    """Overrides que convierten las filas de la plantilla en `rows`, o None si cambió la estructura."""
+    if [exercise_id(r) for r in template_rows] != [exercise_id(r) for r in rows]:
+        return None
+
+    overrides = []
+    for position, (base, row) in enumerate(zip(template_rows, rows)):
+        changed = {}
+        for field in OVERRIDE_FIELDS:
+            old, new = getattr(base, field), getattr(row, field)
+            if new == old:
+                continue
+            if new is None:
+                return None  # vaciar un valor no se puede expresar como override
+            changed[field] = new
+        if changed:
+            overrides.append(RoutineOverride(position=position, exercise_id=exercise_id(row), **changed))
+    return overrides
+
+
+def update_exercises(routine, rows):
+    """
+    Aplica la lista editada a la rutina. Una rutina enlazada guarda solo los
+    overrides si la estructura coincide con la plantilla; si no, se materializa.
+    No guarda el documento.
+    """
+    if is_linked(routine) and not routine.is_template:
+        template = Routine.objects(id=routine.adopted_from).only("exercises").first() \
+            if ObjectId.is_valid(routine.adopted_from) else None
+        overrides = _diff(template.exercises, rows) if template else None
+        if overrides is not None:
+            routine.overrides = overrides
+            return
+    routine.exercises = rows
+    routine.overrides = []
+
+
+def template_deleted(template, batch_size=500):
+    """Materializa las adopciones enlazadas antes de que desaparezca la plantilla."""
+    rows = list(template.exercises)
+    if not rows:
+        return 0
+
+    collection = Routine._get_collection()
+    query = {"adopted_from": str(template.id), **LINKED}
+    updated = 0
+    last_id = None
+    while True:
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = list(collection.find(query, {"overrides": 1}).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        operations = []
+        for doc in batch:
+            overrides = [RoutineOverride._from_son(o) for o in doc.get("overrides", [])]
+            exercises = [row.to_mongo().to_dict() for row in _apply(rows, overrides)]
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"exercises": exercises}, "$unset": {"overrides": ""}}))
+        collection.bulk_write(operations, ordered=False)
+        updated += len(operations)
+    return updated
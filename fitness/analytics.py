@@ -0,0 +1,226 @@
+"""
+Analítica de progreso sobre pandas/NumPy.
+
+Los registros de Progress se leen con pymongo crudo y una proyección (sin
+construir documentos de MongoEngine) y se convierten en un DataFrame
+columnar. Sobre ese frame todo es vectorizado: promedios móviles de
+esfuerzo, tendencia de volumen (series x repeticiones), percentiles de
+duración, variación semana contra semana y reparto por tipo de ejercicio.
+
+`load_frame` acepta varios usuarios a la vez: las vistas del entrenador
+cargan una página completa de usuarios con una sola consulta y
+`cohort_summary` agrega por usuario con groupby.
+
+Las series se obtienen de la rutina (la fila del ejercicio, resuelta con
+adoption.resolve) y valen 1 si el registro no trae rutina o el ejercicio no
+está en ella.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+
+from fitness import adoption
+from fitness.catalog import catalog
+from fitness.models import Progress, Routine
+
+FIELDS = ("user_id", "date", "routine_id", "exercise_id", "repetitions", "duration", "effort_level")
+NUMERIC_FIELDS = ("repetitions", "duration", "effort_level")
+EXERCISE_TYPES = ("cardio", "fuerza", "movilidad")
+DURATION_PERCENTILES = (0.5, 0.75, 0.9)
+EFFORT_WINDOW = 4  # semanas del promedio móvil de esfuerzo
+
+
+# ===== carga =====
+
+def load_frame(user_ids, since=None, until=None):
+    """
+    DataFrame con un registro de Progress por fila, para uno o varios
+    usuarios. Agrega `week` (lunes de la semana), `exercise_type`, `sets` y
+    `volume`.
+    """
+    user_ids = [user_ids] if isinstance(user_ids, str) else list(user_ids)
+    query = {"user_id": user_ids[0] if len(user_ids) == 1 else {"$in": user_ids}}
+    if since or until:
+        query["date"] = {}
+        if since:
+            query["date"]["$gte"] = since
+        if until:
+            query["date"]["$lt"] = until
+
+    projection = {"_id": 0, **{field: 1 for field in FIELDS}}
+    docs = list(Progress._get_collection().find(query, projection).batch_size(5000))
+    frame = pd.DataFrame.from_records(docs, columns=list(FIELDS))
+    return enrich(frame)
+
+
+def enrich(frame):
+    """Tipos, semana, tipo de ejercicio y volumen (dos lecturas por lote, no por fila)."""
+    frame = frame.copy()
+    frame["date"] = pd.to_datetime(frame["date"])
+    for field in NUMERIC_FIELDS:
+        frame[field] = pd.to_numeric(frame[field], errors="coerce")
+    frame["week"] = (frame["date"] - pd.to_timedelta(frame["date"].dt.weekday, unit="D")).dt.normalize()
+
+    exercise_ids = frame["exercise_id"].dropna().unique().tolist()
+    records = catalog.get_many(exercise_ids) if exercise_ids else {}
+    types = {exercise_id: record["type"] for exercise_id, record in records.items()}
+    frame["exercise_type"] = frame["exercise_id"].map(types).astype(object)
+
+    frame = frame.merge(_sets_frame(frame), on=["routine_id", "exercise_id"], how="left")
+    frame["sets"] = pd.to_numeric(frame["sets"]).fillna(1)
+    frame["volume"] = frame["sets"] * frame["repetitions"]
+    return frame
+
+
+def _sets_frame(frame):
+    """Series por (routine_id, exercise_id) según la lista efectiva de cada rutina."""
+    routine_ids = [ObjectId(i) for i in frame["routine_id"].dropna().unique() if ObjectId.is_valid(i)]
+    rows = []
+    if routine_ids:
+        routines = Routine.objects(id__in=routine_ids).only("exercises", "adopted_from", "overrides")
+        for routine in adoption.resolve(routines):
+            for row in routine.effective_exercises:
+                if row.sets:
+                    rows.append((str(routine.id), adoption.exercise_id(row), row.sets))
+    sets = pd.DataFrame(rows, columns=["routine_id", "exercise_id", "sets"]).astype({"sets": "float64"})
+    # Si un ejercicio se repite en la rutina se toma la primera fila
+    return sets.drop_duplicates(["routine_id", "exercise_id"])
+
+
+# ===== métricas =====
+
+def week_range(now, weeks):
+    """Lunes de las últimas `weeks` semanas, incluida la actual."""
+    current = pd.Timestamp(now).normalize()
+    current -= pd.Timedelta(days=current.weekday())
+    return pd.date_range(end=current, periods=weeks, freq="7D")
+
+
+def weekly(frame, weeks_index):
+    """Totales por semana, con las semanas sin registros en cero."""
+    grouped = frame.groupby("week").agg(
+        workouts=("date", "size"),
+        effort=("effort_level", "mean"),
+        volume=("volume", "sum"),
+        duration=("duration", "sum"),
+    )
+    table = grouped.reindex(weeks_index)
+    table[["workouts", "volume", "duration"]] = table[["workouts", "volume", "duration"]].fillna(0)
+    table["effort_ma"] = table["effort"].rolling(EFFORT_WINDOW, min_periods=1).mean()
+    return table
+
+
+def trend(values):
+    """Pendiente por semana de una regresión lineal (0 si no hay datos suficientes)."""
+    values = np.asarray(values, dtype=float)
+    mask = ~np.isnan(values)
+    if mask.sum() < 2:
+        return 0.0
+    x = np.arange(len(values))[mask]
+    return float(np.polyfit(x, values[mask], 1)[0])
+
+
+def week_over_week(table):
+    """Variación porcentual de la semana actual contra la anterior."""
+    if len(table) < 2:
+        return {}
+    current, previous = table.iloc[-1], table.iloc[-2]
+    deltas = {}
+    for column in ("workouts", "volume", "duration", "effort"):
+        before, after = previous[column], current[column]
+        if pd.isna(before) or pd.isna(after) or before == 0:
+            deltas[column] = None
+        else:
+            deltas[column] = round(float((after - before) / before * 100), 1)
+    return deltas
+
+
+def duration_percentiles(frame):
+    """Percentiles de duración por registro, en minutos."""
+    durations = frame["duration"].dropna()
+    if durations.empty:
+        return {f"p{int(q * 100)}": 0.0 for q in DURATION_PERCENTILES}
+    values = np.percentile(durations.to_numpy() / 60, [q * 100 for q in DURATION_PERCENTILES])
+    return {f"p{int(q * 100)}": round(float(v), 1) for q, v in zip(DURATION_PERCENTILES, values)}
+
+
+def type_split(frame):
+    """Registros, minutos, volumen y porcentaje de registros por tipo de ejercicio."""
+    grouped = frame.groupby("exercise_type").agg(
+        workouts=("date", "size"),
+        duration=("duration", "sum"),
+        volume=("volume", "sum"),
+    ).reindex(list(EXERCISE_TYPES), fill_value=0)
+    total = grouped["workouts"].sum()
+    grouped["share"] = (grouped["workouts"] / total * 100).round(1) if total else 0.0
+    grouped["duration"] = grouped["duration"] / 60
+    return grouped
+
+
+def _clean(value, digits=1):
+    return None if pd.isna(value) else round(float(value), digits)
+
+
+def user_report(user_id, now, weeks=8):
+    """Todo lo que muestra la página de reportes para un usuario."""
+    weeks_index = week_range(now, weeks)
+    frame = load_frame(user_id, since=weeks_index[0].to_pydatetime(), until=now + timedelta(days=1))
+    table = weekly(frame, weeks_index)
+    split = type_split(frame)
+
+    return {
+        "labels": [week.strftime("%d/%m") for week in weeks_index],
+        "workouts": [int(v) for v in table["workouts"]],
+        "effort": [_clean(v) for v in table["effort"]],
+        "effort_ma": [_clean(v) for v in table["effort_ma"]],
+        "avg_effort": _clean(frame["effort_level"].mean()) or 0,
+        "volume": [int(v) for v in table["volume"]],
+        "volume_trend": round(trend(table["volume"]), 1),
+        "week_over_week": week_over_week(table),
+        "duration_percentiles": duration_percentiles(frame),
+        "type_split": [
+            {"type": exercise_type, "workouts": int(row.workouts), "minutes": round(float(row.duration), 1),
+             "volume": int(row.volume), "share": float(row.share)}
+            for exercise_type, row in split.iterrows()
+        ],
+    }
+
+
+def cohort_summary(user_ids, now, weeks=4):
+    """
+    Métricas de las últimas `weeks` semanas para muchos usuarios con una sola
+    consulta: {user_id: {workouts, avg_effort, volume, median_minutes,
+    workouts_delta}}. Los usuarios sin registros aparecen en cero.
+    """
+    user_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+    if not user_ids:
+        return {}
+    weeks_index = week_range(now, max(weeks, 2))
+    frame = load_frame(user_ids, since=weeks_index[0].to_pydatetime(), until=now + timedelta(days=1))
+
+    grouped = frame.groupby("user_id").agg(
+        workouts=("date", "size"),
+        avg_effort=("effort_level", "mean"),
+        volume=("volume", "sum"),
+        median_minutes=("duration", "median"),
+    ).reindex(user_ids)
+
+    # Registros por usuario en la semana actual y la anterior
+    per_week = frame.pivot_table(index="user_id", columns="week", values="date", aggfunc="size", fill_value=0)
+    per_week = per_week.reindex(index=user_ids, columns=weeks_index[-2:], fill_value=0)
+    grouped["workouts_delta"] = per_week.iloc[:, 1] - per_week.iloc[:, 0]
+    grouped["median_minutes"] = grouped["median_minutes"] / 60
+
+    return {
+        user_id: {
+            "workouts": int(0 if pd.isna(row.workouts) else row.workouts),
+            "avg_effort": _clean(row.avg_effort),
+            "volume": int(0 if pd.isna(row.volume) else row.volume),
+            "median_minutes": _clean(row.median_minutes),
+            "workouts_delta": int(row.workouts_delta),
+        }
+        for user_id, row in grouped.iterrows()
+    }
@@ -1,7 +1,11 @@
+import logging
+
 from django.apps import AppConfig
 from django.conf import settings
 from mongoengine import connect
 
+logger = logging.getLogger(__name__)
+
 
 class FitnessConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -12,7 +16,32 @@ class FitnessConfig(AppConfig):
         Configure the MongoEngine connection for the fitness app.
         Uses settings.MONGO_URL and binds to alias 'fitness'.
         """
+        from fitness import signals  # noqa: F401  (contadores de accounts.User)
+
         mongo_url = getattr(settings, "MONGO_URL", None)
         if mongo_url:
             # You can reuse the same Mongo URL & DB name from MONGO_URL
-            connect(host=mongo_url, alias="fitness")
\ No newline at end of file
+            connect(host=mongo_url, alias="fitness")
+
+    def warm_up(self):
+        """
+        Trabajo de arranque con I/O a MongoDB: crea la colección time-series si
+        hace falta y precarga el catálogo de ejercicios. Solo lo llaman
+        universidad_fit/wsgi.py y asgi.py, así que migrate, check y demás
+        comandos no esperan a MongoDB; sin precarga el catálogo se carga en
+        el primer acceso.
+        """
+        if not getattr(settings, "MONGO_URL", None):
+            return
+
+        from fitness.timeseries import timeseries_enabled, ensure_timeseries_collection
+        if timeseries_enabled():
+            from mongoengine.connection import get_db
+            try:
+                ensure_timeseries_collection(get_db("fitness"))
+            except Exception as e:  # MongoDB puede no estar disponible al arrancar
+                logger.warning("No se pudo crear la colección time-series de progreso: %s", e)
+
+        if getattr(settings, "FITNESS_CATALOG_WARMUP", True):
+            from fitness.catalog import catalog
+            catalog.warm_up()
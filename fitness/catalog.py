@@ -0,0 +1,236 @@
+"""
+Caché en memoria (por proceso) del catálogo de ejercicios.
+
+Cada worker guarda un registro compacto por ejercicio, la lista ordenada por
+nombre, los índices por `type` y `difficulty` y la lista ordenada por
+`search_name` que usa el autocompletado (fitness/search.py). La copia se invalida comparando contra
+CatalogVersion("exercises"), que Exercise.save()/delete() incrementa, así que
+todos los workers de gunicorn ven los cambios sin un servidor de caché
+compartido. Si el catálogo supera FITNESS_CATALOG_MAX_ENTRIES no se cachea y
+las lecturas van directo a MongoDB.
+"""
+
+import bisect
+import logging
+import re
+import threading
+import time
+
+from bson import ObjectId
+from django.conf import settings
+
+from fitness.models import CatalogVersion, Exercise, normalize_search
+from fitness.pagination import Page, decode_cursor, encode_cursor, paginate_queryset, paginate_sorted
+
+logger = logging.getLogger(__name__)
+
+RECORD_FIELDS = ("name", "type", "difficulty", "duration", "description", "video_url", "created_by", "search_name")
+
+
+def _record(doc):
+    """Registro compacto a partir de un documento crudo de pymongo."""
+    record = {"id": str(doc["_id"])}
+    for field in RECORD_FIELDS:
+        record[field] = doc.get(field)
+    if record["search_name"] is None:  # ejercicios anteriores a search_name
+        record["search_name"] = normalize_search(record["name"])
+    return record
+
+
+def _search_key(record):
+    return (record["search_name"], record["id"])
+
+
+def _sort_key(record):
+    # Mismo orden que sort([("name", 1), ("_id", 1)]) en MongoDB
+    return (record["name"] or "", record["id"])
+
+
+class ExerciseCatalog:
+
+    def __init__(self, max_entries=None, check_interval=None):
+        self.max_entries = max_entries if max_entries is not None else getattr(
+            settings, "FITNESS_CATALOG_MAX_ENTRIES", 10000)
+        self.check_interval = check_interval if check_interval is not None else getattr(
+            settings, "FITNESS_CATALOG_CHECK_INTERVAL", 1.0)
+
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = 0.0
+        self._oversized = False
+        self._records = {}
+        self._sorted = []
+        self._by_type = {}
+        self._by_difficulty = {}
+        self._search_index = ([], [])  # (registros, claves) ordenados por (search_name, id)
+
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    # ----- carga / invalidación -----
+
+    def _load(self, version):
+        collection = Exercise._get_collection()
+        projection = {field: 1 for field in RECORD_FIELDS}
+        docs = list(collection.find({}, projection).limit(self.max_entries + 1))
+
+        if len(docs) > self.max_entries:
+            logger.warning("Catálogo de ejercicios supera %s entradas; no se cachea.", self.max_entries)
+            self._oversized = True
+            self._records, self._sorted, self._by_type, self._by_difficulty = {}, [], {}, {}
+            self._search_index = ([], [])
+        else:
+            records = sorted((_record(doc) for doc in docs), key=_sort_key)
+            by_type, by_difficulty = {}, {}
+            for record in records:
+                by_type.setdefault(record["type"], []).append(record)
+                by_difficulty.setdefault(record["difficulty"], []).append(record)
+
+            self._oversized = False
+            self._records = {record["id"]: record for record in records}
+            self._sorted = records
+            self._by_type = by_type
+            self._by_difficulty = by_difficulty
+            by_search = sorted(records, key=_search_key)
+            self._search_index = (by_search, [_search_key(record) for record in by_search])
+
+        self._version = version
+        self.reloads += 1
+
+    def _ensure_fresh(self):
+        """Devuelve True si la copia en memoria es utilizable."""
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < self.check_interval:
+            self.hits += 1
+            return not self._oversized
+
+        with self._lock:
+            version = CatalogVersion.current("exercises")
+            self._checked_at = time.monotonic()
+            if version == self._version:
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._load(version)
+        return not self._oversized
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+            self._checked_at = 0.0
+
+    def warm_up(self):
+        try:
+            self._ensure_fresh()
+        except Exception as e:  # MongoDB puede no estar disponible al arrancar
+            logger.warning("No se pudo precargar el catálogo de ejercicios: %s", e)
+
+    # ----- lecturas -----
+
+    def all(self):
+        """Todos los ejercicios ordenados por nombre."""
+        if self._ensure_fresh():
+            return self._sorted
+        docs = Exercise._get_collection().find({}, {f: 1 for f in RECORD_FIELDS}).sort([("name", 1), ("_id", 1)])
+        return [_record(doc) for doc in docs]
+
+    def filter(self, type=None, difficulty=None):
+        """Ejercicios ordenados por nombre filtrados por tipo y/o dificultad."""
+        if not self._ensure_fresh():
+            query = {}
+            if type:
+                query["type"] = type
+            if difficulty:
+                query["difficulty"] = difficulty
+            docs = Exercise._get_collection().find(query, {f: 1 for f in RECORD_FIELDS}).sort([("name", 1), ("_id", 1)])
+            return [_record(doc) for doc in docs]
+
+        if type and difficulty:
+            return [r for r in self._by_type.get(type, []) if r["difficulty"] == difficulty]
+        if type:
+            return self._by_type.get(type, [])
+        if difficulty:
+            return self._by_difficulty.get(difficulty, [])
+        return self._sorted
+
+    def page(self, type=None, difficulty=None, search=None, cursor=None, page_size=20):
+        """Página por cursor sobre (name, id) con filtros aplicados en el servidor."""
+        if not self._ensure_fresh():
+            queryset = Exercise.objects()
+            if type:
+                queryset = queryset.filter(type=type)
+            if difficulty:
+                queryset = queryset.filter(difficulty=difficulty)
+            if search:
+                needle = re.escape(normalize_search(search))
+                queryset = queryset.filter(__raw__={"search_name": {"$regex": needle}})
+            return paginate_queryset(queryset, "name", cursor, page_size, descending=False)
+
+        records = self.filter(type=type, difficulty=difficulty)
+        if search:
+            needle = normalize_search(search)
+            records = [r for r in records if needle in r["search_name"]]
+        return paginate_sorted(records, "name", cursor, page_size)
+
+    def prefix_page(self, prefix, type=None, difficulty=None, cursor=None, page_size=10):
+        """
+        Autocompletar en memoria: bisección sobre (search_name, id) y recorrido
+        solo del rango que empieza por `prefix`. None si el catálogo no está
+        cacheado (el llamador consulta MongoDB).
+        """
+        if not self._ensure_fresh():
+            return None
+        records, keys = self._search_index
+
+        start = bisect.bisect_left(keys, (prefix, ""))
+        after = decode_cursor(cursor)
+        if after is not None:
+            start = max(start, bisect.bisect_right(keys, (after[0] or "", after[1])))
+
+        items = []
+        for record in records[start:]:
+            if not record["search_name"].startswith(prefix):
+                break
+            if (type and record["type"] != type) or (difficulty and record["difficulty"] != difficulty):
+                continue
+            items.append(record)
+            if len(items) > page_size:
+                break
+
+        next_cursor = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            next_cursor = encode_cursor(items[-1]["search_name"], items[-1]["id"])
+        return Page(items, next_cursor)
+
+    def get_many(self, ids):
+        """
+        {id: registro} para los IDs pedidos. Los que no estén en memoria se
+        buscan con un único `$in`.
+        """
+        ids = {str(i) for i in ids}
+        found = {}
+        if self._ensure_fresh():
+            found = {i: self._records[i] for i in ids if i in self._records}
+
+        pending = [ObjectId(i) for i in ids - found.keys() if ObjectId.is_valid(i)]
+        if pending:
+            projection = {f: 1 for f in RECORD_FIELDS}
+            for doc in Exercise._get_collection().find({"_id": {"$in": pending}}, projection):
+                record = _record(doc)
+                found[record["id"]] = record
+        return found
+
+    def stats(self):
+        return {
+            "version": self._version,
+            "size": len(self._records),
+            "oversized": self._oversized,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+        }
+
+
+catalog = ExerciseCatalog()
@@ -0,0 +1,232 @@
+"""
+Contadores agregados de la plataforma (usuarios en PostgreSQL, rutinas y
+progreso en MongoDB).
+
+Cada clave es un documento Counter con un dict de valores: "platform" guarda
+los totales globales y "user:<id>" los de un usuario (rutinas creadas,
+registros de progreso y, para entrenadores, los totales de su bandeja; ver
+fitness/inbox.py). Las escrituras
+aplican un $inc atómico desde las señales de accounts.User (fitness/signals.py)
+y los hooks de Routine/Progress, así que leer el panel de administración es un
+find_one por _id sin importar el tamaño de las tablas. Lo que se escape de los
+hooks (inserciones directas, cambios del tipo de empleado, fallos de MongoDB)
+lo corrige reconcile_counters.
+"""
+
+from datetime import datetime
+
+from django.db.models import Count, Q
+from pymongo import UpdateOne
+
+from accounts.models import User
+from fitness.models import Counter, Progress, Routine
+from fitness.timeseries import timeseries_enabled
+
+PLATFORM = "platform"
+TRAINER_EMPLOYEE_TYPE = "Instructor"
+
+ROLE_FIELDS = {"STUDENT": "students", "EMPLOYEE": "employees", "ADMIN": "admins"}
+USER_FIELDS = ("users", "students", "employees", "admins", "trainers")
+MONGO_FIELDS = ("routines", "progress")
+PLATFORM_FIELDS = USER_FIELDS + MONGO_FIELDS
+
+
+def user_key(user_id):
+    return f"user:{user_id}"
+
+
+# ===== escrituras =====
+
+def increment(key, deltas):
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    Counter._get_collection().update_one(
+        {"_id": key},
+        {
+            "$inc": {f"values.{field}": delta for field, delta in deltas.items()},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+        upsert=True,
+    )
+
+
+def is_trainer(user):
+    return (
+        user.role == "EMPLOYEE"
+        and user.employee_id is not None
+        and user.employee.employee_type_id == TRAINER_EMPLOYEE_TYPE
+    )
+
+
+def user_fields(user):
+    """Campos de "platform" en los que cuenta `user`."""
+    fields = {"users"}
+    if user.role in ROLE_FIELDS:
+        fields.add(ROLE_FIELDS[user.role])
+    if is_trainer(user):
+        fields.add("trainers")
+    return fields
+
+
+def user_changed(before, after):
+    """`before`/`after` son conjuntos de user_fields(); vacíos al crear o borrar."""
+    deltas = {field: 1 for field in after - before}
+    deltas.update({field: -1 for field in before - after})
+    increment(PLATFORM, deltas)
+
+
+def users_created(users):
+    """
+    Equivale a user_changed(set(), user_fields(user)) por cada usuario, con un
+    solo $inc. Para las altas con bulk_create, que no emiten post_save.
+    """
+    deltas = {}
+    for user in users:
+        for field in user_fields(user):
+            deltas[field] = deltas.get(field, 0) + 1
+    increment(PLATFORM, deltas)
+
+
+def routine_created(routine):
+    increment(PLATFORM, {"routines": 1})
+    increment(user_key(routine.created_by), {"routines": 1})
+
+
+def routine_deleted(routine):
+    increment(PLATFORM, {"routines": -1})
+    increment(user_key(routine.created_by), {"routines": -1})
+
+
+def _progress_changed(entries, sign):
+    increment(PLATFORM, {"progress": sign * len(entries)})
+    by_user = {}
+    for entry in entries:
+        by_user[entry.user_id] = by_user.get(entry.user_id, 0) + 1
+    for user_id, count in by_user.items():
+        increment(user_key(user_id), {"progress": sign * count})
+
+
+def progress_created(entries):
+    _progress_changed(entries, 1)
+
+
+def progress_deleted(entries):
+    _progress_changed(entries, -1)
+
+
+# ===== lecturas =====
+
+def read_many(keys):
+    """{clave: valores} con una sola consulta; las claves sin documento devuelven {}."""
+    keys = list(keys)
+    found = {doc["_id"]: doc.get("values", {}) for doc in Counter._get_collection().find({"_id": {"$in": keys}})}
+    return {key: found.get(key, {}) for key in keys}
+
+
+def platform_totals():
+    """
+    Totales de la plataforma. Si falta algún campo (primer arranque, antes de
+    reconciliar) se calcula una vez y se guarda; los totales de MongoDB usan
+    estimated_document_count, que lee los metadatos de la colección.
+    """
+    values = dict(read_many([PLATFORM])[PLATFORM])
+    missing = [field for field in PLATFORM_FIELDS if field not in values]
+    if not missing:
+        return values
+
+    computed = {}
+    if any(field in USER_FIELDS for field in missing):
+        computed.update(user_totals())
+    if any(field in MONGO_FIELDS for field in missing):
+        computed.update(mongo_totals(exact=False))
+    seeded = {field: computed[field] for field in missing}
+
+    # Solo se fijan los campos ausentes, sin pisar los $inc que lleguen mientras tanto
+    Counter._get_collection().update_one(
+        {"_id": PLATFORM},
+        {"$set": {**{f"values.{field}": value for field, value in seeded.items()},
+                  "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+    values.update(seeded)
+    return values
+
+
+# ===== conteos exactos (reconciliación) =====
+
+def user_totals():
+    """Todos los totales de usuarios con una sola consulta SQL."""
+    return User.objects.aggregate(
+        users=Count("pk"),
+        students=Count("pk", filter=Q(role="STUDENT")),
+        employees=Count("pk", filter=Q(role="EMPLOYEE")),
+        admins=Count("pk", filter=Q(role="ADMIN")),
+        trainers=Count("pk", filter=Q(role="EMPLOYEE", employee__employee_type_id=TRAINER_EMPLOYEE_TYPE)),
+    )
+
+
+def _count(collection, exact):
+    # Las colecciones time-series son vistas: estimated_document_count no las admite
+    if exact or timeseries_enabled() and collection.name == Progress._get_collection().name:
+        return collection.count_documents({})
+    return collection.estimated_document_count()
+
+
+def mongo_totals(exact=True):
+    return {
+        "routines": _count(Routine._get_collection(), exact),
+        "progress": _count(Progress._get_collection(), exact),
+    }
+
+
+def routines_by_user():
+    pipeline = [{"$group": {"_id": "$created_by", "routines": {"$sum": 1}}}]
+    return {row["_id"]: row["routines"] for row in Routine._get_collection().aggregate(pipeline) if row["_id"]}
+
+
+def progress_by_user():
+    pipeline = [{"$group": {"_id": "$user_id", "progress": {"$sum": 1}}}]
+    return {row["_id"]: row["progress"] for row in Progress._get_collection().aggregate(pipeline) if row["_id"]}
+
+
+def reconcile():
+    """
+    Reescribe todos los contadores con conteos exactos. Devuelve
+    {clave: {campo: (antes, después)}} solo para los valores que habían derivado.
+    """
+    collection = Counter._get_collection()
+    current = {doc["_id"]: doc.get("values", {}) for doc in collection.find({}, {"values": 1})}
+    now = datetime.utcnow()
+
+    from fitness import inbox
+
+    expected = {PLATFORM: {**user_totals(), **mongo_totals(exact=True)}}
+    for user_id, routines in routines_by_user().items():
+        expected[user_key(user_id)] = {"routines": routines}
+    for user_id, progress in progress_by_user().items():
+        expected.setdefault(user_key(user_id), {})["progress"] = progress
+    for trainer_id, totals in inbox.trainer_expected_totals().items():
+        expected.setdefault(user_key(trainer_id), {}).update(totals)
+    for key, values in current.items():
+        if key.startswith("user:"):
+            stale = expected.setdefault(key, {})
+            for field in values:
+                stale.setdefault(field, 0)
+
+    drift = {}
+    operations = []
+    for key, values in expected.items():
+        before = current.get(key, {})
+        changed = {field: (before.get(field), value) for field, value in values.items() if before.get(field) != value}
+        if changed:
+            drift[key] = changed
+        operations.append(UpdateOne(
+            {"_id": key},
+            {"$set": {**{f"values.{field}": value for field, value in values.items()},
+                      "updated_at": now, "reconciled_at": now}},
+            upsert=True,
+        ))
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    return drift
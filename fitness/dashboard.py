@@ -0,0 +1,120 @@
+"""
+Datos del dashboard del estudiante en un solo viaje a MongoDB.
+
+Se parte de las rutinas del usuario, se unen con $unionWith sus registros de
+progreso, su UserActivitySummary y su documento de contadores, y un $facet
+separa las ramas. Cada rama ordena y corta a RECENT_LIMIT dentro de su propio
+pipeline (sobre los índices (created_by, -created_at, -id) y
+(user_id, -date, -id)), así que el $facet recibe a lo sumo unos pocos
+documentos sin importar cuánto historial tenga el usuario. Los totales salen
+de los contadores "user:<id>" (fitness/counters.py) en lugar de un $count, y
+el resumen de actividad da la racha y los entrenamientos de la semana ISO
+actual, mantenidos al escribir. Cada rama proyecta solo lo que pinta
+student_dashboard.html.
+"""
+
+from datetime import datetime
+
+from fitness import activity, adoption, counters
+from fitness.models import Counter, Progress, Routine, UserActivitySummary
+
+RECENT_LIMIT = 5
+
+
+def dashboard_pipeline(user_id, now):
+    progress_kind = {"kind": "progress"}
+    routine_kind = {"kind": "routine"}
+
+    return [
+        {"$match": {"created_by": user_id}},
+        {"$sort": {"created_at": -1, "_id": -1}},
+        {"$limit": RECENT_LIMIT},
+        {"$project": {
+            "_id": 0,
+            "kind": {"$literal": "routine"},
+            "id": {"$toString": "$_id"},
+            "name": 1,
+            "description": 1,
+            "is_template": 1,
+            "adopted_from": 1,
+            "created_at": 1,
+            "exercise_count": {"$size": {"$ifNull": ["$exercises", []]}},
+        }},
+        {"$unionWith": {
+            "coll": Progress._get_collection_name(),
+            "pipeline": [
+                {"$match": {"user_id": user_id}},
+                {"$sort": {"date": -1, "_id": -1}},
+                {"$limit": RECENT_LIMIT},
+                {"$project": {
+                    "_id": 0,
+                    "kind": {"$literal": "progress"},
+                    "id": {"$toString": "$_id"},
+                    "date": 1,
+                    "routine_id": 1,
+                    "exercise_id": 1,
+                    "repetitions": 1,
+                    "duration": 1,
+                    "effort_level": 1,
+                }},
+            ],
+        }},
+        {"$unionWith": {
+            "coll": UserActivitySummary._get_collection_name(),
+            "pipeline": [
+                {"$match": {"_id": user_id}},
+                {"$project": {
+                    "_id": 0,
+                    "kind": {"$literal": "summary"},
+                    "current_streak": 1,
+                    "last_workout_date": 1,
+                    f"weekly_counts.{activity.week_key(now)}": 1,
+                }},
+            ],
+        }},
+        {"$unionWith": {
+            "coll": Counter._get_collection_name(),
+            "pipeline": [
+                {"$match": {"_id": counters.user_key(user_id)}},
+                {"$project": {"_id": 0, "kind": {"$literal": "counters"}, "values": 1}},
+            ],
+        }},
+        {"$facet": {
+            "recent_routines": [
+                {"$match": routine_kind},
+                {"$sort": {"created_at": -1}},
+                {"$limit": RECENT_LIMIT},
+            ],
+            "recent_progress": [
+                {"$match": progress_kind},
+                {"$sort": {"date": -1}},
+                {"$limit": RECENT_LIMIT},
+            ],
+            "summary": [{"$match": {"kind": "summary"}}],
+            "counters": [{"$match": {"kind": "counters"}}],
+        }},
+    ]
+
+
+def student_dashboard_data(user_id, now=None):
+    now = now or datetime.utcnow()
+    result = next(Routine._get_collection().aggregate(dashboard_pipeline(user_id, now)), {})
+    summary = (result.get("summary") or [None])[0]
+    totals = (result.get("counters") or [{}])[0].get("values", {})
+
+    # Las adopciones enlazadas no guardan ejercicios: se cuentan en su plantilla
+    recent_routines = result.get("recent_routines", [])
+    linked = [r for r in recent_routines if r.get("adopted_from") and not r["exercise_count"]]
+    if linked:
+        counts = adoption.exercise_counts(r["adopted_from"] for r in linked)
+        for routine in linked:
+            routine["exercise_count"] = counts.get(routine["adopted_from"], 0)
+
+    return {
+        "total_routines": totals.get("routines", 0),
+        "total_progress": totals.get("progress", 0),
+        "weekly_workouts": activity.weekly_count(summary, now),
+        "current_streak": activity.streak_as_of(summary, now),
+        "recent_routines": recent_routines,
+        "recent_progress": result.get("recent_progress", []),
+    }
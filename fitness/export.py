@@ -0,0 +1,331 @@
+"""
+Exportación columnar (Parquet) de Progress, Routine y Recommendation para el
+warehouse de analítica.
+
+Cada colección se recorre con un único cursor del servidor sobre el índice
+de `created_at` y las filas se reparten por mes en archivos Parquet
+comprimidos:
+
+    <destino>/<colección>/month=2026-03/part-<run>-0001.parquet
+
+La memoria está acotada: cada partición abierta acumula como mucho
+`row_group_size` filas antes de escribirlas como row group, y no hay más de
+MAX_OPEN_WRITERS archivos abiertos (al pasarse se cierra el menos reciente y,
+si el mes vuelve a aparecer, se abre otra parte).
+
+`manifest.json` registra los archivos escritos y, por colección, la marca
+de agua `watermark`: cada corrida exporta los documentos con
+watermark <= created_at < inicio de la corrida - SAFETY_LAG y deja ese límite
+como la marca siguiente (exportación incremental). `created_at` es la hora de
+escritura que pone la aplicación, no la fecha del registro: un progreso con
+`date` atrasada o una sincronización tardía de un reloj entran en la corrida
+en que se insertaron, cosa que un corte por `_id` o por `date` no garantiza.
+SAFETY_LAG deja fuera los documentos recién creados que todavía pueden estar
+en vuelo (un insert_many de ingest o de un envío masivo arma created_at
+antes de escribir).
+
+Sigue habiendo un hueco: un documento cuyo created_at quede más de
+SAFETY_LAG por detrás del momento en que se vuelve visible (relojes
+desfasados entre servidores de aplicación, escrituras que tardan más que eso
+o datos restaurados con su created_at original) cae por debajo de una marca
+ya exportada y no sale en ninguna corrida incremental; `--full` lo recupera.
+
+El manifiesto se reescribe de forma atómica al terminar cada colección, así
+que los archivos de una colección interrumpida no figuran en él y se vuelven
+a exportar. Los lectores deben guiarse por el manifiesto.
+
+Solo se exportan documentos nuevos: las ediciones de documentos ya
+exportados (por ejemplo, una rutina modificada) requieren `--full`.
+
+pyarrow se importa al usarse; es una dependencia solo del comando.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from fitness.models import Progress, Recommendation, Routine
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+MAX_OPEN_WRITERS = 8
+SAFETY_LAG = timedelta(minutes=5)
+COMPRESSIONS = ("zstd", "snappy", "gzip", "none")
+
+
+class ExportError(Exception):
+    """Falta pyarrow o el destino no es utilizable."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportError("La exportación requiere pyarrow (pip install pyarrow).")
+    return pyarrow
+
+
+def _str(value):
+    return None if value is None else str(value)
+
+
+# ===== esquemas =====
+
+class Table:
+    """Cómo exportar una colección: campos, columna de partición y filas."""
+
+    def __init__(self, name, document, partition_field, fields):
+        self.name = name
+        self.document = document
+        self.partition_field = partition_field
+        self.fields = fields  # [(columna, tipo arrow como texto, conversión)]
+
+    def projection(self):
+        return {column: 1 for column, _, _ in self.fields if column != "_id"}
+
+    def schema(self, pa):
+        return pa.schema([(column, _arrow_type(pa, kind)) for column, kind, _ in self.fields])
+
+    def row(self, doc):
+        return {column: convert(doc.get(column)) for column, _, convert in self.fields}
+
+
+def _arrow_type(pa, kind):
+    if kind == "exercises":
+        return pa.list_(pa.struct([
+            ("exercise_id", pa.string()),
+            ("name", pa.string()),
+            ("sets", pa.int32()),
+            ("reps", pa.int32()),
+            ("rest", pa.int32()),
+        ]))
+    return {
+        "string": pa.string(),
+        "int32": pa.int32(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("ms"),
+    }[kind]
+
+
+def _exercises(rows):
+    return [
+        {
+            "exercise_id": _str(row.get("exercise")),
+            "name": (row.get("snapshot") or {}).get("name"),
+            "sets": row.get("sets"),
+            "reps": row.get("reps"),
+            "rest": row.get("rest"),
+        }
+        for row in rows or []
+    ]
+
+
+def _same(value):
+    return value
+
+
+TABLES = OrderedDict((table.name, table) for table in [
+    Table("progress", Progress, "date", [
+        ("_id", "string", _str),
+        ("user_id", "string", _same),
+        ("routine_id", "string", _same),
+        ("exercise_id", "string", _same),
+        ("date", "timestamp", _same),
+        ("repetitions", "int32", _same),
+        ("duration", "float64", _same),
+        ("effort_level", "int32", _same),
+        ("notes", "string", _same),
+        ("created_at", "timestamp", _same),
+    ]),
+    Table("routines", Routine, "created_at", [
+        ("_id", "string", _str),
+        ("name", "string", _same),
+        ("description", "string", _same),
+        ("created_by", "string", _same),
+        ("user_id", "string", _same),
+        ("is_template", "bool", _same),
+        ("adopted_from", "string", _same),
+        ("exercises", "exercises", _exercises),
+        ("created_at", "timestamp", _same),
+    ]),
+    Table("recommendations", Recommendation, "created_at", [
+        ("_id", "string", _str),
+        ("trainer_id", "string", _same),
+        ("user_id", "string", _same),
+        ("message", "string", _same),
+        ("related_routine_id", "string", _same),
+        ("related_progress_id", "string", _same),
+        ("job_id", "string", _same),
+        ("created_at", "timestamp", _same),
+    ]),
+])
+
+
+# ===== manifiesto =====
+
+def load_manifest(root):
+    path = os.path.join(root, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": MANIFEST_VERSION, "collections": {}, "runs": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(root, manifest):
+    path = os.path.join(root, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# ===== escritura =====
+
+class PartitionWriters:
+    """ParquetWriter por mes con buffers de tamaño fijo y un máximo de archivos abiertos."""
+
+    def __init__(self, pa, root, table, run_id, compression, row_group_size, max_open=MAX_OPEN_WRITERS):
+        self.pa = pa
+        self.root = root
+        self.table = table
+        self.schema = table.schema(pa)
+        self.run_id = run_id
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.max_open = max_open
+        self._open = OrderedDict()  # month -> [writer, path, rows_escritas, buffer]
+        self._parts = {}
+        self.files = []
+
+    def add(self, month, row):
+        entry = self._open.get(month)
+        if entry is None:
+            entry = self._open_partition(month)
+        else:
+            self._open.move_to_end(month)
+        entry[3].append(row)
+        if len(entry[3]) >= self.row_group_size:
+            self._flush(entry)
+
+    def _open_partition(self, month):
+        if len(self._open) >= self.max_open:
+            oldest, entry = self._open.popitem(last=False)
+            self._close(oldest, entry)
+
+        self._parts[month] = self._parts.get(month, 0) + 1
+        directory = os.path.join(self.root, self.table.name, f"month={month}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{self.run_id}-{self._parts[month]:04d}.parquet")
+        writer = self.pa.parquet.ParquetWriter(path, self.schema, compression=self.compression)
+        entry = self._open[month] = [writer, path, 0, []]
+        return entry
+
+    def _flush(self, entry):
+        if entry[3]:
+            entry[0].write_table(self.pa.Table.from_pylist(entry[3], schema=self.schema))
+            entry[2] += len(entry[3])
+            entry[3] = []
+
+    def _close(self, month, entry):
+        self._flush(entry)
+        entry[0].close()
+        self.files.append({
+            "path": os.path.relpath(entry[1], self.root),
+            "month": month,
+            "rows": entry[2],
+            "bytes": os.path.getsize(entry[1]),
+        })
+
+    def close(self):
+        while self._open:
+            month, entry = self._open.popitem(last=False)
+            self._close(month, entry)
+        return self.files
+
+
+def _window_filter(state, since, cutoff):
+    """Documentos con created_at en [marca anterior, cutoff)."""
+    if state.get("watermark"):
+        return {"created_at": {"$gte": datetime.fromisoformat(state["watermark"]), "$lt": cutoff}}
+    if state.get("last_id"):
+        # Manifiesto de antes de la marca por created_at: una última vez por _id
+        return {"_id": {"$gt": ObjectId(state["last_id"])}, "created_at": {"$lt": cutoff}}
+    if since:
+        return {"created_at": {"$gte": since, "$lt": cutoff}}
+    # Primera corrida: también los documentos antiguos sin created_at
+    return {"$or": [{"created_at": {"$lt": cutoff}}, {"created_at": None}]}
+
+
+def export_table(pa, root, table, state, run_id, cutoff, since=None, batch_size=5000,
+                 row_group_size=50000, compression="zstd", on_batch=None):
+    """
+    Exporta los documentos creados entre la marca de `state` y `cutoff`.
+    Devuelve el estado actualizado (watermark, files, rows) sin tocar el
+    manifiesto.
+    """
+    query = _window_filter(state, since, cutoff)
+    cursor = (
+        table.document._get_collection()
+        .find(query, table.projection(), no_cursor_timeout=True)
+        .sort("created_at", 1)
+        .batch_size(batch_size)
+    )
+
+    writers = PartitionWriters(pa, root, table, run_id, compression, row_group_size)
+    rows = 0
+    try:
+        for doc in cursor:
+            moment = doc.get(table.partition_field) or doc["_id"].generation_time
+            writers.add(moment.strftime("%Y-%m"), table.row(doc))
+            rows += 1
+            if on_batch and rows % batch_size == 0:
+                on_batch(table.name, rows)
+    finally:
+        cursor.close()
+        files = writers.close()
+
+    updated = {key: value for key, value in state.items() if key not in ("last_id", "last_date")}
+    updated["watermark"] = cutoff.isoformat()
+    updated["files"] = state.get("files", []) + [{**f, "run": run_id} for f in files]
+    updated["rows"] = state.get("rows", 0) + rows
+    return updated, rows
+
+
+def run_export(root, collections=None, since=None, full=False, batch_size=5000,
+               row_group_size=50000, compression="zstd", on_batch=None, lag=SAFETY_LAG):
+    """Exporta las colecciones pedidas y actualiza el manifiesto. Devuelve {colección: filas}."""
+    pa = _pyarrow()
+    if compression not in COMPRESSIONS:
+        raise ExportError(f"Compresión desconocida: {compression}.")
+    os.makedirs(root, exist_ok=True)
+
+    manifest = load_manifest(root)
+    started_at = datetime.utcnow()
+    run_id = started_at.strftime("%Y%m%dT%H%M%S")
+    cutoff = started_at - lag
+    counts = {}
+
+    for name in collections or list(TABLES):
+        table = TABLES[name]
+        state = {} if full else manifest["collections"].get(name, {})
+        state, rows = export_table(pa, root, table, state, run_id, cutoff, since=since, batch_size=batch_size,
+                                   row_group_size=row_group_size, compression=compression, on_batch=on_batch)
+        state["exported_at"] = datetime.utcnow().isoformat()
+        manifest["collections"][name] = state
+        counts[name] = rows
+        save_manifest(root, manifest)  # una colección terminada no se repite si falla la siguiente
+
+    manifest["runs"].append({
+        "run": run_id,
+        "started_at": started_at.isoformat(),
+        "finished_at": datetime.utcnow().isoformat(),
+        "full": full,
+        "rows": counts,
+    })
+    save_manifest(root, manifest)
+    return counts
@@ -0,0 +1,224 @@
+"""
+Envío masivo de recomendaciones (un mensaje a un grupo de usuarios).
+
+La petición web solo resuelve los destinatarios (una consulta SQL) y crea un
+RecommendationJob; la entrega corre en un pool de hilos del proceso y escribe
+las recomendaciones por lotes con insert_many, actualizando `delivered` tras
+cada lote para que el cliente consulte el avance.
+
+Si el proceso se reinicia a mitad de un envío, `resume_recommendation_jobs`
+lo retoma desde `delivered`; las recomendaciones del lote que estaba en curso
+se detectan por (job_id, user_id) y no se duplican. Cada hook del lote
+(bandeja del entrenador y notificaciones) se anota en `hooks_done` al
+terminar, así que al retomar se vuelven a aplicar a las ya escritas solo los
+que no llegaron a correr: ni se pierden avisos ni se cuentan dos veces. Si el
+proceso cae entre un hook y su anotación, ese hook se repite para el lote;
+rebuild_trainer_inbox corrige los totales de la bandeja.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from bson import ObjectId
+from django.conf import settings
+from django.db.models import Q
+
+from accounts.models import STUDENT_FACULTY, User
+from fitness import inbox, notifications
+from fitness.models import Recommendation, RecommendationJob
+
+logger = logging.getLogger(__name__)
+
+TARGET_FIELDS = ("user_ids", "nrc", "campus", "faculty")
+MAX_USER_IDS = 5000
+BATCH_HOOKS = (
+    ("inbox", inbox.recommendations_created),
+    ("notifications", notifications.recommendations_sent),
+)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class FanoutError(Exception):
+    """Destinatarios o mensaje inválidos."""
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "FITNESS_FANOUT_WORKERS", 2),
+                thread_name_prefix="fitness-fanout",
+            )
+        return _executor
+
+
+# ===== destinatarios =====
+
+def clean_targets(targets):
+    if not isinstance(targets, dict) or not targets:
+        raise FanoutError("Se esperaba un objeto 'targets' con user_ids, nrc, campus o faculty.")
+    unknown = set(targets) - set(TARGET_FIELDS)
+    if unknown:
+        raise FanoutError(f"Destinos desconocidos: {', '.join(sorted(unknown))}.")
+
+    cleaned = {}
+    user_ids = targets.get("user_ids")
+    if user_ids:
+        if not isinstance(user_ids, list) or len(user_ids) > MAX_USER_IDS:
+            raise FanoutError(f"'user_ids' debe ser una lista de máximo {MAX_USER_IDS} usuarios.")
+        cleaned["user_ids"] = sorted({str(user_id) for user_id in user_ids})
+    if targets.get("nrc"):
+        cleaned["nrc"] = str(targets["nrc"])
+    for field in ("campus", "faculty"):
+        if targets.get(field) not in (None, ""):
+            try:
+                cleaned[field] = int(targets[field])
+            except (TypeError, ValueError):
+                raise FanoutError(f"'{field}' debe ser un código numérico.")
+    if not cleaned:
+        raise FanoutError("Debe indicar al menos un destino.")
+    return cleaned
+
+
+def resolve_targets(targets):
+    """
+    Usernames activos que cubren la unión de los destinos, con una sola consulta.
+    NRC, campus y facultad se limitan a estudiantes; la facultad de un
+    estudiante es la de los programas en los que tiene grupos inscritos.
+    """
+    students = Q()
+    if "nrc" in targets:
+        students |= Q(student__enrollment__group_id=targets["nrc"])
+    if "campus" in targets:
+        students |= Q(student__campus_id=targets["campus"])
+    if "faculty" in targets:
+        students |= Q(**{STUDENT_FACULTY: targets["faculty"]})
+
+    query = Q()
+    if students:
+        query |= Q(role="STUDENT") & students
+    if "user_ids" in targets:
+        query |= Q(pk__in=targets["user_ids"])
+
+    return list(
+        User.objects.filter(query, is_active=True)
+        .order_by("username")
+        .values_list("username", flat=True)
+        .distinct()
+    )
+
+
+# ===== trabajos =====
+
+def start_fanout(trainer_id, message, targets, related_routine_id=None):
+    """Crea el trabajo y lo encola; vuelve de inmediato."""
+    message = (message or "").strip()
+    if not message:
+        raise FanoutError("El mensaje es obligatorio.")
+    targets = clean_targets(targets)
+    user_ids = resolve_targets(targets)
+
+    job = RecommendationJob(
+        trainer_id=trainer_id,
+        message=message,
+        related_routine_id=related_routine_id or None,
+        targets=targets,
+        user_ids=user_ids,
+        total=len(user_ids),
+        status="pending" if user_ids else "done",
+        finished_at=None if user_ids else datetime.utcnow(),
+    )
+    job.save()
+    if user_ids:
+        submit(job.id)
+    return job
+
+
+def submit(job_id):
+    _get_executor().submit(_run_safely, job_id)
+
+
+def _run_safely(job_id):
+    try:
+        deliver(job_id)
+    except Exception as e:
+        logger.exception("Falló el envío masivo %s", job_id)
+        RecommendationJob._get_collection().update_one(
+            {"_id": job_id},
+            {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.utcnow()}},
+        )
+
+
+def deliver(job_id, batch_size=None):
+    """Entrega los destinatarios pendientes del trabajo, lote por lote."""
+    batch_size = batch_size or getattr(settings, "FITNESS_FANOUT_BATCH_SIZE", 500)
+    jobs = RecommendationJob._get_collection()
+    job = jobs.find_one_and_update(
+        {"_id": job_id, "status": {"$in": ["pending", "running"]}},
+        {"$set": {"status": "running", "started_at": datetime.utcnow()}},
+    )
+    if job is None:
+        return
+
+    recommendations = Recommendation._get_collection()
+    user_ids = job["user_ids"]
+    position = job.get("delivered", 0)
+    resuming = job["status"] == "running"  # documento previo al update: ya se había empezado
+
+    while position < len(user_ids):
+        batch_ids = user_ids[position:position + batch_size]
+        written, hooked = [], set()
+        if resuming:
+            # El lote en curso al interrumpirse puede estar escrito y enganchado a medias
+            written = [
+                Recommendation._from_son(doc)
+                for doc in recommendations.find({"job_id": str(job_id), "user_id": {"$in": batch_ids}})
+            ]
+            done = {r.user_id for r in written}
+            batch_ids = [user_id for user_id in batch_ids if user_id not in done]
+            hooked = set(job.get("hooks_done") or [])
+            resuming = False
+
+        now = datetime.utcnow()
+        batch = [
+            Recommendation(
+                id=ObjectId(),
+                trainer_id=job["trainer_id"],
+                user_id=user_id,
+                message=job["message"],
+                related_routine_id=job.get("related_routine_id"),
+                job_id=str(job_id),
+                created_at=now,
+            )
+            for user_id in batch_ids
+        ]
+        if batch:
+            recommendations.insert_many([r.to_mongo() for r in batch], ordered=False)
+        for name, hook in BATCH_HOOKS:
+            pending = batch if name in hooked else written + batch
+            if pending:
+                hook(pending)
+                jobs.update_one({"_id": job_id}, {"$addToSet": {"hooks_done": name}})
+
+        position = min(position + batch_size, len(user_ids))
+        jobs.update_one({"_id": job_id}, {"$set": {"delivered": position, "hooks_done": []}})
+
+    jobs.update_one({"_id": job_id}, {"$set": {"status": "done", "finished_at": datetime.utcnow()}})
+
+
+def job_status(job):
+    return {
+        "job_id": str(job.id),
+        "status": job.status,
+        "total": job.total,
+        "delivered": job.delivered,
+        "progress": round(job.delivered * 100 / job.total, 1) if job.total else 100.0,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
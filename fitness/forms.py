@@ -20,6 +20,8 @@ class ExerciseForm(forms.Form):
 # fitness/forms.py
 from django import forms
 
+from fitness.routine_payload import parse_exercise_rows, resolve_exercise_rows
+
 class RoutineForm(forms.Form):
     name = forms.CharField(max_length=120, required=True, label="Nombre",)
 
@@ -37,40 +39,16 @@ class RoutineForm(forms.Form):
         exercises[1][sets]
         exercises[1][reps]
         exercises[1][rest]
-        """
-
-        raw = self.data  # request.POST original
-        prefix = "exercises["
-
-        parsed = {}  # {"1": {"exercise_id": "...", "sets": "..."}}
-
-        for key in raw:
-            if key.startswith(prefix):
-                # "exercises[3][reps]" -> row="3", field="reps"
-                row = key.split("[")[1].split("]")[0]
-                field = key.split("[")[2].split("]")[0]
-
-                if row not in parsed:
-                    parsed[row] = {}
-
-                parsed[row][field] = raw.get(key)
 
-        result = []
-
-        for row_id, fields in parsed.items():
-            exercise_id = fields.get("exercise_id")
-
-            if not exercise_id:
-                continue  # ignorar filas vacías
+        Devuelve la lista de RoutineExercise ya resuelta (una sola consulta
+        a MongoDB para todos los ejercicios).
+        """
 
-            entry = {
-                "exercise_id": exercise_id,
-                "sets": int(fields["sets"]) if fields.get("sets") else None,
-                "reps": int(fields["reps"]) if fields.get("reps") else None,
-                "rest": int(fields["rest"]) if fields.get("rest") else None,
-            }
+        rows = parse_exercise_rows(self.data)  # request.POST original
+        result, errors = resolve_exercise_rows(rows)
 
-            result.append(entry)
+        if errors:
+            raise forms.ValidationError(errors)
 
         if not result:
             raise forms.ValidationError(
@@ -78,3 +56,13 @@ class RoutineForm(forms.Form):
             )
 
         return result
+
+
+class RecommendationForm(forms.Form):
+    message = forms.CharField(widget=forms.Textarea(attrs={"rows": 6}), label="Mensaje")
+    related_routine_id = forms.CharField(required=False)
+    related_progress_id = forms.CharField(required=False)
+
+
+class FollowUpForm(forms.Form):
+    comment = forms.CharField(widget=forms.Textarea(attrs={"rows": 4}), label="Comentario")
@@ -0,0 +1,269 @@
+"""
+Bandeja del entrenador.
+
+Cada par (entrenador, usuario) tiene un TrainerInboxEntry que se actualiza al
+escribir recomendaciones, seguimientos y progreso; los totales del entrenador
+(usuarios atendidos, recomendaciones enviadas, seguimientos abiertos) viven
+en su contador "user:<id>" (fitness/counters.py). Así trainer_dashboard lee
+un contador y una página de la bandeja, sin importar cuántos alumnos o
+cuánto historial tenga el entrenador.
+
+Un usuario queda asignado a un entrenador en cuanto este le envía una
+recomendación o un seguimiento.
+"""
+
+from datetime import datetime
+
+from pymongo import ReturnDocument, UpdateMany, UpdateOne
+
+from fitness import counters
+from fitness.models import FollowUp, Progress, Recommendation, TrainerInboxEntry
+from fitness.pagination import paginate_queryset
+
+
+def _touch(trainer_id, user_id, update, when):
+    """Upsert de la entrada; devuelve True si el usuario es nuevo para el entrenador."""
+    update.setdefault("$set", {})["updated_at"] = when
+    update["$setOnInsert"] = {"created_at": when}
+    result = TrainerInboxEntry._get_collection().update_one(
+        {"trainer_id": trainer_id, "user_id": user_id}, update, upsert=True)
+    return result.upserted_id is not None
+
+
+# ===== escrituras =====
+
+def recommendations_created(recommendations):
+    """Acepta lotes (envíos masivos): una escritura por par y un $inc por entrenador."""
+    latest = {}
+    sent = {}
+    for recommendation in recommendations:
+        pair = (recommendation.trainer_id, recommendation.user_id)
+        sent[pair] = sent.get(pair, 0) + 1
+        if pair not in latest or recommendation.created_at >= latest[pair].created_at:
+            latest[pair] = recommendation
+
+    now = datetime.utcnow()
+    operations = []
+    trainers = []  # entrenador de cada operación, para atribuir los upserts
+    for (trainer_id, user_id), recommendation in latest.items():
+        trainers.append(trainer_id)
+        operations.append(UpdateOne(
+            {"trainer_id": trainer_id, "user_id": user_id},
+            {
+                "$inc": {"recommendations": sent[(trainer_id, user_id)]},
+                "$set": {
+                    "last_recommendation": {
+                        "id": str(recommendation.id),
+                        "message": recommendation.message,
+                        "created_at": recommendation.created_at,
+                    },
+                    "updated_at": now,
+                },
+                "$setOnInsert": {"created_at": now},
+            },
+            upsert=True,
+        ))
+    if not operations:
+        return
+    result = TrainerInboxEntry._get_collection().bulk_write(operations, ordered=False)
+
+    totals = {}
+    for (trainer_id, _), count in sent.items():
+        totals.setdefault(trainer_id, {"recommendations": 0, "assigned_users": 0})
+        totals[trainer_id]["recommendations"] += count
+    for position in result.upserted_ids:
+        totals[trainers[position]]["assigned_users"] += 1
+    for trainer_id, deltas in totals.items():
+        counters.increment(counters.user_key(trainer_id), deltas)
+
+
+def recommendation_deleted(recommendation):
+    """Si era la última recomendación del par, `last_recommendation` pasa a la anterior (o se quita)."""
+    pair = {"trainer_id": recommendation.trainer_id, "user_id": recommendation.user_id}
+    collection = TrainerInboxEntry._get_collection()
+    entry = collection.find_one_and_update(
+        pair, {"$inc": {"recommendations": -1}}, projection={"last_recommendation.id": 1})
+    counters.increment(counters.user_key(recommendation.trainer_id), {"recommendations": -1})
+
+    if entry is None or (entry.get("last_recommendation") or {}).get("id") != str(recommendation.id):
+        return
+    previous = Recommendation._get_collection().find_one(
+        pair, {"message": 1, "created_at": 1}, sort=[("created_at", -1), ("_id", -1)])
+    if previous is None:
+        update = {"$set": {"last_recommendation": {}}}
+    else:
+        update = {"$set": {"last_recommendation": {
+            "id": str(previous["_id"]),
+            "message": previous["message"],
+            "created_at": previous["created_at"],
+        }}}
+    # Solo si nadie escribió otra recomendación mientras tanto
+    collection.update_one({**pair, "last_recommendation.id": str(recommendation.id)}, update)
+
+
+def followup_created(followup):
+    is_open = followup.status == "open"
+    created = _touch(followup.trainer_id, followup.user_id,
+                     {"$inc": {"open_followups": 1 if is_open else 0}}, datetime.utcnow())
+    counters.increment(counters.user_key(followup.trainer_id), {
+        "open_followups": 1 if is_open else 0,
+        "assigned_users": 1 if created else 0,
+    })
+
+
+def close_followup(followup):
+    """Cierre atómico: solo el primero que lo cierra descuenta de la bandeja."""
+    now = datetime.utcnow()
+    before = FollowUp._get_collection().find_one_and_update(
+        {"_id": followup.id, "status": "open"},
+        {"$set": {"status": "closed", "closed_at": now}},
+        projection={"_id": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    followup.status, followup.closed_at = "closed", now
+    if before is None:
+        return False
+    _followup_no_longer_open(followup)
+    return True
+
+
+def followup_deleted(followup):
+    if followup.status == "open":
+        _followup_no_longer_open(followup)
+
+
+def _followup_no_longer_open(followup):
+    TrainerInboxEntry._get_collection().update_one(
+        {"trainer_id": followup.trainer_id, "user_id": followup.user_id},
+        {"$inc": {"open_followups": -1}},
+    )
+    counters.increment(counters.user_key(followup.trainer_id), {"open_followups": -1})
+
+
+def progress_created(entries):
+    """Último progreso del usuario en todas las bandejas donde aparece."""
+    latest = {}
+    for entry in entries:
+        when = entry.date or entry.created_at
+        if when is not None and (entry.user_id not in latest or when > latest[entry.user_id]):
+            latest[entry.user_id] = when
+    operations = [
+        UpdateMany({"user_id": user_id}, {"$max": {"last_progress_at": when}})
+        for user_id, when in latest.items()
+    ]
+    if operations:
+        TrainerInboxEntry._get_collection().bulk_write(operations, ordered=False)
+
+
+# ===== lecturas =====
+
+def trainer_totals(trainer_id):
+    values = counters.read_many([counters.user_key(trainer_id)])[counters.user_key(trainer_id)]
+    return {
+        "assigned_users": values.get("assigned_users", 0),
+        "recommendations": values.get("recommendations", 0),
+        "open_followups": values.get("open_followups", 0),
+        "routines": values.get("routines", 0),
+    }
+
+
+def inbox_page(trainer_id, cursor=None, page_size=20):
+    """
+    Usuarios del entrenador, los de actividad más reciente primero.
+
+    El cursor es (updated_at, _id) y updated_at cambia con cada recomendación
+    o seguimiento nuevo del par (el progreso solo toca last_progress_at y no
+    reordena). Si eso pasa mientras se recorren las páginas, la entrada sube
+    al principio y ya no aparece en las páginas siguientes. No hay
+    duplicados, porque updated_at solo crece. Se acepta porque el orden por
+    actividad es el propósito de la bandeja; la entrada se ve al volver a la
+    primera página.
+    """
+    return paginate_queryset(TrainerInboxEntry.objects(trainer_id=trainer_id), "updated_at", cursor, page_size)
+
+
+def open_followups_page(trainer_id, cursor=None, page_size=20):
+    return paginate_queryset(FollowUp.objects(trainer_id=trainer_id, status="open"), "created_at", cursor, page_size)
+
+
+# ===== reconstrucción =====
+
+def trainer_expected_totals():
+    """{trainer_id: {recommendations, open_followups, assigned_users}} con conteos exactos."""
+    totals = {}
+
+    def add(trainer_id, field, value):
+        totals.setdefault(trainer_id, {"recommendations": 0, "open_followups": 0, "assigned_users": 0})
+        totals[trainer_id][field] = value
+
+    group = {"$group": {"_id": "$trainer_id", "count": {"$sum": 1}}}
+    for row in Recommendation._get_collection().aggregate([group]):
+        add(row["_id"], "recommendations", row["count"])
+    for row in FollowUp._get_collection().aggregate([{"$match": {"status": "open"}}, group]):
+        add(row["_id"], "open_followups", row["count"])
+    for row in TrainerInboxEntry._get_collection().aggregate([group]):
+        add(row["_id"], "assigned_users", row["count"])
+    return totals
+
+
+def rebuild_entries():
+    """Reconstruye la bandeja desde recomendaciones, seguimientos y progreso. Devuelve entradas escritas."""
+    FollowUp._get_collection().update_many({"status": {"$exists": False}}, {"$set": {"status": "open"}})
+
+    entries = {}
+
+    def entry(trainer_id, user_id):
+        return entries.setdefault((trainer_id, user_id), {
+            "trainer_id": trainer_id, "user_id": user_id, "open_followups": 0,
+            "recommendations": 0, "last_recommendation": {}, "updated_at": None,
+        })
+
+    recommendations = Recommendation._get_collection().aggregate([
+        {"$sort": {"created_at": 1}},
+        {"$group": {
+            "_id": {"trainer_id": "$trainer_id", "user_id": "$user_id"},
+            "count": {"$sum": 1},
+            "last": {"$last": {"id": {"$toString": "$_id"}, "message": "$message", "created_at": "$created_at"}},
+        }},
+    ], allowDiskUse=True)
+    for row in recommendations:
+        current = entry(row["_id"]["trainer_id"], row["_id"]["user_id"])
+        current["recommendations"] = row["count"]
+        current["last_recommendation"] = row["last"]
+        current["updated_at"] = row["last"]["created_at"]
+
+    followups = FollowUp._get_collection().aggregate([
+        {"$group": {
+            "_id": {"trainer_id": "$trainer_id", "user_id": "$user_id"},
+            "open": {"$sum": {"$cond": [{"$eq": ["$status", "open"]}, 1, 0]}},
+            "last": {"$max": "$created_at"},
+        }},
+    ], allowDiskUse=True)
+    for row in followups:
+        current = entry(row["_id"]["trainer_id"], row["_id"]["user_id"])
+        current["open_followups"] = row["open"]
+        current["updated_at"] = max(filter(None, [current["updated_at"], row["last"]]), default=None)
+
+    users = list({user_id for _, user_id in entries})
+    last_progress = {}
+    if users:
+        pipeline = [
+            {"$match": {"user_id": {"$in": users}}},
+            {"$group": {"_id": "$user_id", "last": {"$max": "$date"}}},
+        ]
+        last_progress = {row["_id"]: row["last"] for row in Progress._get_collection().aggregate(pipeline)}
+
+    now = datetime.utcnow()
+    collection = TrainerInboxEntry._get_collection()
+    operations = []
+    for (trainer_id, user_id), values in entries.items():
+        values["last_progress_at"] = last_progress.get(user_id)
+        values["updated_at"] = values["updated_at"] or now
+        operations.append(UpdateOne(
+            {"trainer_id": trainer_id, "user_id": user_id},
+            {"$set": values, "$setOnInsert": {"created_at": now}},
+            upsert=True,
+        ))
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    return len(operations)
@@ -0,0 +1,131 @@
+"""
+Registro de las consultas que emiten las vistas de fitness y auditoría de sus
+planes de ejecución.
+
+`manage.py fitness_indexes` crea los índices declarados en el `meta` de cada
+documento y luego corre `explain()` sobre cada consulta registrada aquí. Un
+COLLSCAN o un SORT en memoria indica que falta (o se rompió) un índice.
+Cuando una vista agregue una consulta nueva, hay que registrarla con
+`register_query`.
+"""
+
+from datetime import datetime
+
+from fitness.models import (
+    Announcement, Exercise, FollowUp, Notification, Progress, ProgressRollup, Recommendation, Routine,
+    TrainerInboxEntry,
+)
+
+# Valores de ejemplo: solo importa la forma de la consulta, no los datos
+SAMPLE_USER = "__audit_user__"
+SAMPLE_TRAINER = "__audit_trainer__"
+
+BAD_STAGES = {"COLLSCAN", "SORT"}
+
+
+class AuditedQuery:
+    def __init__(self, label, document, filter, sort=None, limit=21):
+        self.label = label
+        self.document = document
+        self.filter = filter
+        self.sort = sort or []
+        self.limit = limit
+
+    def explain(self):
+        cursor = self.document._get_collection().find(self.filter)
+        if self.sort:
+            cursor = cursor.sort(self.sort)
+        if self.limit:
+            cursor = cursor.limit(self.limit)
+        return cursor.explain()
+
+
+AUDITED_QUERIES = []
+
+
+def register_query(label, document, filter, sort=None, limit=21):
+    AUDITED_QUERIES.append(AuditedQuery(label, document, filter, sort, limit))
+
+
+def plan_stages(plan):
+    """Nombres de todas las etapas de un winningPlan (incluye planes SBE)."""
+    stages = []
+    pending = [plan]
+    while pending:
+        node = pending.pop()
+        if not isinstance(node, dict):
+            continue
+        if "stage" in node:
+            stages.append(node["stage"])
+        for key in ("inputStage", "queryPlan", "outerStage", "innerStage"):
+            if key in node:
+                pending.append(node[key])
+        pending.extend(node.get("inputStages", []))
+    return stages
+
+
+def audit_query(query):
+    """Devuelve (etapas, problemas) para una consulta registrada."""
+    explain = query.explain()
+    winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+    stages = plan_stages(winning)
+    problems = sorted(BAD_STAGES.intersection(stages))
+    return stages, problems
+
+
+# ===== Consultas de las vistas =====
+
+_by_created = [("created_at", -1), ("_id", -1)]
+
+register_query("routines_list: propias + plantillas", Routine,
+               {"$or": [{"created_by": SAMPLE_USER}, {"is_template": True}]}, _by_created)
+register_query("routines_list: mis rutinas", Routine,
+               {"created_by": SAMPLE_USER, "is_template": {"$ne": True}}, _by_created)
+register_query("routines_list: plantillas", Routine,
+               {"is_template": True}, _by_created)
+register_query("student_dashboard: rutinas recientes", Routine,
+               {"user_id": SAMPLE_USER}, [("created_at", -1)], limit=5)
+
+register_query("progress_list / student_dashboard: progreso", Progress,
+               {"user_id": SAMPLE_USER}, [("date", -1), ("_id", -1)])
+
+register_query("analytics: progreso de una página de usuarios", Progress,
+               {"user_id": {"$in": [SAMPLE_USER, SAMPLE_TRAINER]}, "date": {"$gte": datetime(2026, 1, 5)}}, limit=0)
+
+register_query("reports: rollups semanales", ProgressRollup,
+               {"user_id": SAMPLE_USER, "period": "week", "start": {"$gte": datetime(2026, 1, 5)}})
+
+register_query("exercises_list: catálogo por nombre", Exercise,
+               {}, [("name", 1), ("_id", 1)])
+register_query("exercises_list: por tipo", Exercise,
+               {"type": "fuerza"}, [("name", 1), ("_id", 1)])
+register_query("exercises_list: por dificultad", Exercise,
+               {"difficulty": "media"}, [("name", 1), ("_id", 1)])
+register_query("exercise_search: prefijo", Exercise,
+               {"search_name": {"$regex": "^sent"}}, [("search_name", 1), ("_id", 1)], limit=11)
+register_query("exercise_search: prefijo por tipo", Exercise,
+               {"type": "fuerza", "search_name": {"$regex": "^sent"}}, [("search_name", 1), ("_id", 1)], limit=11)
+register_query("exercise_search: texto", Exercise,
+               {"$text": {"$search": "sentadilla", "$language": "spanish"}})
+
+register_query("trainer: recomendaciones a un usuario", Recommendation,
+               {"trainer_id": SAMPLE_TRAINER, "user_id": SAMPLE_USER}, [("created_at", -1)])
+register_query("trainer: seguimientos de un usuario", FollowUp,
+               {"trainer_id": SAMPLE_TRAINER, "user_id": SAMPLE_USER}, [("created_at", -1)])
+register_query("trainer_dashboard: seguimientos abiertos", FollowUp,
+               {"trainer_id": SAMPLE_TRAINER, "status": "open"}, [("created_at", -1), ("_id", -1)], limit=6)
+register_query("trainer_dashboard: bandeja", TrainerInboxEntry,
+               {"trainer_id": SAMPLE_TRAINER}, [("updated_at", -1), ("_id", -1)], limit=21)
+register_query("trainer_dashboard: rutinas del entrenador", Routine,
+               {"created_by": SAMPLE_TRAINER}, [("created_at", -1), ("_id", -1)], limit=6)
+register_query("progress: bandejas de un usuario", TrainerInboxEntry,
+               {"user_id": SAMPLE_USER})
+
+register_query("notifications: feed del usuario", Notification,
+               {"user_id": SAMPLE_USER}, [("created_at", -1), ("_id", -1)], limit=21)
+register_query("notifications: anuncios de sus audiencias", Announcement,
+               {"audience": {"$in": ["all", "role:STUDENT", "campus:1"]}}, [("created_at", -1), ("_id", -1)], limit=21)
+register_query("routine: adopciones enlazadas de una plantilla", Routine,
+               {"adopted_from": "000000000000000000000000", "exercises.0": {"$exists": False}})
+register_query("routine_adopt: adopción previa del usuario", Routine,
+               {"adopted_from": "000000000000000000000000", "created_by": SAMPLE_USER}, limit=1)
@@ -0,0 +1,129 @@
+"""
+Ingesta masiva de progreso (relojes y apps que sincronizan muchas sesiones).
+
+Cada entrada se valida contra las restricciones de Progress y todas las
+válidas se escriben con un único insert_many no ordenado. La deduplicación
+usa la clave `idempotency_key` del cliente y el índice único
+(user_id, idempotency_key): un reintento devuelve "duplicate" en lugar de
+insertar otra vez. En modo time-series no hay índices únicos, así que las
+claves ya existentes se consultan antes de insertar (un $in extra).
+"""
+
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from mongoengine import ValidationError
+from pymongo.errors import BulkWriteError
+
+from fitness import progress_events
+from fitness.models import Progress
+from fitness.timeseries import timeseries_enabled
+
+MAX_ENTRIES = 1000
+DUPLICATE_KEY = 11000
+FIELDS = ("routine_id", "exercise_id", "date", "repetitions", "duration", "effort_level", "notes", "idempotency_key")
+
+
+class IngestError(Exception):
+    """El lote completo es inválido (formato o tamaño)."""
+
+
+def _parse_date(value):
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _build(user_id, item):
+    """Progress sin guardar a partir de un dict del cliente, o lista de errores."""
+    if not isinstance(item, dict):
+        return None, ["La entrada debe ser un objeto JSON."]
+
+    unknown = set(item) - set(FIELDS)
+    if unknown:
+        return None, [f"Campos desconocidos: {', '.join(sorted(unknown))}."]
+
+    values = {field: item.get(field) for field in FIELDS if item.get(field) not in (None, "")}
+    try:
+        if "date" in values:
+            values["date"] = _parse_date(values["date"])
+    except ValueError:
+        return None, ["'date' debe estar en formato ISO 8601."]
+
+    progress = Progress(id=ObjectId(), user_id=user_id, **values)
+    try:
+        progress.validate()
+    except ValidationError as e:
+        return None, [f"{field}: {message}" for field, message in (e.to_dict() or {"": str(e)}).items()]
+    return progress, []
+
+
+def ingest_progress(user_id, items):
+    """
+    Inserta `items` para `user_id`. Devuelve una lista de resultados con el
+    mismo orden de entrada: {"index", "status": created|duplicate|error, ...}.
+    """
+    if not isinstance(items, list):
+        raise IngestError("Se esperaba una lista de entradas.")
+    if len(items) > MAX_ENTRIES:
+        raise IngestError(f"Máximo {MAX_ENTRIES} entradas por solicitud.")
+
+    results = [None] * len(items)
+    pending = []  # (index, Progress)
+    seen_keys = {}
+
+    for index, item in enumerate(items):
+        progress, errors = _build(user_id, item)
+        if errors:
+            results[index] = {"index": index, "status": "error", "errors": errors}
+            continue
+        key = progress.idempotency_key
+        if key is not None and key in seen_keys:
+            # Clave repetida dentro del mismo lote
+            results[index] = {"index": index, "status": "duplicate", "idempotency_key": key}
+            continue
+        if key is not None:
+            seen_keys[key] = index
+        pending.append((index, progress))
+
+    collection = Progress._get_collection()
+
+    if timeseries_enabled() and seen_keys:
+        existing = {
+            doc["idempotency_key"] for doc in collection.find(
+                {"user_id": user_id, "idempotency_key": {"$in": list(seen_keys)}},
+                {"idempotency_key": 1},
+            )
+        }
+        for index, progress in pending:
+            if progress.idempotency_key in existing:
+                results[index] = {"index": index, "status": "duplicate", "idempotency_key": progress.idempotency_key}
+        pending = [(i, p) for i, p in pending if results[i] is None]
+
+    failed = {}  # posición en `pending` -> error de escritura
+    if pending:
+        try:
+            collection.insert_many([p.to_mongo() for _, p in pending], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = error
+
+    inserted = []
+    for position, (index, progress) in enumerate(pending):
+        error = failed.get(position)
+        if error is None:
+            inserted.append(progress)
+            results[index] = {"index": index, "status": "created", "id": str(progress.id)}
+        elif error.get("code") == DUPLICATE_KEY:
+            results[index] = {"index": index, "status": "duplicate", "idempotency_key": progress.idempotency_key}
+        else:
+            results[index] = {"index": index, "status": "error", "errors": [error.get("errmsg", "Error de escritura")]}
+
+    progress_events.progress_created(inserted)
+    return results
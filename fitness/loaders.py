@@ -0,0 +1,142 @@
+"""
+Cargadores por lotes entre PostgreSQL y MongoDB (estilo DataLoader).
+
+Las páginas que mezclan ambos motores (documentos de Mongo con `user_id`, o
+usuarios de PostgreSQL con datos en Mongo) primero declaran las claves que van
+a necesitar con `want()` y luego las leen: cada `dispatch()` resuelve todo lo
+pendiente con una sola consulta (`pk__in` o `$in`) y lo deja en caché para el
+resto de la petición. Así una página hace un número fijo de consultas sin
+importar cuántas filas tenga.
+
+    loaders = get_loaders(request)
+    loaders.users.want(entry.user_id for entry in page)
+    users = loaders.users.get_many(...)
+"""
+
+from bson import ObjectId
+
+from accounts.models import User
+from fitness.catalog import catalog
+from fitness.models import Routine
+
+
+class BatchLoader:
+    """Caché por clave con resolución por lotes; las subclases implementan `fetch`."""
+
+    def __init__(self):
+        self._cache = {}
+        self._pending = set()
+        self.batches = 0  # consultas realizadas, útil para depurar
+
+    def fetch(self, keys):
+        """{clave: valor} para las claves encontradas."""
+        raise NotImplementedError
+
+    def normalize(self, key):
+        return key
+
+    def want(self, keys):
+        for key in keys:
+            if key is None:
+                continue
+            key = self.normalize(key)
+            if key not in self._cache:
+                self._pending.add(key)
+
+    def dispatch(self):
+        if not self._pending:
+            return
+        keys, self._pending = self._pending, set()
+        found = self.fetch(keys)
+        self.batches += 1
+        for key in keys:
+            self._cache[key] = found.get(key)
+
+    def get(self, key):
+        return self.get_many([key]).get(self.normalize(key)) if key is not None else None
+
+    def get_many(self, keys):
+        """{clave: valor o None}; las claves que falten se piden en un solo lote."""
+        keys = [self.normalize(key) for key in keys if key is not None]
+        self.want(keys)
+        self.dispatch()
+        return {key: self._cache.get(key) for key in keys}
+
+
+class UserLoader(BatchLoader):
+    """accounts.User con su Student/Employee, por username."""
+
+    def normalize(self, key):
+        return str(key)
+
+    def fetch(self, keys):
+        return User.objects.select_related("student", "employee").in_bulk(list(keys))
+
+    def user_data(self, user_id):
+        """Dict que usan las plantillas del entrenador (nombre y correo del usuario)."""
+        user = self.get(user_id)
+        person = (user.student or user.employee) if user else None
+        return {
+            "user_id": str(user_id),
+            "username": str(user_id),
+            "full_name": str(person) if person else str(user_id),
+            "email": person.email if person else "",
+        }
+
+
+class DocumentLoader(BatchLoader):
+    """Documentos de MongoEngine por _id, con un solo `$in` por lote."""
+
+    def __init__(self, document, only=None):
+        super().__init__()
+        self.document = document
+        self.only = only
+
+    def normalize(self, key):
+        return str(key)
+
+    def fetch(self, keys):
+        ids = [ObjectId(key) for key in keys if ObjectId.is_valid(key)]
+        if not ids:
+            return {}
+        queryset = self.document.objects(id__in=ids)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        return {str(doc.id): doc for doc in queryset}
+
+
+class ExerciseLoader(BatchLoader):
+    """Registros del catálogo de ejercicios (en memoria si el catálogo está cargado)."""
+
+    def normalize(self, key):
+        return str(key)
+
+    def fetch(self, keys):
+        return catalog.get_many(keys)
+
+
+class Loaders:
+    def __init__(self):
+        self.users = UserLoader()
+        self.routines = DocumentLoader(Routine, only=("name", "created_by", "is_template"))
+        self.exercises = ExerciseLoader()
+
+    def annotate_progress(self, entries):
+        """Agrega `routine_name`/`exercise_name` a registros de progreso con dos lotes."""
+        entries = list(entries)
+        routines = self.routines.get_many(entry.routine_id for entry in entries)
+        exercises = self.exercises.get_many(entry.exercise_id for entry in entries)
+        for entry in entries:
+            routine = routines.get(entry.routine_id) if entry.routine_id else None
+            exercise = exercises.get(entry.exercise_id) if entry.exercise_id else None
+            entry.routine_name = routine.name if routine else None
+            entry.exercise_name = exercise["name"] if exercise else None
+        return entries
+
+
+def get_loaders(request):
+    """Cargadores de la petición actual (se crean la primera vez)."""
+    loaders = getattr(request, "_fitness_loaders", None)
+    if loaders is None:
+        loaders = request._fitness_loaders = Loaders()
+    return loaders
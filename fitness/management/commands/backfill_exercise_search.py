@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from fitness.models import CatalogVersion, Exercise, normalize_search
+
+
+class Command(BaseCommand):
+    help = "Rellena (o recalcula con --all) el campo search_name de los ejercicios."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Ejercicios procesados por lote (default: 1000).")
+        parser.add_argument("--all", action="store_true",
+                            help="Recalcula también los que ya tienen search_name.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        exercises = Exercise._get_collection()
+        base_query = {} if options["all"] else {"search_name": {"$exists": False}}
+
+        last_id = None
+        updated = 0
+        while True:
+            query = dict(base_query)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = list(exercises.find(query, {"name": 1}).sort("_id", 1).limit(batch_size))
+            if not batch:
+                break
+            last_id = batch[-1]["_id"]
+
+            result = exercises.bulk_write([
+                UpdateOne({"_id": doc["_id"]}, {"$set": {"search_name": normalize_search(doc.get("name"))}})
+                for doc in batch
+            ], ordered=False)
+            updated += result.modified_count
+
+        if updated:
+            CatalogVersion.bump("exercises")
+        self.stdout.write(self.style.SUCCESS(f"[OK] search_name actualizado en {updated} ejercicios"))
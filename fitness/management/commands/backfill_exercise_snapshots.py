@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from pymongo import UpdateOne
+
+from fitness.models import Exercise, Routine
+
+
+class Command(BaseCommand):
+    help = "Rellena el snapshot de ejercicio en las rutinas guardadas antes de existir los snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="Rutinas procesadas por lote (default: 500).")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        routines = Routine._get_collection()
+        exercises = Exercise._get_collection()
+        projection = {"_id": 1, **{field: 1 for field in Exercise.SNAPSHOT_FIELDS}}
+
+        last_id = None
+        updated = 0
+        batches = 0
+
+        while True:
+            query = {"exercises": {"$elemMatch": {"snapshot": {"$exists": False}}}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+
+            batch = list(
+                routines.find(query, {"exercises": 1})
+                .sort("_id", 1)
+                .limit(batch_size)
+            )
+            if not batch:
+                break
+            last_id = batch[-1]["_id"]
+            batches += 1
+
+            # Un solo $in por lote para todos los ejercicios referenciados
+            exercise_ids = {
+                row["exercise"] for routine in batch for row in routine.get("exercises", [])
+                if row.get("exercise") is not None
+            }
+            snapshots = {
+                doc.pop("_id"): doc
+                for doc in exercises.find({"_id": {"$in": list(exercise_ids)}}, projection)
+            }
+
+            operations = []
+            for routine in batch:
+                rows = routine.get("exercises", [])
+                changed = False
+                for row in rows:
+                    if "snapshot" in row or row.get("exercise") not in snapshots:
+                        continue
+                    row["snapshot"] = snapshots[row["exercise"]]
+                    changed = True
+                if changed:
+                    operations.append(UpdateOne({"_id": routine["_id"]}, {"$set": {"exercises": rows}}))
+
+            if operations:
+                routines.bulk_write(operations, ordered=False)
+                updated += len(operations)
+
+            self.stdout.write(f"Lote {batches}: {len(operations)} rutinas actualizadas")
+
+        self.stdout.write(self.style.SUCCESS(f"[OK] {updated} rutinas con snapshots en {batches} lotes"))
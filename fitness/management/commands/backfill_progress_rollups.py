@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from fitness import rollups
+from fitness.models import Progress, ProgressRollup
+
+PROJECTION = {"user_id": 1, "date": 1, "created_at": 1, "duration": 1,
+              "effort_level": 1, "exercise_id": 1, "routine_id": 1}
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye los rollups diarios y semanales de progreso a partir del historial. "
+        "Ejecutar sin escrituras de progreso en curso para no duplicar conteos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000,
+                            help="Registros de progreso leídos por lote (default: 2000).")
+        parser.add_argument("--user", action="append", dest="users",
+                            help="Reconstruir solo este usuario (se puede repetir).")
+
+    def handle(self, *args, **options):
+        query = {"user_id": {"$in": options["users"]}} if options["users"] else {}
+
+        deleted = ProgressRollup._get_collection().delete_many(query).deleted_count
+        self.stdout.write(f"{deleted} rollups anteriores eliminados")
+
+        cursor = (
+            Progress._get_collection()
+            .find(query, PROJECTION, no_cursor_timeout=True)
+            .sort("_id", 1)
+            .batch_size(options["batch_size"])
+        )
+
+        processed = 0
+        batch = []
+        try:
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= options["batch_size"]:
+                    rollups.apply(batch)
+                    processed += len(batch)
+                    batch = []
+                    self.stdout.write(f"  {processed} registros procesados")
+            if batch:
+                rollups.apply(batch)
+                processed += len(batch)
+        finally:
+            cursor.close()
+
+        self.stdout.write(self.style.SUCCESS(f"[OK] Rollups reconstruidos desde {processed} registros"))
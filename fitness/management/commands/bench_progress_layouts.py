@@ -0,0 +1,106 @@
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from mongoengine.connection import get_connection
+
+from fitness.timeseries import TIMESERIES_OPTIONS, ensure_timeseries_collection
+
+PLAIN = "bench_progress_plain"
+TIMESERIES = "bench_progress_ts"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara tamaño en disco y latencia de consultas por rango entre la colección "
+        "normal de progreso y una time-series, con datos sintéticos en una base aparte."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=5000)
+        parser.add_argument("--days", type=int, default=365,
+                            help="Días de historial sintético (default: 365).")
+        parser.add_argument("--queries", type=int, default=500,
+                            help="Consultas de rango medidas por colección (default: 500).")
+        parser.add_argument("--window", type=int, default=30,
+                            help="Días de la ventana consultada (default: 30).")
+        parser.add_argument("--database", default="fitness_bench")
+        parser.add_argument("--keep", action="store_true",
+                            help="No borrar las colecciones de prueba al terminar.")
+
+    def handle(self, *args, **options):
+        db = get_connection("fitness")[options["database"]]
+        db.drop_collection(PLAIN)
+        db.drop_collection(TIMESERIES)
+
+        plain = db[PLAIN]
+        plain.create_index([("user_id", 1), ("date", -1), ("_id", -1)])
+        ensure_timeseries_collection(db, TIMESERIES, TIMESERIES_OPTIONS)
+        timeseries = db[TIMESERIES]
+        timeseries.create_index([("user_id", 1), ("date", -1)])
+
+        start = datetime.utcnow() - timedelta(days=options["days"])
+        seconds = options["days"] * 86400
+        rng = random.Random(42)
+
+        self.stdout.write(f"Insertando {options['rows']} registros sintéticos...")
+        for collection in (plain, timeseries):
+            began = time.perf_counter()
+            rng.seed(42)  # mismos datos en ambas colecciones
+            batch = []
+            for _ in range(options["rows"]):
+                batch.append({
+                    "user_id": f"user{rng.randrange(options['users'])}",
+                    "date": start + timedelta(seconds=rng.randrange(seconds)),
+                    "routine_id": None,
+                    "exercise_id": None,
+                    "repetitions": rng.randrange(5, 30),
+                    "duration": float(rng.randrange(300, 3600)),
+                    "effort_level": rng.randrange(1, 11),
+                    "created_at": datetime.utcnow(),
+                })
+                if len(batch) == 10_000:
+                    collection.insert_many(batch, ordered=False)
+                    batch = []
+            if batch:
+                collection.insert_many(batch, ordered=False)
+            self.stdout.write(f"  {collection.name}: {time.perf_counter() - began:.1f}s")
+
+        rows = []
+        for collection in (plain, timeseries):
+            stats = db.command("collStats", collection.name)
+            latencies = self._range_latencies(collection, options, start)
+            rows.append((
+                collection.name,
+                stats.get("storageSize", 0) / 2**20,
+                stats.get("totalIndexSize", 0) / 2**20,
+                statistics.median(latencies),
+                statistics.quantiles(latencies, n=20)[-1],
+            ))
+
+        self.stdout.write("")
+        self.stdout.write(f"{'colección':<24}{'datos MB':>10}{'índices MB':>12}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, storage, indexes, p50, p95 in rows:
+            self.stdout.write(f"{name:<24}{storage:>10.1f}{indexes:>12.1f}{p50:>10.2f}{p95:>10.2f}")
+
+        if not options["keep"]:
+            db.drop_collection(PLAIN)
+            db.drop_collection(TIMESERIES)
+
+    def _range_latencies(self, collection, options, start):
+        rng = random.Random(7)
+        window = timedelta(days=options["window"])
+        span = options["days"] - options["window"]
+        latencies = []
+        for _ in range(options["queries"]):
+            user_id = f"user{rng.randrange(options['users'])}"
+            since = start + timedelta(days=rng.randrange(max(span, 1)))
+            began = time.perf_counter()
+            list(collection.find(
+                {"user_id": user_id, "date": {"$gte": since, "$lt": since + window}}
+            ).sort("date", -1))
+            latencies.append((time.perf_counter() - began) * 1000)
+        return latencies
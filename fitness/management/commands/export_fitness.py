@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fitness import export
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta progress, routines y recommendations a Parquet particionado por mes. "
+        "Es incremental: parte de la marca de created_at registrada en <destino>/manifest.json "
+        "y deja fuera los documentos de los últimos minutos (export.SAFETY_LAG)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("destination", help="Directorio de salida (se crea si no existe).")
+        parser.add_argument("--collections", nargs="+", choices=list(export.TABLES),
+                            help="Colecciones a exportar (default: todas).")
+        parser.add_argument("--since", help="Solo documentos creados desde esta fecha (YYYY-MM-DD) "
+                                            "cuando la colección no tiene exportaciones previas.")
+        parser.add_argument("--full", action="store_true",
+                            help="Ignora el manifiesto y exporta todo (usar con un destino vacío).")
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Documentos por lote del cursor (default: 5000).")
+        parser.add_argument("--row-group-size", type=int, default=50000,
+                            help="Filas por row group y por partición en memoria (default: 50000).")
+        parser.add_argument("--compression", choices=export.COMPRESSIONS, default="zstd")
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = datetime.strptime(options["since"], "%Y-%m-%d")
+            except ValueError:
+                raise CommandError("--since debe tener el formato YYYY-MM-DD.")
+
+        def on_batch(name, rows):
+            self.stdout.write(f"{name}: {rows} filas")
+
+        try:
+            counts = export.run_export(
+                options["destination"],
+                collections=options["collections"],
+                since=since,
+                full=options["full"],
+                batch_size=options["batch_size"],
+                row_group_size=options["row_group_size"],
+                compression=options["compression"],
+                on_batch=on_batch,
+            )
+        except export.ExportError as e:
+            raise CommandError(str(e))
+
+        for name, rows in counts.items():
+            self.stdout.write(f"{name}: {rows} filas nuevas")
+        self.stdout.write(self.style.SUCCESS(f"[OK] Exportación en {options['destination']}"))
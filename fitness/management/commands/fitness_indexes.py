@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from fitness.indexes import AUDITED_QUERIES, audit_query
+from fitness.models import (
+    ActiveUserSketch, Announcement, Exercise, FollowUp, Notification, Progress, ProgressRollup,
+    Recommendation, RecommendationJob, Routine, TrainerInboxEntry,
+)
+
+DOCUMENTS = [Exercise, Routine, Progress, Recommendation, FollowUp, ProgressRollup, ActiveUserSketch,
+             TrainerInboxEntry, RecommendationJob, Notification, Announcement]
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea los índices declarados en los documentos de fitness y audita con "
+        "explain() las consultas registradas en fitness/indexes.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--skip-build", action="store_true",
+                            help="No crear índices, solo auditar.")
+        parser.add_argument("--skip-audit", action="store_true",
+                            help="Solo crear índices.")
+        parser.add_argument("--prune", action="store_true",
+                            help="Eliminar índices que ya no están declarados en meta.")
+        parser.add_argument("--strict", action="store_true",
+                            help="Terminar con error si alguna consulta hace COLLSCAN o SORT en memoria.")
+
+    def handle(self, *args, **options):
+        if not options["skip_build"]:
+            self.build_indexes(prune=options["prune"])
+        if not options["skip_audit"]:
+            self.audit(strict=options["strict"])
+
+    def build_indexes(self, prune=False):
+        for document in DOCUMENTS:
+            collection = document._get_collection()
+            document.ensure_indexes()  # usa index_background del meta
+            diff = document.compare_indexes()
+
+            for index in diff["missing"]:
+                self.stdout.write(self.style.WARNING(f"[!] {collection.name}: falta índice {index}"))
+
+            for index in diff["extra"]:
+                if prune:
+                    keys = [tuple(part) for part in index]
+                    for name, info in collection.index_information().items():
+                        if [tuple(part) for part in info["key"]] == keys:
+                            collection.drop_index(name)
+                            self.stdout.write(f"[-] {collection.name}: eliminado {name}")
+                else:
+                    self.stdout.write(f"[i] {collection.name}: índice no declarado {index} (usar --prune)")
+
+            self.stdout.write(self.style.SUCCESS(f"[OK] Índices de {collection.name}"))
+
+    def audit(self, strict=False):
+        failures = []
+        for query in AUDITED_QUERIES:
+            stages, problems = audit_query(query)
+            plan = " > ".join(reversed(stages))
+            if problems:
+                failures.append(query.label)
+                self.stdout.write(self.style.WARNING(
+                    f"[!] {query.label}: {', '.join(problems)} ({plan})"))
+            else:
+                self.stdout.write(f"[OK] {query.label}: {plan}")
+
+        if failures:
+            message = f"{len(failures)} consultas sin índice adecuado: " + "; ".join(failures)
+            if strict:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"[OK] {len(AUDITED_QUERIES)} consultas auditadas"))
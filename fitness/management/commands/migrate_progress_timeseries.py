@@ -0,0 +1,57 @@
+from bson import ObjectId
+from django.core.management.base import BaseCommand, CommandError
+from mongoengine.connection import get_db
+
+from fitness.timeseries import PLAIN_COLLECTION, TIMESERIES_COLLECTION, ensure_timeseries_collection
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia los registros de la colección 'progress' a la colección time-series "
+        "'progress_ts' en lotes ordenados por _id. Luego activar FITNESS_PROGRESS_TIMESERIES."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Documentos copiados por lote (default: 5000).")
+        parser.add_argument("--after", default=None,
+                            help="Reanudar después de este _id (el último que imprimió una corrida anterior).")
+
+    def handle(self, *args, **options):
+        db = get_db("fitness")
+        if ensure_timeseries_collection(db):
+            self.stdout.write(f"[OK] Colección time-series '{TIMESERIES_COLLECTION}' creada")
+
+        source = db[PLAIN_COLLECTION]
+        target = db[TIMESERIES_COLLECTION]
+
+        query = {"date": {"$ne": None}}  # el timeField es obligatorio en time-series
+        if options["after"]:
+            if not ObjectId.is_valid(options["after"]):
+                raise CommandError("--after debe ser un ObjectId válido.")
+            query["_id"] = {"$gt": ObjectId(options["after"])}
+
+        skipped = source.count_documents({"date": None})
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"[!] {skipped} registros sin 'date' no se copiarán"))
+
+        copied = 0
+        batch = []
+        cursor = source.find(query).sort("_id", 1).batch_size(options["batch_size"])
+        try:
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= options["batch_size"]:
+                    copied += self._flush(target, batch)
+                    batch = []
+            if batch:
+                copied += self._flush(target, batch)
+        finally:
+            cursor.close()
+
+        self.stdout.write(self.style.SUCCESS(f"[OK] {copied} registros copiados a '{TIMESERIES_COLLECTION}'"))
+
+    def _flush(self, target, batch):
+        target.insert_many(batch, ordered=False)
+        self.stdout.write(f"  lote hasta _id {batch[-1]['_id']} ({len(batch)} registros)")
+        return len(batch)
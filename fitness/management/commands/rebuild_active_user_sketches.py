@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from fitness import sketches
+from fitness.models import ActiveUserSketch, Progress
+
+PROJECTION = {"user_id": 1, "date": 1, "created_at": 1}
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye los sketches HyperLogLog de usuarios activos a partir del historial "
+        "de progreso. Corrige los sketches tras borrados o cambios de campus/facultad."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Registros de progreso leídos por lote (default: 5000).")
+
+    def handle(self, *args, **options):
+        cursor = (
+            Progress._get_collection()
+            .find({}, PROJECTION, no_cursor_timeout=True)
+            .sort("_id", 1)
+            .batch_size(options["batch_size"])
+        )
+
+        # Los registros se acumulan en memoria: como mucho 2^p por sketch
+        merged = {}
+        processed = 0
+        batch = []
+        try:
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= options["batch_size"]:
+                    self._accumulate(merged, batch)
+                    processed += len(batch)
+                    batch = []
+                    self.stdout.write(f"  {processed} registros procesados")
+            if batch:
+                self._accumulate(merged, batch)
+                processed += len(batch)
+        finally:
+            cursor.close()
+
+        ActiveUserSketch._get_collection().delete_many({"_id": {"$nin": list(merged)}})
+        sketches.replace_sketches(merged)
+        self.stdout.write(self.style.SUCCESS(
+            f"[OK] {len(merged)} sketches reconstruidos desde {processed} registros"))
+
+    def _accumulate(self, merged, batch):
+        for _id, (granularity, period, dimension, registers) in sketches.sketch_registers(batch).items():
+            if _id in merged:
+                merged[_id] = (granularity, period, dimension, sketches.merge(merged[_id][3], registers))
+            else:
+                merged[_id] = (granularity, period, dimension, registers)
@@ -0,0 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from fitness import activity
+from fitness.models import Progress
+
+
+class Command(BaseCommand):
+    help = "Recalcula UserActivitySummary de todos los usuarios con progreso, en lotes paralelos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200,
+                            help="Usuarios por lote (default: 200).")
+        parser.add_argument("--workers", type=int, default=4,
+                            help="Lotes procesados en paralelo (default: 4).")
+        parser.add_argument("--user", action="append", dest="users",
+                            help="Recalcular solo este usuario (se puede repetir).")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if options["users"]:
+            user_ids = options["users"]
+        else:
+            pipeline = [{"$group": {"_id": "$user_id"}}, {"$sort": {"_id": 1}}]
+            user_ids = [row["_id"] for row in Progress._get_collection().aggregate(pipeline, allowDiskUse=True)]
+
+        batches = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
+        self.stdout.write(f"{len(user_ids)} usuarios en {len(batches)} lotes")
+
+        done = 0
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = [executor.submit(activity.rebuild_users, batch) for batch in batches]
+            for future in as_completed(futures):
+                done += future.result()
+                self.stdout.write(f"  {done}/{len(user_ids)} resúmenes escritos")
+
+        self.stdout.write(self.style.SUCCESS(f"[OK] {done} resúmenes de actividad recalculados"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from fitness import counters, inbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye la bandeja de los entrenadores (trainer_inbox) desde recomendaciones, "
+        "seguimientos y progreso, y reconcilia sus contadores."
+    )
+
+    def handle(self, *args, **options):
+        written = inbox.rebuild_entries()
+        self.stdout.write(f"{written} entradas de bandeja reescritas")
+        drift = counters.reconcile()
+        self.stdout.write(self.style.SUCCESS(f"[OK] Bandeja reconstruida ({len(drift)} contadores corregidos)"))
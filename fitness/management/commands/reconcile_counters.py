@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from fitness import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula con conteos exactos los contadores de la plataforma y por usuario "
+        "(fitness/counters.py). Pensado para ejecutarse periódicamente (cron)."
+    )
+
+    def handle(self, *args, **options):
+        drift = counters.reconcile()
+        for key, fields in sorted(drift.items()):
+            changes = ", ".join(f"{field}: {before} -> {after}" for field, (before, after) in sorted(fields.items()))
+            self.stdout.write(self.style.WARNING(f"[!] {key}: {changes}"))
+        self.stdout.write(self.style.SUCCESS(f"[OK] Contadores reconciliados ({len(drift)} con diferencias)"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from fitness import fanout
+from fitness.models import RecommendationJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Retoma los envíos masivos de recomendaciones que quedaron pendientes o a medias "
+        "(p. ej. tras reiniciar el servidor). Ejecutar sin servidores web entregando envíos."
+    )
+
+    def handle(self, *args, **options):
+        jobs = RecommendationJob.objects(status__in=["pending", "running"]).only("id", "total", "delivered")
+        resumed = 0
+        for job in jobs:
+            self.stdout.write(f"  {job.id}: {job.delivered}/{job.total}")
+            fanout.deliver(job.id)
+            resumed += 1
+        self.stdout.write(self.style.SUCCESS(f"[OK] {resumed} envíos retomados"))
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fitness import notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Publica un aviso para una audiencia (all, role:STUDENT, campus:<código>, "
+        "faculty:<código>). Se guarda una sola vez y aparece en el feed de cada usuario."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--audience", default="all",
+                            help="Audiencia del aviso (default: all).")
+        parser.add_argument("--title", required=True)
+        parser.add_argument("--message", default="")
+        parser.add_argument("--days", type=int,
+                            help="Días de vigencia (por defecto no expira).")
+
+    def handle(self, *args, **options):
+        audience = options["audience"]
+        prefix = audience.split(":", 1)[0]
+        if audience != "all" and (prefix not in ("role", "campus", "faculty") or ":" not in audience):
+            raise CommandError("Audiencia inválida: use all, role:<rol>, campus:<código> o faculty:<código>.")
+
+        expires_at = datetime.utcnow() + timedelta(days=options["days"]) if options["days"] else None
+        announcement = notifications.announce(audience, options["title"], options["message"],
+                                              expires_at=expires_at)
+        self.stdout.write(self.style.SUCCESS(f"[OK] Aviso {announcement.id} publicado para {audience}"))
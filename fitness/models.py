@@ -1,6 +1,18 @@
-from mongoengine import Document, StringField, FloatField, IntField, ListField, ReferenceField, BooleanField, DateTimeField, URLField, EmbeddedDocument, EmbeddedDocumentField
+import unicodedata
+
+from mongoengine import Document, StringField, FloatField, IntField, ListField, ReferenceField, BooleanField, DateTimeField, URLField, EmbeddedDocument, EmbeddedDocumentField, DictField
 from datetime import datetime
 
+from fitness.timeseries import ensure_timeseries_collection, progress_collection_name, timeseries_enabled
+
+
+def normalize_search(text):
+    """Minúsculas, sin tildes y con espacios simples: "Sentadilla Búlgara" -> "sentadilla bulgara"."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.lower().split())
+
+
 class Exercise(Document):
     name = StringField(required=True, max_length=100)
     type = StringField(choices=("cardio", "fuerza", "movilidad"), required=True)
@@ -9,16 +21,115 @@ class Exercise(Document):
     difficulty = StringField(choices=("baja", "media", "alta"))
     video_url = URLField()
     created_by = StringField(required=True, default="system")  #User ID
+    search_name = StringField()              # normalize_search(name), para autocompletar
     created_at = DateTimeField(default=datetime.utcnow)
 
     meta = {
         'collection': 'exercises',
-        'indexes': ['difficulty', 'type', 'created_by'],
+        'indexes': [
+            'created_by',
+            ('name', 'id'),                  # listado ordenado por nombre
+            ('type', 'name', 'id'),          # filtro por tipo
+            ('difficulty', 'name', 'id'),    # filtro por dificultad
+            ('search_name', 'id'),                 # autocompletar por prefijo
+            ('type', 'search_name', 'id'),
+            ('difficulty', 'search_name', 'id'),
+            {
+                # búsqueda con relevancia (fitness/search.py)
+                'fields': ('$name', '$description'),
+                'default_language': 'spanish',
+                'weights': {'name': 10, 'description': 2},
+            },
+        ],
+        'index_background': True,
         'db_alias': 'fitness',  # <- uses the alias configured in connect()
     }
 
+    SNAPSHOT_FIELDS = ("name", "type", "difficulty", "duration")
+
+    def save(self, *args, **kwargs):
+        """
+        Guarda el ejercicio y, si cambió algún campo copiado en las rutinas,
+        actualiza los snapshots embebidos con un solo update_many.
+        """
+        self.search_name = normalize_search(self.name)
+        changed = set(self._get_changed_fields()) if self.pk else set()
+        result = super().save(*args, **kwargs)
+        if changed.intersection(self.SNAPSHOT_FIELDS):
+            self.sync_routine_snapshots()
+        self._catalog_changed()
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._catalog_changed()
+        return result
+
+    @staticmethod
+    def _catalog_changed():
+        # Los demás workers lo detectan por la versión; este proceso invalida ya
+        from fitness.catalog import catalog
+        CatalogVersion.bump("exercises")
+        catalog.invalidate()
+
+    def snapshot(self):
+        return ExerciseSnapshot(**{field: getattr(self, field) for field in self.SNAPSHOT_FIELDS})
+
+    def sync_routine_snapshots(self):
+        """Reescribe el snapshot de este ejercicio en todas las rutinas que lo usan."""
+        return Routine._get_collection().update_many(
+            {"exercises.exercise": self.pk},
+            {"$set": {"exercises.$[row].snapshot": self.snapshot().to_mongo().to_dict()}},
+            array_filters=[{"row.exercise": self.pk}],
+        )
+
+class CatalogVersion(Document):
+    """
+    Versión monótona de un catálogo. Cada worker compara su copia en memoria
+    contra este número para saber cuándo recargar (ver fitness/catalog.py).
+    """
+    name = StringField(primary_key=True)
+    version = IntField(default=0)
+
+    meta = {
+        'collection': 'catalog_versions',
+        'db_alias': 'fitness',
+    }
+
+    @classmethod
+    def bump(cls, name):
+        cls._get_collection().update_one({"_id": name}, {"$inc": {"version": 1}}, upsert=True)
+
+    @classmethod
+    def current(cls, name):
+        doc = cls._get_collection().find_one({"_id": name}, {"version": 1})
+        return doc["version"] if doc else 0
+
+class ExerciseSnapshot(EmbeddedDocument):
+    """Copia de los campos de Exercise que se muestran en las rutinas."""
+    name = StringField(max_length=100)
+    type = StringField()
+    difficulty = StringField()
+    duration = FloatField()
+
 class RoutineExercise(EmbeddedDocument):
     exercise = ReferenceField('Exercise', required=True) 
+    snapshot = EmbeddedDocumentField(ExerciseSnapshot)  # opcional: evita desreferenciar al renderizar
+    sets = IntField()
+    reps = IntField()
+    rest = IntField()
+
+    @property
+    def summary(self):
+        """Snapshot embebido o, si la rutina es anterior a los snapshots, el ejercicio real."""
+        if self.snapshot is not None:
+            return self.snapshot
+        return self.exercise
+
+class RoutineOverride(EmbeddedDocument):
+    """Cambio de una fila de la plantilla en una rutina adoptada (ver fitness/adoption.py)."""
+    position = IntField(required=True)
+    exercise_id = StringField(required=True)  # solo aplica si la plantilla aún tiene ese ejercicio ahí
     sets = IntField()
     reps = IntField()
     rest = IntField()
@@ -30,12 +141,47 @@ class Routine(Document):
     created_by = StringField(required=True)
     is_template = BooleanField(default=False)
     adopted_from = StringField()
+    overrides = ListField(EmbeddedDocumentField(RoutineOverride))  # adopciones enlazadas
     user_id = StringField()
     created_at = DateTimeField(default=datetime.utcnow)
 
+    NOTIFIED_FIELDS = {"name", "exercises"}  # cambios de una plantilla que se avisan a sus adoptantes
+
+    def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        # MongoEngine solo marca un campo si el valor asignado es distinto
+        changed = {field.split(".")[0] for field in self._get_changed_fields()}
+        result = super().save(*args, **kwargs)
+        if is_new:
+            from fitness import counters
+            counters.routine_created(self)
+        elif self.is_template and changed & self.NOTIFIED_FIELDS:
+            from fitness import notifications
+            notifications.template_updated(self)
+        return result
+
+    def delete(self, *args, **kwargs):
+        if self.is_template:
+            from fitness import adoption
+            adoption.template_deleted(self)
+        result = super().delete(*args, **kwargs)
+        from fitness import counters
+        counters.routine_deleted(self)
+        return result
+
     meta = {
         'collection': 'routines',
-        'indexes': ['created_by', 'user_id', 'is_template'],
+        'indexes': [
+            ('created_by', '-created_at', '-id'),  # routines_list y student_dashboard: rutinas propias
+            {
+                # routines_list: plantillas (solo indexa los documentos plantilla)
+                'fields': ('is_template', '-created_at', '-id'),
+                'partialFilterExpression': {'is_template': True},
+            },
+            {'fields': ('adopted_from', 'created_by'), 'sparse': True},  # adopciones de una plantilla
+            'created_at',                          # export_fitness: ventana por hora de escritura
+        ],
+        'index_background': True,
         'db_alias': 'fitness',
     }
 
@@ -48,11 +194,48 @@ class Progress(Document):
     duration = FloatField(min_value=0)          # in seconds
     effort_level = IntField(min_value=1, max_value=10) # 1-10 scale
     notes = StringField() # Additional user notes ("it was tough", "felt great", etc.)
+    idempotency_key = StringField(max_length=100)  # clave del cliente en sincronizaciones masivas
     created_at = DateTimeField(default=datetime.utcnow)
 
+    def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        result = super().save(*args, **kwargs)
+        if is_new:
+            from fitness import progress_events
+            progress_events.progress_created([self])
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from fitness import progress_events
+        progress_events.progress_deleted([self])
+        return result
+
+    @classmethod
+    def _get_collection(cls):
+        # En modo time-series la colección se crea antes del primer acceso del
+        # proceso; si no, la primera escritura crearía una colección normal
+        if getattr(cls, "_collection", None) is None and timeseries_enabled():
+            ensure_timeseries_collection(cls._get_db(), cls._get_collection_name())
+        return super()._get_collection()
+
     meta = {
-        'collection': 'progress',
-        'indexes': ['user_id', 'routine_id', 'date'],
+        'collection': progress_collection_name(),  # 'progress' o 'progress_ts' (fitness/timeseries.py)
+        'indexes': [
+            ('user_id', '-date', '-id'),  # student_dashboard / progress_list
+            'routine_id',
+            'date',
+            'created_at',                 # export_fitness: ventana por hora de escritura
+        ] + ([] if timeseries_enabled() else [
+            {
+                # Reintentos de progress_bulk: la misma clave no se inserta dos veces.
+                # Las colecciones time-series no admiten índices únicos (ver fitness/ingest.py).
+                'fields': ('user_id', 'idempotency_key'),
+                'unique': True,
+                'partialFilterExpression': {'idempotency_key': {'$exists': True}},
+            },
+        ]),
+        'index_background': True,
         'db_alias': 'fitness',
     }
 
@@ -62,11 +245,62 @@ class Recommendation(Document):
     message = StringField(required=True)
     related_progress_id = StringField()       # ID de Progress
     related_routine_id = StringField()        # ID de Routine
+    job_id = StringField()                    # RecommendationJob que la envió (envíos masivos)
     created_at = DateTimeField(default=datetime.utcnow)
 
+    def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        result = super().save(*args, **kwargs)
+        if is_new:
+            from fitness import inbox, notifications
+            inbox.recommendations_created([self])
+            notifications.recommendations_sent([self])
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from fitness import inbox
+        inbox.recommendation_deleted(self)
+        return result
+
     meta = {
         'collection': 'recommendations',
-        'indexes': ['trainer_id', 'user_id', 'created_at'],
+        'indexes': [
+            ('trainer_id', 'user_id', '-created_at'),  # vistas del entrenador
+            ('user_id', '-created_at'),                # recomendaciones recibidas
+            'created_at',                              # export_fitness: ventana por hora de escritura
+            {'fields': ('job_id', 'user_id'), 'sparse': True},  # reanudar envíos masivos
+        ],
+        'index_background': True,
+        'db_alias': 'fitness',
+    }
+
+class RecommendationJob(Document):
+    """
+    Envío masivo de una recomendación a muchos usuarios, entregado en segundo
+    plano por lotes (ver fitness/fanout.py).
+    """
+    trainer_id = StringField(required=True)
+    message = StringField(required=True)
+    related_routine_id = StringField()
+    targets = DictField()                     # {"user_ids": [...], "nrc": ..., "campus": ..., "faculty": ...}
+    user_ids = ListField(StringField())       # destinatarios resueltos, en orden de entrega
+    status = StringField(choices=("pending", "running", "done", "failed"), default="pending")
+    total = IntField(default=0)
+    delivered = IntField(default=0)           # destinatarios ya procesados (posición en user_ids)
+    hooks_done = ListField(StringField())     # hooks ya aplicados al lote que empieza en `delivered`
+    error = StringField()
+    created_at = DateTimeField(default=datetime.utcnow)
+    started_at = DateTimeField()
+    finished_at = DateTimeField()
+
+    meta = {
+        'collection': 'recommendation_jobs',
+        'indexes': [
+            ('trainer_id', '-created_at'),
+            'status',
+        ],
+        'index_background': True,
         'db_alias': 'fitness',
     }
 
@@ -75,10 +309,213 @@ class FollowUp(Document):
     user_id = StringField(required=True)      # ID user (PostgreSQL)
     progress_id = StringField(required=False) # Progress ID (MongoDB)
     comment = StringField()                   # Comentarios del instructor
+    status = StringField(choices=("open", "closed"), default="open")
+    closed_at = DateTimeField()
     created_at = DateTimeField(default=datetime.utcnow)
 
+    def save(self, *args, **kwargs):
+        is_new = self.pk is None
+        result = super().save(*args, **kwargs)
+        if is_new:
+            from fitness import inbox, notifications
+            inbox.followup_created(self)
+            notifications.followup_created(self)
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        from fitness import inbox
+        inbox.followup_deleted(self)
+        return result
+
+    def close(self):
+        """Marca el seguimiento como atendido; devuelve False si ya lo estaba."""
+        from fitness import inbox
+        return inbox.close_followup(self)
+
     meta = {
         'collection': 'followups',
-        'indexes': ['trainer_id', 'user_id', 'created_at'],
+        'indexes': [
+            ('trainer_id', 'status', '-created_at', '-id'),  # bandeja: seguimientos abiertos
+            ('trainer_id', 'user_id', '-created_at'),  # vistas del entrenador
+            ('user_id', '-created_at'),
+            'created_at',
+        ],
+        'index_background': True,
+        'db_alias': 'fitness',
+    }
+
+class UserActivitySummary(Document):
+    """
+    Resumen de actividad por usuario, mantenido al insertar/borrar Progress
+    (ver fitness/activity.py). Permite leer rachas y conteos sin recorrer
+    el historial.
+    """
+    user_id = StringField(primary_key=True)       # ID user (PostgreSQL)
+    total_workouts = IntField(default=0)
+    total_duration = FloatField(default=0)
+    current_streak = IntField(default=0)          # racha que termina en last_workout_date
+    longest_streak = IntField(default=0)
+    streak_start = DateTimeField()                # primer día de la racha actual
+    last_workout_date = DateTimeField()           # día (00:00 UTC) del último entrenamiento
+    weekly_counts = DictField()                   # {"2026-W42": 3}, últimas semanas
+    updated_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'user_activity_summaries',
+        'db_alias': 'fitness',
+    }
+
+class ProgressRollup(Document):
+    """
+    Agregado de Progress por usuario y día o semana ISO, mantenido al escribir
+    (ver fitness/rollups.py). Los reportes leen estos documentos en lugar del
+    historial crudo.
+    """
+    id = StringField(primary_key=True)            # "<user_id>|<period>|<key>"
+    user_id = StringField(required=True)
+    period = StringField(choices=("day", "week"), required=True)
+    key = StringField(required=True)              # "2026-10-18" o "2026-W42"
+    start = DateTimeField(required=True)          # inicio del día / lunes de la semana
+    workouts = IntField(default=0)
+    routine_workouts = IntField(default=0)        # registros asociados a una rutina
+    total_duration = FloatField(default=0)        # segundos
+    effort_sum = IntField(default=0)
+    effort_count = IntField(default=0)
+    type_counts = DictField()                     # {"cardio": 3, "fuerza": 1}
+
+    meta = {
+        'collection': 'progress_rollups',
+        'indexes': [
+            ('user_id', 'period', 'start'),
+        ],
+        'index_background': True,
+        'db_alias': 'fitness',
+    }
+
+
+class ActiveUserSketch(Document):
+    """
+    HyperLogLog de usuarios activos por periodo y dimensión (ver
+    fitness/sketches.py). Solo guarda los registros no vacíos, como máximo
+    2^p campos, así que el tamaño es fijo sin importar cuántos usuarios haya.
+    """
+    id = StringField(primary_key=True)            # "<granularity>:<period>|<dimension>"
+    granularity = StringField(choices=("week", "month"), required=True)
+    period = StringField(required=True)           # "2026-W42" o "2026-10"
+    dimension = StringField(required=True)        # "all", "role:STUDENT", "campus:1", "faculty:3"
+    registers = DictField()                       # {"<índice>": rho}
+    updated_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'active_user_sketches',
+        'indexes': [
+            ('granularity', 'dimension', 'period'),
+        ],
+        'index_background': True,
         'db_alias': 'fitness',
-    }
\ No newline at end of file
+    }
+
+
+class Counter(Document):
+    """
+    Contadores agregados por clave ("platform", "user:<id>"), mantenidos al
+    escribir (ver fitness/counters.py) y corregidos por reconcile_counters.
+    """
+    id = StringField(primary_key=True)
+    values = DictField()                          # {"users": 1200, "routines": 530}
+    updated_at = DateTimeField(default=datetime.utcnow)
+    reconciled_at = DateTimeField()
+
+    meta = {
+        'collection': 'counters',
+        'db_alias': 'fitness',
+    }
+
+
+class TrainerInboxEntry(Document):
+    """
+    Una fila de la bandeja del entrenador por cada usuario que atiende:
+    seguimientos abiertos, última recomendación y último progreso del
+    usuario, mantenidos al escribir (ver fitness/inbox.py).
+    """
+    trainer_id = StringField(required=True)   # ID instructor (PostgreSQL)
+    user_id = StringField(required=True)      # ID user (PostgreSQL)
+    open_followups = IntField(default=0)
+    recommendations = IntField(default=0)
+    last_recommendation = DictField()         # {"id", "message", "created_at"}
+    last_progress_at = DateTimeField()
+    updated_at = DateTimeField(default=datetime.utcnow)  # última actividad, orden de la bandeja
+    created_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'trainer_inbox',
+        'indexes': [
+            {'fields': ('trainer_id', 'user_id'), 'unique': True},
+            ('trainer_id', '-updated_at', '-id'),  # trainer_dashboard paginado
+            'user_id',                             # progreso nuevo de un usuario
+        ],
+        'index_background': True,
+        'db_alias': 'fitness',
+    }
+
+
+class Notification(Document):
+    """
+    Elemento del feed de un usuario, escrito al generarse (fan-out on write).
+    El feed de cada usuario se recorta a FITNESS_FEED_MAX_ITEMS (ver
+    fitness/notifications.py).
+    """
+    user_id = StringField(required=True)      # ID user (PostgreSQL)
+    kind = StringField(choices=("recommendation", "followup", "template", "announcement"), required=True)
+    title = StringField(required=True)
+    message = StringField()
+    link = StringField()
+    source_id = StringField()                 # ID del documento que la generó
+    read = BooleanField(default=False)
+    created_at = DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        'collection': 'notifications',
+        'indexes': [
+            ('user_id', '-created_at', '-id'),  # feed paginado y recorte
+            {'fields': ('user_id', 'read'), 'partialFilterExpression': {'read': False}},
+        ],
+        'index_background': True,
+        'db_alias': 'fitness',
+    }
+
+class NotificationState(Document):
+    """Contadores del feed de un usuario: elementos guardados y no leídos."""
+    user_id = StringField(primary_key=True)
+    count = IntField(default=0)
+    unread = IntField(default=0)
+    announcements_seen_at = DateTimeField()   # anuncios posteriores cuentan como no leídos
+
+    meta = {
+        'collection': 'notification_states',
+        'db_alias': 'fitness',
+    }
+
+class Announcement(Document):
+    """
+    Aviso para una audiencia grande ("all", "role:STUDENT", "campus:1",
+    "faculty:3", o "template:<id>" para los adoptantes enlazados de una
+    plantilla). No se copia a cada usuario: se lee al armar el feed.
+    """
+    audience = StringField(required=True)
+    title = StringField(required=True)
+    message = StringField()
+    link = StringField()
+    created_by = StringField()
+    created_at = DateTimeField(default=datetime.utcnow)
+    expires_at = DateTimeField()
+
+    meta = {
+        'collection': 'announcements',
+        'indexes': [
+            ('audience', '-created_at', '-id'),
+        ],
+        'index_background': True,
+        'db_alias': 'fitness',
+    }
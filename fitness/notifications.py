@@ -0,0 +1,248 @@
+"""
+Feed de notificaciones por usuario.
+
+Modelo híbrido:
+- Push: recomendaciones y seguimientos se copian al feed de cada
+  destinatario al escribirse (insert_many + un $inc por usuario en
+  NotificationState). Leer el feed es una consulta indexada por usuario.
+- Pull: los anuncios a audiencias grandes (todo un campus, un rol, los
+  adoptantes de una plantilla) se guardan una sola vez en Announcement y se
+  mezclan al leer, filtrando por las dimensiones del usuario y por las
+  plantillas que tiene adoptadas. Un aviso a 20.000 estudiantes es un
+  documento, y editar una plantilla no escribe nada por adoptante.
+
+El feed se recorta a FITNESS_FEED_MAX_ITEMS por usuario; para no recortar en
+cada escritura, se espera a pasarse por FEED_TRIM_SLACK elementos.
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+from django.conf import settings
+from django.urls import reverse
+from pymongo import UpdateOne
+
+from fitness import adoption
+from fitness.models import Announcement, Notification, NotificationState
+from fitness.pagination import Page, decode_cursor, encode_cursor
+from fitness.sketches import user_dimensions
+
+FEED_TRIM_SLACK = 20
+
+
+def max_items():
+    return getattr(settings, "FITNESS_FEED_MAX_ITEMS", 100)
+
+
+# ===== push =====
+
+def push(items):
+    """
+    `items` son dicts con user_id, kind, title y opcionalmente message, link,
+    source_id y created_at. Una escritura para las notificaciones y otra para
+    los contadores, sin importar cuántos usuarios haya.
+    """
+    now = datetime.utcnow()
+    docs = []
+    per_user = {}
+    for item in items:
+        doc = {
+            "_id": ObjectId(),
+            "user_id": item["user_id"],
+            "kind": item["kind"],
+            "title": item["title"],
+            "message": item.get("message"),
+            "link": item.get("link"),
+            "source_id": item.get("source_id"),
+            "read": False,
+            "created_at": item.get("created_at") or now,
+        }
+        docs.append(doc)
+        per_user[doc["user_id"]] = per_user.get(doc["user_id"], 0) + 1
+    if not docs:
+        return
+
+    Notification._get_collection().insert_many(docs, ordered=False)
+    states = NotificationState._get_collection()
+    states.bulk_write([
+        UpdateOne({"_id": user_id}, {"$inc": {"count": count, "unread": count}}, upsert=True)
+        for user_id, count in per_user.items()
+    ], ordered=False)
+
+    limit = max_items()
+    overflowing = states.find(
+        {"_id": {"$in": list(per_user)}, "count": {"$gt": limit + FEED_TRIM_SLACK}}, {"_id": 1})
+    for state in overflowing:
+        trim(state["_id"], limit)
+
+
+def trim(user_id, limit=None):
+    """Elimina lo que exceda los `limit` elementos más recientes del usuario."""
+    limit = max_items() if limit is None else limit
+    collection = Notification._get_collection()
+    boundary = next(
+        collection.find({"user_id": user_id}, {"created_at": 1})
+        .sort([("created_at", -1), ("_id", -1)]).skip(limit).limit(1),
+        None,
+    )
+    if boundary is None:
+        return 0
+
+    older = {
+        "user_id": user_id,
+        "$or": [
+            {"created_at": {"$lt": boundary["created_at"]}},
+            {"created_at": boundary["created_at"], "_id": {"$lte": boundary["_id"]}},
+        ],
+    }
+    unread = collection.count_documents({**older, "read": False})
+    deleted = collection.delete_many(older).deleted_count
+    NotificationState._get_collection().update_one(
+        {"_id": user_id}, {"$inc": {"count": -deleted, "unread": -unread}})
+    return deleted
+
+
+def recommendations_sent(recommendations):
+    push(
+        {
+            "user_id": r.user_id,
+            "kind": "recommendation",
+            "title": "Nueva recomendación de tu entrenador",
+            "message": r.message,
+            "source_id": str(r.id),
+            "created_at": r.created_at,
+        }
+        for r in recommendations
+    )
+
+
+def followup_created(followup):
+    push([{
+        "user_id": followup.user_id,
+        "kind": "followup",
+        "title": "Tu entrenador comentó tu progreso",
+        "message": followup.comment,
+        "link": reverse("progress_list"),
+        "source_id": str(followup.id),
+    }])
+
+
+def template_audience(template_id):
+    return f"template:{template_id}"
+
+
+def template_updated(template):
+    """Un anuncio para los adoptantes enlazados, sin importar cuántos sean."""
+    return announce(
+        template_audience(template.id),
+        f"La plantilla «{template.name}» fue actualizada",
+        link=reverse("routine_detail", args=[str(template.id)]),
+        created_by=template.created_by,
+    )
+
+
+def announce(audience, title, message="", created_by=None, expires_at=None, link=None):
+    announcement = Announcement(audience=audience, title=title, message=message, link=link,
+                                created_by=created_by, expires_at=expires_at)
+    announcement.save()
+    return announcement
+
+
+# ===== lecturas =====
+
+def _announcements_query(user_id, now):
+    """
+    Anuncios vigentes para el usuario: los de sus dimensiones ("all", rol,
+    campus, facultad) y los de las plantillas que tiene adoptadas y
+    enlazadas, estos solo desde la fecha de adopción.
+    """
+    audiences = [{"audience": {"$in": user_dimensions([user_id])[user_id]}}]
+    for template_id, adopted_at in adoption.linked_templates(user_id).items():
+        audience = {"audience": template_audience(template_id)}
+        if adopted_at:
+            audience["created_at"] = {"$gt": adopted_at}
+        audiences.append(audience)
+    return {"$and": [
+        {"$or": audiences},
+        {"$or": [{"expires_at": None}, {"expires_at": {"$gt": now}}]},
+    ]}
+
+
+def _announcement_kind(doc):
+    return "template" if doc.get("audience", "").startswith("template:") else "announcement"
+
+
+def _keyset(after):
+    if after is None or not ObjectId.is_valid(after[1]):
+        return {}
+    value, last_id = after[0], ObjectId(after[1])
+    return {"$or": [{"created_at": {"$lt": value}}, {"created_at": value, "_id": {"$lt": last_id}}]}
+
+
+def _as_item(doc, kind=None, read=None):
+    return {
+        "id": str(doc["_id"]),
+        "kind": kind or doc.get("kind"),
+        "title": doc.get("title"),
+        "message": doc.get("message"),
+        "link": doc.get("link"),
+        "read": doc.get("read", False) if read is None else read,
+        "date": doc["created_at"],
+        "_key": (doc["created_at"], doc["_id"]),
+    }
+
+
+def feed_page(user_id, cursor=None, page_size=20, now=None):
+    """
+    Página del feed mezclando notificaciones propias y anuncios de las
+    audiencias del usuario, ordenada por (fecha, id) descendente. Cada fuente
+    aporta como mucho `page_size + 1` documentos.
+    """
+    now = now or datetime.utcnow()
+    after = _keyset(decode_cursor(cursor))
+    sort = [("created_at", -1), ("_id", -1)]
+
+    state = NotificationState._get_collection().find_one({"_id": user_id}) or {}
+    seen_at = state.get("announcements_seen_at")
+
+    own = Notification._get_collection().find({"user_id": user_id, **after}).sort(sort).limit(page_size + 1)
+    query = _announcements_query(user_id, now)
+    if after:
+        query["$and"].append(after)
+    announcements = Announcement._get_collection().find(query).sort(sort).limit(page_size + 1)
+
+    items = [_as_item(doc) for doc in own]
+    items += [
+        _as_item(doc, kind=_announcement_kind(doc), read=seen_at is not None and doc["created_at"] <= seen_at)
+        for doc in announcements
+    ]
+    items.sort(key=lambda item: item["_key"], reverse=True)
+
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(*items[-1]["_key"])
+    for item in items:
+        del item["_key"]
+    return Page(items, next_cursor)
+
+
+def unread_count(user_id, now=None):
+    """No leídas propias (contador) más anuncios posteriores a la última lectura."""
+    now = now or datetime.utcnow()
+    state = NotificationState._get_collection().find_one({"_id": user_id}) or {}
+    query = _announcements_query(user_id, now)
+    if state.get("announcements_seen_at"):
+        query["$and"].append({"created_at": {"$gt": state["announcements_seen_at"]}})
+    return state.get("unread", 0) + Announcement._get_collection().count_documents(query, limit=max_items())
+
+
+def mark_all_read(user_id, now=None):
+    now = now or datetime.utcnow()
+    result = Notification._get_collection().update_many({"user_id": user_id, "read": False}, {"$set": {"read": True}})
+    # $inc en lugar de unread=0: lo que llegue mientras tanto sigue contando
+    NotificationState._get_collection().update_one(
+        {"_id": user_id},
+        {"$inc": {"unread": -result.modified_count}, "$set": {"announcements_seen_at": now}},
+        upsert=True,
+    )
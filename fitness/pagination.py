@@ -0,0 +1,120 @@
+"""
+Paginación por cursor (keyset) para los listados de fitness.
+
+En lugar de skip/limit, cada página pide los documentos que vienen después
+de la última clave vista, p. ej. (created_at, _id). El costo de una página no
+depende de cuántas páginas haya antes. El cursor que viaja en la URL es
+opaco: base64 de la clave de ordenamiento.
+"""
+
+import base64
+import bisect
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from django.conf import settings
+from mongoengine.queryset.visitor import Q
+
+MAX_PAGE_SIZE = 100
+
+
+class Page:
+    def __init__(self, items, next_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def encode_cursor(value, id_value):
+    if isinstance(value, datetime):
+        payload = {"t": "dt", "v": value.isoformat()}
+    else:
+        payload = {"t": "s", "v": value}
+    payload["id"] = str(id_value)
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Devuelve (valor, id) o None si el cursor no es válido."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        value = payload["v"]
+        if payload.get("t") == "dt":
+            value = datetime.fromisoformat(value)
+        return value, payload["id"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def get_page_size(request):
+    default = getattr(settings, "FITNESS_PAGE_SIZE", 20)
+    try:
+        size = int(request.GET.get("page_size", default))
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def paginate_queryset(queryset, field, cursor=None, page_size=20, descending=True):
+    """
+    Página de un QuerySet de MongoEngine ordenado por (field, id).
+
+    Necesita un índice que termine en (field, _id) para no ordenar en memoria.
+    """
+    after = decode_cursor(cursor)
+    if after is not None and ObjectId.is_valid(after[1]):
+        value, last_id = after[0], ObjectId(after[1])
+        op = "lt" if descending else "gt"
+        queryset = queryset.filter(
+            Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{op}": last_id})
+        )
+
+    sign = "-" if descending else "+"
+    items = list(queryset.order_by(f"{sign}{field}", f"{sign}id").limit(page_size + 1))
+
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.id)
+    return Page(items, next_cursor)
+
+
+def paginate_sorted(records, field, cursor=None, page_size=20):
+    """
+    Página de una lista en memoria ya ordenada ascendentemente por (field, "id"),
+    como las del catálogo de ejercicios.
+    """
+    def key(record):
+        return (record[field] or "", record["id"])
+
+    start = 0
+    after = decode_cursor(cursor)
+    if after is not None:
+        try:
+            start = bisect.bisect_right(records, (after[0] or "", after[1]), key=key)
+        except TypeError:
+            start = 0  # cursor con un valor de otro tipo (alterado o de otro listado)
+
+    items = records[start:start + page_size]
+    next_cursor = None
+    if start + page_size < len(records):
+        next_cursor = encode_cursor(items[-1][field], items[-1]["id"])
+    return Page(items, next_cursor)
@@ -0,0 +1,53 @@
+"""
+Punto único por el que pasan las escrituras de Progress.
+
+Progress.save()/delete() (y las inserciones masivas) llaman a estas
+funciones; cada estructura derivada que se mantiene al escribir se engancha
+aquí.
+
+Cuando se llama, el Progress ya está guardado o borrado. Por eso un hook que
+falla no corta a los demás ni hace fallar el request: si lo hiciera, el
+cliente reintentaría y duplicaría el registro. El error se registra y la
+diferencia la corrige el comando de su estructura (rebuild_activity_summaries,
+backfill_progress_rollups, rebuild_active_user_sketches, reconcile_counters,
+rebuild_trainer_inbox).
+"""
+
+import logging
+
+from fitness import activity, counters, inbox, rollups, sketches
+
+logger = logging.getLogger(__name__)
+
+
+def _run(hooks, entries):
+    for hook in hooks:
+        try:
+            hook(entries)
+        except Exception as e:
+            logger.warning("Falló %s.%s para %d registros de progreso: %s",
+                           hook.__module__, hook.__name__, len(entries), e)
+
+
+def progress_created(entries):
+    """`entries` son documentos Progress ya insertados."""
+    if not entries:
+        return
+    _run((
+        activity.record_created,
+        rollups.record_created,
+        sketches.record_created,
+        counters.progress_created,
+        inbox.progress_created,
+    ), entries)
+
+
+def progress_deleted(entries):
+    """`entries` son documentos Progress ya eliminados."""
+    if not entries:
+        return
+    _run((
+        activity.record_deleted,
+        rollups.record_deleted,
+        counters.progress_deleted,
+    ), entries)
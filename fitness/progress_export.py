@@ -0,0 +1,181 @@
+"""
+Exportación CSV de Progress para administradores, en streaming.
+
+Las filas se generan a medida que llegan de MongoDB (cursor con proyección y
+lotes de BATCH_SIZE) y se unen con los datos del usuario en PostgreSQL por
+bloques de ids: una consulta `values_list` por bloque, sin instancias de
+modelo. Nada crece con el tamaño de la exportación salvo un caché acotado
+de usuarios, así que la memoria se mantiene plana y la cabecera sale antes
+de la primera consulta.
+
+Sin filtro de campus/facultad/rol se recorre el rango de fechas por el
+índice `date`. Con filtro, primero se obtienen los usuarios que cumplen (en
+bloques, con un iterador del servidor) y se consulta el progreso de cada
+bloque con el índice (user_id, date).
+"""
+
+import csv
+import io
+from collections import OrderedDict
+
+from django.db.models import Q
+
+from accounts.models import STUDENT_FACULTY, User
+from fitness.models import Progress
+
+BATCH_SIZE = 2000         # documentos por lote del cursor y filas por escritura
+USER_CHUNK_SIZE = 2000    # ids por consulta a PostgreSQL
+USER_CACHE_SIZE = 20000
+
+HEADER = [
+    "progress_id", "user_id", "role", "campus", "faculty", "date",
+    "routine_id", "exercise_id", "repetitions", "duration", "effort_level",
+]
+PROJECTION = {"user_id": 1, "date": 1, "routine_id": 1, "exercise_id": 1,
+              "repetitions": 1, "duration": 1, "effort_level": 1}
+USER_FIELDS = ("username", "role", "student__campus_id", "employee__campus_id", "employee__faculty_id")
+
+
+def _user_row(values):
+    username, role, student_campus, employee_campus, faculty = values
+    return username, (role, student_campus or employee_campus, faculty)
+
+
+class UserMetadata:
+    """(rol, campus, facultad) por username, consultados por bloques y con caché LRU acotado."""
+
+    def __init__(self, max_size=USER_CACHE_SIZE):
+        self.max_size = max_size
+        self._cache = OrderedDict()
+
+    def add(self, rows):
+        for username, metadata in rows:
+            self._cache[username] = metadata
+            self._cache.move_to_end(username)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def load(self, user_ids):
+        missing = list({user_id for user_id in user_ids if user_id not in self._cache})
+        for start in range(0, len(missing), USER_CHUNK_SIZE):
+            chunk = missing[start:start + USER_CHUNK_SIZE]
+            found = dict(_user_row(values) for values in
+                         User.objects.filter(pk__in=chunk).values_list(*USER_FIELDS))
+            self.add((user_id, found.get(user_id, (None, None, None))) for user_id in chunk)
+
+    def get(self, user_id):
+        return self._cache.get(user_id, (None, None, None))
+
+
+def user_filter(campus=None, faculty=None, role=None):
+    """Q sobre User; la facultad de un estudiante es la de los grupos en que está inscrito."""
+    query = Q()
+    if role:
+        query &= Q(role=role)
+    if campus is not None:
+        query &= Q(student__campus_id=campus) | Q(employee__campus_id=campus)
+    if faculty is not None:
+        query &= (
+            Q(employee__faculty_id=faculty)
+            | Q(**{STUDENT_FACULTY: faculty})
+        )
+    return query
+
+
+def _date_query(date_from, date_to):
+    query = {}
+    if date_from:
+        query["$gte"] = date_from
+    if date_to:
+        query["$lt"] = date_to
+    return {"date": query} if query else {}
+
+
+def _format(doc, metadata):
+    role, campus, faculty = metadata
+    date = doc.get("date")
+    return [
+        str(doc["_id"]), doc.get("user_id"), role, campus, faculty,
+        date.isoformat() if date else "",
+        doc.get("routine_id"), doc.get("exercise_id"),
+        doc.get("repetitions"), doc.get("duration"), doc.get("effort_level"),
+    ]
+
+
+class _Buffer:
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def _batches(cursor):
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _all_users_rows(date_from, date_to):
+    metadata = UserMetadata()
+    cursor = (
+        Progress._get_collection()
+        .find(_date_query(date_from, date_to), PROJECTION)
+        .sort([("date", 1)])
+        .batch_size(BATCH_SIZE)
+    )
+    try:
+        for batch in _batches(cursor):
+            metadata.load(doc.get("user_id") for doc in batch)
+            yield [_format(doc, metadata.get(doc.get("user_id"))) for doc in batch]
+    finally:
+        cursor.close()
+
+
+def _filtered_rows(date_from, date_to, users):
+    collection = Progress._get_collection()
+    usernames = users.values_list(*USER_FIELDS).distinct().order_by("username")
+    chunk = []
+    for values in usernames.iterator(chunk_size=USER_CHUNK_SIZE):
+        chunk.append(_user_row(values))
+        if len(chunk) >= USER_CHUNK_SIZE:
+            yield from _chunk_rows(collection, chunk, date_from, date_to)
+            chunk = []
+    if chunk:
+        yield from _chunk_rows(collection, chunk, date_from, date_to)
+
+
+def _chunk_rows(collection, chunk, date_from, date_to):
+    metadata = dict(chunk)
+    query = {"user_id": {"$in": list(metadata)}, **_date_query(date_from, date_to)}
+    cursor = collection.find(query, PROJECTION).sort([("user_id", 1), ("date", -1)]).batch_size(BATCH_SIZE)
+    try:
+        for batch in _batches(cursor):
+            yield [_format(doc, metadata[doc["user_id"]]) for doc in batch]
+    finally:
+        cursor.close()
+
+
+def stream_csv(date_from=None, date_to=None, campus=None, faculty=None, role=None):
+    """Genera el CSV por pedazos: la cabecera primero y luego un pedazo por lote."""
+    out = _Buffer()
+    yield out.write_rows([HEADER])
+
+    if campus is None and faculty is None and not role:
+        batches = _all_users_rows(date_from, date_to)
+    else:
+        users = User.objects.filter(user_filter(campus, faculty, role))
+        batches = _filtered_rows(date_from, date_to, users)
+
+    for rows in batches:
+        yield out.write_rows(rows)
@@ -0,0 +1,130 @@
+"""
+Agregados de progreso por (usuario, día) y (usuario, semana ISO).
+
+Cada escritura de Progress suma (o resta, al borrar) sobre dos documentos de
+ProgressRollup con un bulk_write de $inc. Los reportes leen un número acotado
+de estos documentos para cualquier rango de fechas: semanas completas desde
+los agregados semanales y los bordes desde los diarios, sin importar cuántos
+registros crudos tenga el usuario.
+"""
+
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+from fitness.activity import day_of, week_key
+from fitness.catalog import catalog
+from fitness.models import ProgressRollup
+
+ONE_DAY = timedelta(days=1)
+ONE_WEEK = timedelta(weeks=1)
+
+
+def monday_of(day):
+    return day_of(day) - timedelta(days=day.weekday())
+
+
+def rollup_id(user_id, period, key):
+    return f"{user_id}|{period}|{key}"
+
+
+def _values(entry):
+    """Campos de un Progress, ya sea documento MongoEngine o dict crudo de pymongo."""
+    if isinstance(entry, dict):
+        get = entry.get
+    else:
+        def get(name):
+            return getattr(entry, name, None)
+    return {
+        "user_id": get("user_id"),
+        "when": get("date") or get("created_at") or datetime.utcnow(),
+        "duration": get("duration") or 0,
+        "effort_level": get("effort_level"),
+        "exercise_id": get("exercise_id"),
+        "routine_id": get("routine_id"),
+    }
+
+
+def rollup_operations(entries, sign=1):
+    """Operaciones $inc (upsert) sobre los rollups diarios y semanales de `entries`."""
+    values = [_values(entry) for entry in entries]
+    types = catalog.get_many({v["exercise_id"] for v in values if v["exercise_id"]})
+
+    increments = {}  # _id -> (set_on_insert, inc)
+    for v in values:
+        day = day_of(v["when"])
+        monday = monday_of(day)
+        inc = {
+            "workouts": sign,
+            "routine_workouts": sign if v["routine_id"] else 0,
+            "total_duration": sign * v["duration"],
+            "effort_sum": sign * (v["effort_level"] or 0),
+            "effort_count": sign if v["effort_level"] else 0,
+        }
+        exercise = types.get(str(v["exercise_id"])) if v["exercise_id"] else None
+        if exercise and exercise["type"]:
+            inc[f"type_counts.{exercise['type']}"] = sign
+
+        for period, key, start in (("day", day.strftime("%Y-%m-%d"), day), ("week", week_key(day), monday)):
+            _id = rollup_id(v["user_id"], period, key)
+            if _id not in increments:
+                increments[_id] = ({"user_id": v["user_id"], "period": period, "key": key, "start": start}, {})
+            totals = increments[_id][1]
+            for field, amount in inc.items():
+                totals[field] = totals.get(field, 0) + amount
+
+    return [
+        UpdateOne({"_id": _id}, {"$setOnInsert": on_insert, "$inc": inc}, upsert=True)
+        for _id, (on_insert, inc) in increments.items()
+    ]
+
+
+def apply(entries, sign=1):
+    operations = rollup_operations(entries, sign)
+    if operations:
+        ProgressRollup._get_collection().bulk_write(operations, ordered=False)
+
+
+def record_created(entries):
+    apply(entries, 1)
+
+
+def record_deleted(entries):
+    apply(entries, -1)
+
+
+# ===== lecturas =====
+
+def range_rollups(user_id, start, end):
+    """
+    Rollups que cubren exactamente [start, end): semanas completas del rango y
+    días sueltos en los bordes. Como máximo ~(semanas + 12) documentos.
+    """
+    start, end = day_of(start), day_of(end)
+    first_monday = monday_of(start)
+    if first_monday < start:
+        first_monday += ONE_WEEK
+    last_monday = monday_of(end)
+
+    clauses = []
+    if first_monday < last_monday:
+        clauses.append({"period": "week", "start": {"$gte": first_monday, "$lt": last_monday}})
+        clauses.append({"period": "day", "start": {"$gte": start, "$lt": first_monday}})
+        clauses.append({"period": "day", "start": {"$gte": last_monday, "$lt": end}})
+    else:
+        clauses.append({"period": "day", "start": {"$gte": start, "$lt": end}})
+
+    collection = ProgressRollup._get_collection()
+    return list(collection.find({"user_id": user_id, "$or": clauses}).sort("start", 1))
+
+
+def summarize(rollups):
+    total = {"workouts": 0, "routine_workouts": 0, "total_duration": 0.0,
+             "effort_sum": 0, "effort_count": 0, "type_counts": {}}
+    for doc in rollups:
+        for field in ("workouts", "routine_workouts", "total_duration", "effort_sum", "effort_count"):
+            total[field] += doc.get(field, 0)
+        for exercise_type, count in doc.get("type_counts", {}).items():
+            total["type_counts"][exercise_type] = total["type_counts"].get(exercise_type, 0) + count
+    total["avg_effort"] = total["effort_sum"] / total["effort_count"] if total["effort_count"] else 0
+    return total
@@ -0,0 +1,114 @@
+"""
+Ingesta de la lista de ejercicios de una rutina.
+
+Todas las entradas (formulario HTML de routine_create / routine_edit o
+cualquier endpoint JSON) pasan por aquí: se parsean las filas una sola vez,
+se resuelven todos los ejercicios con una única consulta `$in` y los IDs
+inválidos o inexistentes se reportan juntos.
+"""
+
+from bson import ObjectId
+
+from fitness.catalog import catalog
+from fitness.models import Exercise, ExerciseSnapshot, RoutineExercise
+
+# Mínimos por campo, los mismos que los `min` de los inputs del formulario
+MIN_VALUES = {"sets": 1, "reps": 1, "rest": 0}
+FIELD_LABELS = {"sets": "series", "reps": "repeticiones", "rest": "descanso"}
+
+
+def parse_exercise_rows(data, prefix="exercises["):
+    """
+    Reconstruye las filas enviadas desde inputs como:
+    exercises[1][exercise_id]
+    exercises[1][sets]
+    exercises[1][reps]
+    exercises[1][rest]
+
+    Devuelve una lista de dicts ordenada por el índice de la fila.
+    """
+    parsed = {}  # {"1": {"exercise_id": "...", "sets": "..."}}
+
+    for key in data:
+        if not key.startswith(prefix):
+            continue
+        try:
+            # "exercises[3][reps]" -> row="3", field="reps"
+            row = key.split("[")[1].split("]")[0]
+            field = key.split("[")[2].split("]")[0]
+        except IndexError:
+            continue
+        parsed.setdefault(row, {})[field] = data.get(key)
+
+    def row_order(row_id):
+        return (0, int(row_id), "") if row_id.isdigit() else (1, 0, row_id)
+
+    return [parsed[row_id] for row_id in sorted(parsed, key=row_order)]
+
+
+def _to_int(value):
+    if value in (None, ""):
+        return None
+    return int(value)
+
+
+def resolve_exercise_rows(rows):
+    """
+    Convierte filas {"exercise_id", "sets", "reps", "rest"} en RoutineExercise.
+
+    Los ejercicios se resuelven contra el catálogo en memoria y, si faltan,
+    con una sola consulta sin importar cuántas filas tenga la rutina.
+    Devuelve (routine_exercises, errors); si hay errores la lista de
+    ejercicios no debe guardarse.
+    """
+    errors = []
+    entries = []
+
+    for position, fields in enumerate(rows, start=1):
+        exercise_id = (fields.get("exercise_id") or "").strip()
+        if not exercise_id:
+            continue  # ignorar filas vacías
+
+        if not ObjectId.is_valid(exercise_id):
+            errors.append(f"Ejercicio {position}: ID inválido '{exercise_id}'.")
+            continue
+
+        try:
+            numbers = {name: _to_int(fields.get(name)) for name in ("sets", "reps", "rest")}
+        except (TypeError, ValueError):
+            errors.append(f"Ejercicio {position}: series, repeticiones y descanso deben ser números enteros.")
+            continue
+
+        too_small = [
+            f"{FIELD_LABELS[name]} debe ser al menos {minimum}"
+            for name, minimum in MIN_VALUES.items()
+            if numbers[name] is not None and numbers[name] < minimum
+        ]
+        if too_small:
+            errors.append(f"Ejercicio {position}: {', '.join(too_small)}.")
+            continue
+
+        entries.append((position, ObjectId(exercise_id), numbers))
+
+    if not entries:
+        return [], errors
+
+    wanted = {str(oid) for _, oid, _ in entries}
+    found = catalog.get_many(wanted)
+
+    missing = sorted(wanted - found.keys())
+    if missing:
+        errors.append("Ejercicios no encontrados: " + ", ".join(missing) + ".")
+
+    if errors:
+        return [], errors
+
+    routine_exercises = [
+        RoutineExercise(
+            exercise=oid,
+            snapshot=ExerciseSnapshot(**{f: found[str(oid)][f] for f in Exercise.SNAPSHOT_FIELDS}),
+            **numbers,
+        )
+        for _, oid, numbers in entries
+    ]
+    return routine_exercises, errors
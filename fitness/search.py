@@ -0,0 +1,96 @@
+"""
+Búsqueda de ejercicios.
+
+Dos modos:
+- "prefix" (autocompletar): compara el inicio de `search_name`, el nombre en
+  minúsculas y sin tildes. Con el catálogo en memoria es una bisección sobre
+  la lista ordenada; si no, un regex anclado (^...) que MongoDB resuelve con
+  los índices (search_name, _id) y (type|difficulty, search_name, _id).
+- "text": índice de texto en español sobre name (peso 10) y description
+  (peso 2), ordenado por relevancia. Los índices de texto v3 ya ignoran
+  tildes y mayúsculas.
+
+Ambos devuelven páginas pequeñas con cursor.
+"""
+
+import re
+
+from bson import ObjectId
+
+from fitness.catalog import RECORD_FIELDS, _record, catalog
+from fitness.models import Exercise, normalize_search as normalize
+from fitness.pagination import Page, decode_cursor, encode_cursor, paginate_queryset
+
+MODES = ("prefix", "text")
+MAX_QUERY_LENGTH = 100
+
+
+def search_exercises(query, type=None, difficulty=None, cursor=None, page_size=10, mode="prefix"):
+    query = (query or "")[:MAX_QUERY_LENGTH]
+    if mode == "text" and query.strip():
+        return _text_page(query, type, difficulty, cursor, page_size)
+    prefix = normalize(query)
+    page = catalog.prefix_page(prefix, type=type, difficulty=difficulty, cursor=cursor, page_size=page_size)
+    if page is None:
+        page = _prefix_page_mongo(prefix, type, difficulty, cursor, page_size)
+    return page
+
+
+def _prefix_page_mongo(prefix, type, difficulty, cursor, page_size):
+    queryset = Exercise.objects()
+    if type:
+        queryset = queryset.filter(type=type)
+    if difficulty:
+        queryset = queryset.filter(difficulty=difficulty)
+    if prefix:
+        queryset = queryset.filter(__raw__={"search_name": {"$regex": "^" + re.escape(prefix)}})
+    queryset = queryset.only(*RECORD_FIELDS)
+    page = paginate_queryset(queryset, "search_name", cursor, page_size, descending=False)
+    return Page([_record(doc.to_mongo()) for doc in page], page.next_cursor)
+
+
+def _text_page(query, type, difficulty, cursor, page_size):
+    """Resultados por relevancia; el cursor es (score, _id)."""
+    match = {"$text": {"$search": query, "$language": "spanish"}}
+    if type:
+        match["type"] = type
+    if difficulty:
+        match["difficulty"] = difficulty
+
+    pipeline = [
+        {"$match": match},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+    ]
+    after = decode_cursor(cursor)
+    if after is not None and ObjectId.is_valid(after[1]):
+        try:
+            score = float(after[0])
+        except (TypeError, ValueError):
+            score = None  # cursor alterado o de otro modo: primera página
+        if score is not None:
+            pipeline.append({"$match": {"$or": [
+                {"score": {"$lt": score}},
+                {"score": score, "_id": {"$gt": ObjectId(after[1])}},
+            ]}})
+    pipeline += [
+        {"$sort": {"score": -1, "_id": 1}},
+        {"$limit": page_size + 1},
+        {"$project": {**{field: 1 for field in RECORD_FIELDS}, "score": 1}},
+    ]
+
+    docs = list(Exercise._get_collection().aggregate(pipeline))
+    next_cursor = None
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        next_cursor = encode_cursor(repr(docs[-1]["score"]), docs[-1]["_id"])
+    return Page([_record(doc) for doc in docs], next_cursor)
+
+
+def as_json(record):
+    return {
+        "id": record["id"],
+        "name": record["name"],
+        "type": record["type"],
+        "difficulty": record["difficulty"],
+        "duration": record["duration"],
+    }
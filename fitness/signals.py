@@ -0,0 +1,52 @@
+"""
+Receptores de señales de accounts.User que mantienen fitness/counters.py.
+
+Un fallo de MongoDB no debe impedir crear o borrar usuarios: se registra y
+reconcile_counters corrige la diferencia.
+"""
+
+import logging
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from fitness import counters
+
+logger = logging.getLogger(__name__)
+
+COUNTED_FIELDS = {"role", "employee", "employee_id"}
+
+
+@receiver(pre_save, sender=User)
+def remember_counted_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Los guardados de login (update_fields=['last_login']) no cambian los contadores
+    if raw or instance._state.adding or (update_fields is not None and not COUNTED_FIELDS & set(update_fields)):
+        return
+    previous = User.objects.select_related("employee").filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._counter_fields_before = counters.user_fields(previous)
+
+
+@receiver(post_save, sender=User)
+def count_saved_user(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        before = set()
+    elif hasattr(instance, "_counter_fields_before"):
+        before = instance.__dict__.pop("_counter_fields_before")
+    else:
+        return
+    try:
+        counters.user_changed(before, counters.user_fields(instance))
+    except Exception as e:
+        logger.warning("No se pudieron actualizar los contadores del usuario %s: %s", instance.pk, e)
+
+
+@receiver(post_delete, sender=User)
+def count_deleted_user(sender, instance, **kwargs):
+    try:
+        counters.user_changed(counters.user_fields(instance), set())
+    except Exception as e:
+        logger.warning("No se pudieron actualizar los contadores del usuario %s: %s", instance.pk, e)
@@ -0,0 +1,218 @@
+"""
+Usuarios activos estimados con HyperLogLog.
+
+Se mantiene un sketch por (semana ISO o mes, dimensión), donde la dimensión
+es "all", el rol, el campus o la facultad del usuario. Cada escritura de
+Progress aplica `$max` sobre un solo registro de cada sketch afectado, así que
+la actualización es atómica y no hay que releer nada. Los sketches se unen
+tomando el máximo por registro: semestre = unión de meses, varios campus =
+unión de sus sketches, sin tocar los datos crudos. Con P = 12 cada sketch
+tiene como máximo 4096 registros y un error típico de ~1.6 %.
+"""
+
+import hashlib
+import math
+from collections import OrderedDict
+from datetime import datetime
+
+from pymongo import ReplaceOne, UpdateOne
+
+from accounts.models import STUDENT_FACULTY, User
+from fitness.models import ActiveUserSketch
+
+P = 12
+M = 1 << P
+HASH_BITS = 64
+GRANULARITIES = ("week", "month")
+
+_dimension_cache = OrderedDict()  # user_id -> dimensiones, LRU acotado
+DIMENSION_CACHE_SIZE = 10000
+
+
+# ===== HyperLogLog =====
+
+def register_for(user_id):
+    """(índice, rho) del registro que `user_id` actualiza."""
+    digest = hashlib.blake2b(str(user_id).encode(), digest_size=8).digest()
+    value = int.from_bytes(digest, "big")
+    index = value >> (HASH_BITS - P)
+    remainder = value & ((1 << (HASH_BITS - P)) - 1)
+    rho = (HASH_BITS - P) - remainder.bit_length() + 1
+    return index, rho
+
+
+def merge(*register_maps):
+    merged = {}
+    for registers in register_maps:
+        for index, rho in registers.items():
+            if rho > merged.get(index, 0):
+                merged[index] = rho
+    return merged
+
+
+def estimate(registers):
+    alpha = 0.7213 / (1 + 1.079 / M)
+    zeros = M - len(registers)
+    total = zeros + sum(2.0 ** -rho for rho in registers.values())
+    raw = alpha * M * M / total
+    if raw <= 2.5 * M and zeros:
+        return round(M * math.log(M / zeros))  # corrección para rangos pequeños
+    return round(raw)
+
+
+# ===== periodos y dimensiones =====
+
+def period_key(granularity, when):
+    if granularity == "week":
+        year, week, _ = when.isocalendar()
+        return f"{year}-W{week:02d}"
+    return f"{when.year}-{when.month:02d}"
+
+
+def sketch_id(granularity, period, dimension):
+    return f"{granularity}:{period}|{dimension}"
+
+
+def user_dimensions(user_ids):
+    """
+    {user_id: ["all", "role:...", "campus:...", "faculty:..."]}. La facultad
+    de un empleado es la suya; la de un estudiante, la de cada programa en el
+    que tiene grupos inscritos (STUDENT_FACULTY, la misma regla que los envíos
+    masivos y la exportación de progreso). Dos consultas SQL en total.
+    """
+    result = {}
+    missing = []
+    for user_id in set(user_ids):
+        if user_id in _dimension_cache:
+            _dimension_cache.move_to_end(user_id)
+            result[user_id] = _dimension_cache[user_id]
+        else:
+            missing.append(user_id)
+
+    if missing:
+        users = User.objects.select_related("student", "employee").filter(pk__in=missing)
+        student_faculties = {}
+        rows = (
+            User.objects.filter(pk__in=missing, **{f"{STUDENT_FACULTY}__isnull": False})
+            .values_list("pk", STUDENT_FACULTY).distinct()
+        )
+        for user_id, faculty_id in rows:
+            student_faculties.setdefault(user_id, []).append(faculty_id)
+
+        for user in users:
+            dimensions = ["all", f"role:{user.role}"]
+            if user.student_id:
+                dimensions.append(f"campus:{user.student.campus_id}")
+                dimensions.extend(f"faculty:{faculty_id}" for faculty_id in sorted(student_faculties.get(user.pk, [])))
+            elif user.employee_id:
+                dimensions.append(f"campus:{user.employee.campus_id}")
+                dimensions.append(f"faculty:{user.employee.faculty_id}")
+            result[user.pk] = dimensions
+        for user_id in missing:
+            result.setdefault(user_id, ["all"])  # sin fila en PostgreSQL
+            _dimension_cache[user_id] = result[user_id]
+        while len(_dimension_cache) > DIMENSION_CACHE_SIZE:
+            _dimension_cache.popitem(last=False)
+    return result
+
+
+def _entry_values(entry):
+    if isinstance(entry, dict):
+        return entry.get("user_id"), entry.get("date") or entry.get("created_at")
+    return entry.user_id, entry.date or entry.created_at
+
+
+def sketch_registers(entries):
+    """{sketch_id: (granularity, period, dimension, {índice: rho})} para `entries`."""
+    values = [_entry_values(entry) for entry in entries]
+    dimensions = user_dimensions(user_id for user_id, _ in values)
+
+    sketches = {}
+    for user_id, when in values:
+        when = when or datetime.utcnow()
+        index, rho = register_for(user_id)
+        for granularity in GRANULARITIES:
+            period = period_key(granularity, when)
+            for dimension in dimensions[user_id]:
+                _id = sketch_id(granularity, period, dimension)
+                if _id not in sketches:
+                    sketches[_id] = (granularity, period, dimension, {})
+                registers = sketches[_id][3]
+                key = str(index)
+                if rho > registers.get(key, 0):
+                    registers[key] = rho
+    return sketches
+
+
+# ===== escrituras =====
+
+def record_created(entries):
+    """Borrar progreso no resta usuarios: los sketches solo crecen (se corrigen con el rebuild)."""
+    now = datetime.utcnow()
+    operations = [
+        UpdateOne(
+            {"_id": _id},
+            {
+                "$setOnInsert": {"granularity": granularity, "period": period, "dimension": dimension},
+                "$max": {f"registers.{index}": rho for index, rho in registers.items()},
+                "$set": {"updated_at": now},
+            },
+            upsert=True,
+        )
+        for _id, (granularity, period, dimension, registers) in sketch_registers(entries).items()
+    ]
+    if operations:
+        ActiveUserSketch._get_collection().bulk_write(operations, ordered=False)
+
+
+def replace_sketches(sketches):
+    """Reescribe sketches completos (rebuild desde el historial)."""
+    now = datetime.utcnow()
+    operations = [
+        ReplaceOne(
+            {"_id": _id},
+            {"granularity": granularity, "period": period, "dimension": dimension,
+             "registers": registers, "updated_at": now},
+            upsert=True,
+        )
+        for _id, (granularity, period, dimension, registers) in sketches.items()
+    ]
+    if operations:
+        ActiveUserSketch._get_collection().bulk_write(operations, ordered=False)
+
+
+# ===== lecturas =====
+
+def load(granularity, periods, dimensions):
+    """{(period, dimension): registros} con una sola consulta."""
+    ids = [sketch_id(granularity, p, d) for p in periods for d in dimensions]
+    docs = ActiveUserSketch._get_collection().find({"_id": {"$in": ids}})
+    return {(doc["period"], doc["dimension"]): doc.get("registers", {}) for doc in docs}
+
+
+def active_users(granularity, periods, dimensions=("all",)):
+    """Usuarios distintos en la unión de los periodos y dimensiones dados."""
+    loaded = load(granularity, periods, dimensions)
+    return estimate(merge(*loaded.values()))
+
+
+def recent_months(now, count):
+    """Claves "YYYY-MM" de los últimos `count` meses, del más antiguo al actual."""
+    year, month = now.year, now.month
+    months = []
+    for _ in range(count):
+        months.append(f"{year}-{month:02d}")
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return months[::-1]
+
+
+def semester_months(now):
+    """Meses del semestre académico en curso (enero-junio o julio-diciembre)."""
+    first = 1 if now.month <= 6 else 7
+    return [f"{now.year}-{month:02d}" for month in range(first, now.month + 1)]
+
+
+def monthly_series(months, dimension="all"):
+    """[estimación por mes] para `months`, con una sola consulta."""
+    loaded = load("month", months, [dimension])
+    return [estimate(loaded.get((month, dimension), {})) for month in months]
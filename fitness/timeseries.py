@@ -0,0 +1,45 @@
+"""
+Modo opcional en el que Progress vive en una colección time-series de MongoDB.
+
+Con FITNESS_PROGRESS_TIMESERIES activo el documento Progress apunta a
+`progress_ts`, creada con `date` como timeField y `user_id` como metaField;
+casi todas las lecturas son "registros de este usuario en esta ventana de
+tiempo", que es justo el patrón que estas colecciones agrupan en buckets.
+El resto del código no cambia: todo pasa por Progress._get_collection().
+
+Requiere MongoDB 7.0+ para borrar/actualizar registros por _id. La colección
+debe crearse antes de la primera escritura (si no, MongoDB crea una colección
+normal): Progress._get_collection() la crea en el primer uso del proceso, y
+FitnessConfig.warm_up() (solo wsgi/asgi) y migrate_progress_timeseries lo
+hacen por adelantado.
+"""
+
+from django.conf import settings
+from pymongo.errors import CollectionInvalid
+
+PLAIN_COLLECTION = "progress"
+TIMESERIES_COLLECTION = "progress_ts"
+TIMESERIES_OPTIONS = {
+    "timeField": "date",
+    "metaField": "user_id",
+    "granularity": "hours",
+}
+
+
+def timeseries_enabled():
+    return getattr(settings, "FITNESS_PROGRESS_TIMESERIES", False)
+
+
+def progress_collection_name():
+    return TIMESERIES_COLLECTION if timeseries_enabled() else PLAIN_COLLECTION
+
+
+def ensure_timeseries_collection(db, name=TIMESERIES_COLLECTION, options=None):
+    """Crea la colección time-series si no existe. Devuelve True si la creó."""
+    if name in db.list_collection_names(filter={"name": name}):
+        return False
+    try:
+        db.create_collection(name, timeseries=options or TIMESERIES_OPTIONS)
+    except CollectionInvalid:  # otro proceso la creó entre la consulta y el create
+        return False
+    return True
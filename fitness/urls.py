@@ -4,32 +4,46 @@ from . import views
 urlpatterns = [
     # Dashboard
     path('dashboard/', views.student_dashboard, name='student_dashboard'),
+
+    # Notificaciones
+    path('notifications/', views.notifications_list, name='notifications_list'),
+    path('notifications/read/', views.notifications_mark_read, name='notifications_mark_read'),
     
     # Rutinas
     path('routines/', views.routines_list, name='routines_list'),
     path('routines/create/', views.routine_create, name='routine_create'),
     path('routines/<str:routine_id>/', views.routine_detail, name='routine_detail'),
     path('routines/<str:routine_id>/edit/', views.routine_edit, name='routine_edit'),  # ← FALTABA
+    path('routines/<str:routine_id>/adopt/', views.routine_adopt, name='routine_adopt'),
     
     # Ejercicios
     path('exercises/', views.exercises_list, name='exercises_list'),
     path('exercises/create/', views.exercise_create, name='exercise_create'),
+    path('exercises/search/', views.exercise_search, name='exercise_search'),
     path('exercises/<str:exercise_id>/', views.exercise_detail, name='exercise_detail'),
     path('exercises/<str:exercise_id>/edit/', views.exercise_edit, name='exercise_edit'),
     
     # Progreso
     path('progress/', views.progress_list, name='progress_list'),
     path('progress/create/', views.progress_create, name='progress_create'),
+    path('progress/bulk/', views.progress_bulk, name='progress_bulk'),
     
     # Reportes
     path('reports/', views.reports, name='reports'),
     
     # Entrenadores
     path('trainer/', views.trainer_dashboard, name='trainer_dashboard'),
+    path('trainer/users/<str:user_id>/', views.trainer_user_progress, name='trainer_user_progress'),
+    path('trainer/users/<str:user_id>/recommend/', views.trainer_send_recommendation, name='trainer_send_recommendation'),
+    path('trainer/progress/<str:progress_id>/followup/', views.trainer_add_followup, name='trainer_add_followup'),
+    path('trainer/followups/<str:followup_id>/close/', views.trainer_close_followup, name='trainer_close_followup'),
+    path('trainer/recommendations/fanout/', views.trainer_recommendation_fanout, name='trainer_recommendation_fanout'),
+    path('trainer/recommendations/jobs/<str:job_id>/', views.trainer_recommendation_job, name='trainer_recommendation_job'),
     
     # Administración
     path('admin/', views.admin_dashboard, name='admin_dashboard'),
     path('admin/trainers/', views.trainer_management, name='trainer_management'),
     path('admin/reports/', views.admin_reports, name='admin_reports'),
+    path('admin/progress/export/', views.admin_progress_export, name='admin_progress_export'),
 ]
 
@@ -1,10 +1,30 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
 from django.utils import timezone
-
-from fitness.forms import ExerciseForm, RoutineForm
-from fitness.models import Exercise, Routine, RoutineExercise, Progress  # MongoEngine models
+import json
+from datetime import datetime, timedelta
+
+from accounts.models import User
+from locations.models import Campus, Faculty
+from fitness import (
+    adoption, analytics, counters, fanout, inbox, notifications, progress_export, rollups, search, sketches,
+)
+from fitness.catalog import catalog
+from fitness.dashboard import student_dashboard_data
+from fitness.forms import ExerciseForm, FollowUpForm, RecommendationForm, RoutineForm
+from fitness.ingest import IngestError, ingest_progress
+from fitness.loaders import get_loaders
+from fitness.models import (  # MongoEngine models
+    Exercise, FollowUp, Progress, Recommendation, RecommendationJob, Routine, UserActivitySummary,
+)
+from fitness.pagination import get_page_size, paginate_queryset
+from fitness.routine_payload import parse_exercise_rows
+
+MONTH_LABELS = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
 
 # Importar modelos (descomentar cuando estén disponibles)
 # from fitness.models import Exercise, Routine, Progress
@@ -14,40 +34,72 @@ def student_dashboard(request):
     user_id = str(request.user.username)
 
     context = {
-        'total_routines': Routine.objects(user_id=user_id).count(),
-        'total_progress': Progress.objects(user_id=user_id).count(),
-        'weekly_workouts': 0,
-        'current_streak': 0,
-        'recent_routines': Routine.objects(user_id=user_id).order_by("-created_at")[:5],
-        'recent_progress': Progress.objects(user_id=user_id).order_by("-date")[:5],
-        'notifications': [
-            {
-                'title': 'Bienvenido a Universidad Fit',
-                'message': 'Comienza a crear tus rutinas y registra tu progreso',
-                'date': timezone.now()
-            }
-        ],
+        **student_dashboard_data(user_id),
+        'notifications': notifications.feed_page(user_id, page_size=5),
+        'unread_notifications': notifications.unread_count(user_id),
     }
 
     return render(request, "fitness/student_dashboard.html", context)
 
 
+@login_required
+def notifications_list(request):
+    """Feed de notificaciones del usuario"""
+    user_id = str(request.user.username)
+    page = notifications.feed_page(user_id, cursor=request.GET.get("cursor"), page_size=get_page_size(request))
+
+    context = {
+        'notifications': page,
+        'page': page,
+        'unread_notifications': notifications.unread_count(user_id),
+    }
+
+    return render(request, 'fitness/notifications.html', context)
+
+
+@login_required
+@require_POST
+def notifications_mark_read(request):
+    """Marcar todas las notificaciones como leídas"""
+    notifications.mark_all_read(str(request.user.username))
+    return redirect('notifications_list')
+
+
 @login_required
 def routines_list(request):
     user_id = str(request.user.username)
+    routine_filter = request.GET.get("type", "")
+    search = request.GET.get("q", "").strip()
 
     # Mostrar rutinas propias + plantillas
-    routines = Routine.objects.filter(
-        __raw__={
-            "$or": [
-                {"created_by": user_id},
-                {"is_template": True}
-            ]
-        }
-    ).order_by("-created_at")
+    if routine_filter == "my":
+        routines = Routine.objects(created_by=user_id, is_template__ne=True)
+    elif routine_filter == "templates":
+        routines = Routine.objects(is_template=True)
+    else:
+        routines = Routine.objects.filter(
+            __raw__={
+                "$or": [
+                    {"created_by": user_id},
+                    {"is_template": True}
+                ]
+            }
+        )
+    if search:
+        routines = routines.filter(name__icontains=search)
+
+    page = paginate_queryset(
+        routines, "created_at",
+        cursor=request.GET.get("cursor"),
+        page_size=get_page_size(request),
+    )
+    adoption.resolve(page)
 
     return render(request, "fitness/routines_list.html", {
-        "routines": routines
+        "routines": page,
+        "page": page,
+        "search": search,
+        "routine_filter": routine_filter,
     })
 
 @login_required
@@ -56,58 +108,93 @@ def routine_detail(request, routine_id):
     if not routine:
         messages.error(request, "La rutina no existe.")
         return redirect("routines_list")
+    adoption.resolve([routine])  # también asigna template_name
 
     return render(request, "fitness/routine_detail.html", {
-        "routine": routine
+        "routine": routine,
+        "linked": adoption.is_linked(routine),
     })
 
+
+@login_required
+@require_POST
+def routine_adopt(request, routine_id):
+    template = Routine.objects(id=routine_id, is_template=True).first()
+    if not template:
+        messages.error(request, "La plantilla no existe.")
+        return redirect("routines_list")
+
+    routine, created = adoption.adopt(template, str(request.user.username))
+    if created:
+        messages.success(request, f"Adoptaste la rutina «{template.name}».")
+    else:
+        messages.info(request, "Ya habías adoptado esta plantilla.")
+    return redirect("routine_detail", routine_id=routine.id)
+
+def _exercise_rows(routine):
+    """Filas iniciales del formulario de rutina, sin desreferenciar ejercicios."""
+    adoption.resolve([routine])
+    items = [(item, adoption.exercise_id(item)) for item in routine.effective_exercises]
+    records = catalog.get_many(exercise_id for item, exercise_id in items if item.snapshot is None)
+
+    rows = []
+    for item, exercise_id in items:
+        summary = item.snapshot or records.get(exercise_id) or {}
+        rows.append({
+            "exercise_id": exercise_id,
+            "name": summary.get("name") if isinstance(summary, dict) else summary.name,
+            "type": summary.get("type") if isinstance(summary, dict) else summary.type,
+            "sets": item.sets,
+            "reps": item.reps,
+            "rest": item.rest,
+        })
+    return rows
+
+
+def _submitted_rows(data):
+    """Filas tal como llegaron en un POST inválido, para no perderlas al volver a mostrar el formulario."""
+    rows = [fields for fields in parse_exercise_rows(data) if (fields.get("exercise_id") or "").strip()]
+    records = catalog.get_many(fields["exercise_id"].strip() for fields in rows)  # ignora IDs inválidos
+    submitted = []
+    for fields in rows:
+        exercise_id = fields["exercise_id"].strip()
+        record = records.get(exercise_id) or {}
+        submitted.append({
+            "exercise_id": exercise_id,
+            "name": record.get("name"),
+            "type": record.get("type"),
+            "sets": fields.get("sets"),
+            "reps": fields.get("reps"),
+            "rest": fields.get("rest"),
+        })
+    return submitted
+
+
 @login_required
 def routine_create(request):
     if request.method == "POST":
-        name = request.POST.get("name")
-        description = request.POST.get("description")
-        is_template = bool(request.POST.get("is_template"))
-
-        exercises_data = []
-        for key, value in request.POST.items():
-            # detect keys like exercises[1][exercise_id]
-            if key.startswith("exercises") and key.endswith("[exercise_id]"):
-                index = key.split("[")[1].split("]")[0]
-
-                exercise_id = value
-                sets = request.POST.get(f"exercises[{index}][sets]")
-                reps = request.POST.get(f"exercises[{index}][reps]")
-                rest = request.POST.get(f"exercises[{index}][rest]")
-
-                # Convert to Exercise object
-                exercise_obj = Exercise.objects(id=exercise_id).first()
-
-                exercises_data.append(
-                    RoutineExercise(
-                        exercise=exercise_obj,
-                        sets=int(sets) if sets else None,
-                        reps=int(reps) if reps else None,
-                        rest=int(rest) if rest else None,
-                    )
-                )
+        form = RoutineForm(request.POST)
 
-        routine = Routine(
-            name=name,
-            description=description,
-            exercises=exercises_data,
-            created_by=str(request.user.username),
-            is_template=is_template
-        )
-        routine.save()
-        return redirect("routines_list")
+        if form.is_valid():
+            routine = Routine(
+                name=form.cleaned_data["name"],
+                description=form.cleaned_data.get("description"),
+                exercises=form.cleaned_data["exercises"],
+                created_by=str(request.user.username),
+                is_template=form.cleaned_data.get("is_template", False),
+            )
+            routine.save()
+            return redirect("routines_list")
+
+        return render(request, "fitness/routine_form.html", {
+            "form": form,
+            "exercise_rows": _submitted_rows(request.POST),
+        })
 
     # GET
     return render(request, "fitness/routine_form.html", {
         "form": RoutineForm(),
-        "available_exercises": [
-            {"id": str(ex.id), "name": ex.name, "type": ex.type}
-            for ex in Exercise.objects()
-        ]
+        "exercise_rows": [],
     })
 
 @login_required
@@ -117,58 +204,79 @@ def routine_edit(request, routine_id):
         messages.error(request, "Rutina no encontrada.")
         return redirect("routines_list")
 
-    available_exercises = [
-        {"id": str(ex.id), "name": ex.name, "type": ex.type}
-        for ex in Exercise.objects()
-    ]
-
     if request.method == "POST":
-        routine.name = request.POST.get("name")
-        routine.description = request.POST.get("description")
-        routine.is_template = bool(request.POST.get("is_template"))
-
-        # Procesar ejercicios enviados en el formulario
-        updated_exercises = []
-
-        for key, value in request.POST.items():
-            if key.startswith("exercises") and key.endswith("[exercise_id]"):
-                idx = key.split("[")[1].split("]")[0]
-
-                exercise_id = value
-                sets = request.POST.get(f"exercises[{idx}][sets]")
-                reps = request.POST.get(f"exercises[{idx}][reps]")
-                rest = request.POST.get(f"exercises[{idx}][rest]")
-
-                # Buscar Exercise real
-                exercise_obj = Exercise.objects(id=exercise_id).first()
-
-                updated_exercises.append(
-                    RoutineExercise(
-                        exercise=exercise_obj,
-                        sets=int(sets) if sets else None,
-                        reps=int(reps) if reps else None,
-                        rest=int(rest) if rest else None,
-                    )
-                )
+        form = RoutineForm(request.POST)
+
+        if form.is_valid():
+            routine.name = form.cleaned_data["name"]
+            routine.description = form.cleaned_data.get("description")
+            routine.is_template = form.cleaned_data.get("is_template", False)
+            adoption.update_exercises(routine, form.cleaned_data["exercises"])
+            routine.save()
 
-        routine.exercises = updated_exercises
-        routine.save()
+            messages.success(request, "Rutina actualizada correctamente.")
+            return redirect("routine_detail", routine_id=routine.id)
 
-        messages.success(request, "Rutina actualizada correctamente.")
-        return redirect("routine_detail", routine_id=routine.id)
+        return render(request, "fitness/routine_form.html", {
+            "form": form,
+            "routine": routine,
+            "exercise_rows": _submitted_rows(request.POST),
+        })
 
     return render(request, "fitness/routine_form.html", {
         "routine": routine,
-        "available_exercises": available_exercises
+        "exercise_rows": _exercise_rows(routine),
     })
 
 
 @login_required
 def exercises_list(request):
-    exercises = Exercise.objects().order_by("name")
+    exercise_type = request.GET.get("type", "")
+    difficulty = request.GET.get("difficulty", "")
+    search = request.GET.get("q", "").strip()
+
+    page = catalog.page(
+        type=exercise_type or None,
+        difficulty=difficulty or None,
+        search=search or None,
+        cursor=request.GET.get("cursor"),
+        page_size=get_page_size(request),
+    )
 
     return render(request, 'fitness/exercises_list.html', {
-        'exercises': exercises
+        'exercises': page,
+        'page': page,
+        'search': search,
+        'exercise_type': exercise_type,
+        'difficulty': difficulty,
+    })
+
+
+@login_required
+def exercise_search(request):
+    """
+    API JSON para autocompletar ejercicios:
+    ?q=sent&type=fuerza&difficulty=media&mode=prefix|text&cursor=...
+    """
+    mode = request.GET.get("mode", "prefix")
+    if mode not in search.MODES:
+        return JsonResponse({"error": "Modo de búsqueda inválido."}, status=400)
+    try:
+        page_size = max(1, min(int(request.GET.get("page_size", 10)), 50))
+    except ValueError:
+        page_size = 10
+
+    page = search.search_exercises(
+        request.GET.get("q", ""),
+        type=request.GET.get("type") or None,
+        difficulty=request.GET.get("difficulty") or None,
+        cursor=request.GET.get("cursor"),
+        page_size=page_size,
+        mode=mode,
+    )
+    return JsonResponse({
+        "results": [search.as_json(record) for record in page],
+        "next_cursor": page.next_cursor,
     })
 
 
@@ -242,8 +350,30 @@ def exercise_edit(request, exercise_id):
 @login_required
 def progress_list(request):
     """Lista de progreso"""
+    user_id = str(request.user.username)
+    date_from = request.GET.get("date_from", "")
+    date_to = request.GET.get("date_to", "")
+
+    progress = Progress.objects(user_id=user_id)
+    try:
+        if date_from:
+            progress = progress.filter(date__gte=datetime.strptime(date_from, "%Y-%m-%d"))
+        if date_to:
+            progress = progress.filter(date__lt=datetime.strptime(date_to, "%Y-%m-%d") + timedelta(days=1))
+    except ValueError:
+        messages.error(request, "Rango de fechas inválido.")
+
+    page = paginate_queryset(
+        progress, "date",
+        cursor=request.GET.get("cursor"),
+        page_size=get_page_size(request),
+    )
+
     context = {
-        'progress_list': [],
+        'progress_list': page,
+        'page': page,
+        'date_from': date_from,
+        'date_to': date_to,
     }
     
     return render(request, 'fitness/progress_list.html', context)
@@ -264,40 +394,76 @@ def progress_create(request):
     return render(request, 'fitness/progress_form.html', context)
 
 
+@login_required
+@require_POST
+def progress_bulk(request):
+    """
+    Sincronización masiva de progreso en JSON:
+    {"entries": [{"idempotency_key": "...", "date": "...", "duration": 1800, ...}, ...]}
+    Devuelve el resultado de cada entrada en el mismo orden.
+    """
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "JSON inválido."}, status=400)
+
+    entries = payload.get("entries") if isinstance(payload, dict) else payload
+    try:
+        results = ingest_progress(str(request.user.username), entries)
+    except IngestError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    summary = {status: sum(1 for r in results if r["status"] == status)
+               for status in ("created", "duplicate", "error")}
+    return JsonResponse({"results": results, **summary})
+
+
 @login_required
 def reports(request):
     """Reportes para usuarios"""
     import json
-    
-    # Datos de ejemplo para los gráficos
-    weekly_data = {
-        'labels': ['Sem 1', 'Sem 2', 'Sem 3', 'Sem 4'],
-        'values': [3, 5, 4, 6]
-    }
-    
+
+    user_id = str(request.user.username)
+    now = datetime.utcnow()
+
+    # Últimas 8 semanas en un DataFrame (una consulta con proyección)
+    report = analytics.user_report(user_id, now, weeks=8)
+
+    weekly_data = {'labels': report['labels'], 'values': report['workouts']}
     exercise_type_data = {
         'labels': ['Cardio', 'Fuerza', 'Movilidad'],
-        'values': [10, 15, 5]
+        'values': [item['workouts'] for item in report['type_split']],
     }
-    
     effort_data = {
-        'labels': ['Sem 1', 'Sem 2', 'Sem 3', 'Sem 4'],
-        'values': [6.5, 7.0, 7.2, 7.5]
+        'labels': report['labels'],
+        'values': report['effort'],
+        'moving_average': report['effort_ma'],
     }
-    
+    volume_data = {'labels': report['labels'], 'values': report['volume']}
+
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    week_start = rollups.monday_of(now)
+    activity_summary = []
+    for period, start in (('Esta Semana', week_start), ('Este Mes', month_start)):
+        totals = rollups.summarize(rollups.range_rollups(user_id, start, now + timedelta(days=1)))
+        activity_summary.append({
+            'period': period,
+            'total_workouts': totals['workouts'],
+            'total_minutes': totals['total_duration'] / 60,
+            'avg_effort': totals['avg_effort'],
+            'routines_completed': totals['routine_workouts'],
+        })
+
     context = {
         'weekly_progress_data': json.dumps(weekly_data),
         'exercise_type_data': json.dumps(exercise_type_data),
         'effort_level_data': json.dumps(effort_data),
-        'activity_summary': [
-            {
-                'period': 'Este Mes',
-                'total_workouts': 20,
-                'total_minutes': 600,
-                'avg_effort': 7.5,
-                'routines_completed': 5
-            }
-        ],
+        'volume_data': json.dumps(volume_data),
+        'volume_trend': report['volume_trend'],
+        'week_over_week': report['week_over_week'],
+        'duration_percentiles': report['duration_percentiles'],
+        'type_split': report['type_split'],
+        'activity_summary': activity_summary,
     }
     
     return render(request, 'fitness/reports.html', context)
@@ -305,21 +471,231 @@ def reports(request):
 
 # ===== VISTAS PARA ENTRENADORES =====
 
+def _require_trainer(request):
+    if not counters.is_trainer(request.user):
+        messages.error(request, 'No tienes permisos para acceder a esta sección')
+        return redirect('student_dashboard')
+    return None
+
+
 @login_required
 def trainer_dashboard(request):
     """Dashboard para entrenadores"""
+    denied = _require_trainer(request)
+    if denied:
+        return denied
+
+    trainer_id = str(request.user.username)
+    totals = inbox.trainer_totals(trainer_id)
+    page = inbox.inbox_page(trainer_id, cursor=request.GET.get("cursor"), page_size=get_page_size(request))
+    open_followups = inbox.open_followups_page(trainer_id, page_size=5)
+
+    # Un solo SELECT para los usuarios de la bandeja y de los seguimientos
+    loaders = get_loaders(request)
+    loaders.users.want(entry.user_id for entry in page)
+    loaders.users.want(followup.user_id for followup in open_followups)
+    loaders.users.dispatch()
+    for followup in open_followups:
+        followup.user_data = loaders.users.user_data(followup.user_id)
+
+    # Métricas de las últimas 4 semanas de toda la página en un solo DataFrame
+    cohort = analytics.cohort_summary([entry.user_id for entry in page], datetime.utcnow(), weeks=4)
+
+    assigned_users_list = []
+    for entry in page:
+        data = loaders.users.user_data(entry.user_id)
+        data.update({
+            'metrics': cohort.get(entry.user_id),
+            'last_progress': entry.last_progress_at,
+            'open_followups': entry.open_followups,
+            'last_recommendation': entry.last_recommendation,
+        })
+        assigned_users_list.append(data)
+
     context = {
-        'assigned_users': 0,
-        'total_routines_created': 0,
-        'total_recommendations': 0,
-        'pending_followups': 0,
-        'assigned_users_list': [],
-        'trainer_routines': [],
+        'assigned_users': totals['assigned_users'],
+        'total_routines_created': totals['routines'],
+        'total_recommendations': totals['recommendations'],
+        'pending_followups': totals['open_followups'],
+        'assigned_users_list': assigned_users_list,
+        'page': page,
+        'open_followups': open_followups,
+        'trainer_routines': Routine.objects(created_by=trainer_id).order_by('-created_at', '-id').limit(6),
     }
     
     return render(request, 'fitness/trainer_dashboard.html', context)
 
 
+@login_required
+def trainer_user_progress(request, user_id):
+    """Ver progreso de un usuario asignado"""
+    denied = _require_trainer(request)
+    if denied:
+        return denied
+
+    loaders = get_loaders(request)
+    if loaders.users.get(user_id) is None:
+        raise Http404('Usuario no encontrado')
+    summary = UserActivitySummary.objects(user_id=user_id).first()
+    report = analytics.user_report(user_id, datetime.utcnow(), weeks=12)
+    page = paginate_queryset(
+        Progress.objects(user_id=user_id), "date",
+        cursor=request.GET.get("cursor"),
+        page_size=get_page_size(request),
+    )
+
+    loaders.annotate_progress(page)
+
+    context = {
+        'user_data': loaders.users.user_data(user_id),
+        'progress_summary': {
+            'total_workouts': summary.total_workouts if summary else 0,
+            'avg_effort': report['avg_effort'],
+            'total_duration': (summary.total_duration if summary else 0) / 60,
+            'last_workout': summary.last_workout_date if summary else None,
+        },
+        'report': report,
+        'progress_list': page,
+        'page': page,
+        'recommendations': Recommendation.objects(
+            trainer_id=str(request.user.username), user_id=user_id,
+        ).order_by('-created_at').limit(10),
+    }
+    
+    return render(request, 'fitness/trainer_user_progress.html', context)
+
+
+@login_required
+def trainer_send_recommendation(request, user_id):
+    """Enviar recomendación a un usuario"""
+    denied = _require_trainer(request)
+    if denied:
+        return denied
+
+    loaders = get_loaders(request)
+    if loaders.users.get(user_id) is None:
+        raise Http404('Usuario no encontrado')
+    trainer_id = str(request.user.username)
+
+    if request.method == 'POST':
+        form = RecommendationForm(request.POST)
+        if form.is_valid():
+            Recommendation(
+                trainer_id=trainer_id,
+                user_id=user_id,
+                message=form.cleaned_data['message'],
+                related_routine_id=form.cleaned_data['related_routine_id'] or None,
+                related_progress_id=form.cleaned_data['related_progress_id'] or None,
+            ).save()
+            messages.success(request, 'Recomendación enviada exitosamente')
+            return redirect('trainer_user_progress', user_id=user_id)
+    else:
+        form = RecommendationForm()
+
+    context = {
+        'form': form,
+        'user_data': loaders.users.user_data(user_id),
+        'available_routines': Routine.objects(created_by=trainer_id).order_by('-created_at', '-id').limit(50),
+        'user_progress': loaders.annotate_progress(
+            Progress.objects(user_id=user_id).order_by('-date', '-id').limit(20)
+        ),
+    }
+    
+    return render(request, 'fitness/recommendation_form.html', context)
+
+
+@login_required
+def trainer_add_followup(request, progress_id):
+    """Comentar un registro de progreso (abre un seguimiento)"""
+    denied = _require_trainer(request)
+    if denied:
+        return denied
+
+    progress = Progress.objects(id=progress_id).first()
+    if progress is None:
+        messages.error(request, 'Registro de progreso no encontrado')
+        return redirect('trainer_dashboard')
+
+    if request.method == 'POST':
+        form = FollowUpForm(request.POST)
+        if form.is_valid():
+            FollowUp(
+                trainer_id=str(request.user.username),
+                user_id=progress.user_id,
+                progress_id=str(progress.id),
+                comment=form.cleaned_data['comment'],
+            ).save()
+            messages.success(request, 'Seguimiento registrado exitosamente')
+            return redirect('trainer_user_progress', user_id=progress.user_id)
+    else:
+        form = FollowUpForm()
+
+    context = {
+        'form': form,
+        'progress': progress,
+    }
+    
+    return render(request, 'fitness/followup_form.html', context)
+
+
+@login_required
+@require_POST
+def trainer_close_followup(request, followup_id):
+    """Marcar un seguimiento como atendido"""
+    denied = _require_trainer(request)
+    if denied:
+        return denied
+
+    followup = FollowUp.objects(id=followup_id, trainer_id=str(request.user.username)).first()
+    if followup is None:
+        messages.error(request, 'Seguimiento no encontrado')
+    elif followup.close():
+        messages.success(request, 'Seguimiento marcado como atendido')
+    return redirect('trainer_dashboard')
+
+
+@login_required
+@require_POST
+def trainer_recommendation_fanout(request):
+    """
+    Envío masivo en JSON:
+    {"message": "...", "related_routine_id": "...", "targets": {"nrc": "1234"}}
+    Responde 202 con el trabajo; el avance se consulta en su status_url.
+    """
+    if not counters.is_trainer(request.user):
+        return JsonResponse({"error": "No tienes permisos para esta operación."}, status=403)
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "JSON inválido."}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({"error": "Se esperaba un objeto JSON."}, status=400)
+
+    try:
+        job = fanout.start_fanout(
+            str(request.user.username),
+            payload.get("message"),
+            payload.get("targets"),
+            related_routine_id=payload.get("related_routine_id"),
+        )
+    except fanout.FanoutError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        **fanout.job_status(job),
+        "status_url": reverse('trainer_recommendation_job', args=[str(job.id)]),
+    }, status=202)
+
+
+@login_required
+def trainer_recommendation_job(request, job_id):
+    """Avance de un envío masivo"""
+    job = RecommendationJob.objects(id=job_id, trainer_id=str(request.user.username)).first()
+    if job is None:
+        return JsonResponse({"error": "Trabajo no encontrado."}, status=404)
+    return JsonResponse(fanout.job_status(job))
+
+
 # ===== VISTAS PARA ADMINISTRACIÓN =====
 
 @login_required
@@ -329,11 +705,12 @@ def admin_dashboard(request):
         messages.error(request, 'No tienes permisos para acceder a esta sección')
         return redirect('student_dashboard')
     
+    totals = counters.platform_totals()
     context = {
-        'total_users': 0,
-        'total_trainers': 0,
-        'total_routines': 0,
-        'total_progress': 0,
+        'total_users': totals['users'],
+        'total_trainers': totals['trainers'],
+        'total_routines': totals['routines'],
+        'total_progress': totals['progress'],
     }
     
     return render(request, 'fitness/admin_dashboard.html', context)
@@ -346,8 +723,25 @@ def trainer_management(request):
         messages.error(request, 'No tienes permisos para acceder a esta sección')
         return redirect('student_dashboard')
     
+    users = list(
+        User.objects.select_related('employee')
+        .filter(role='EMPLOYEE', employee__employee_type_id=counters.TRAINER_EMPLOYEE_TYPE)
+        .order_by('username')
+    )
+    values = counters.read_many(counters.user_key(user.username) for user in users)
+    trainers = [
+        {
+            'user_id': user.username,
+            'username': user.username,
+            'full_name': str(user.employee),
+            'email': user.employee.email,
+            'routines_count': values[counters.user_key(user.username)].get('routines', 0),
+        }
+        for user in users
+    ]
+
     context = {
-        'trainers': [],
+        'trainers': trainers,
     }
     
     return render(request, 'fitness/trainer_management.html', context)
@@ -360,33 +754,90 @@ def admin_reports(request):
         messages.error(request, 'No tienes permisos para acceder a esta sección')
         return redirect('student_dashboard')
     
-    import json
-    
+    now = datetime.utcnow()
+    months = sketches.recent_months(now, 6)
+    monthly_active = sketches.monthly_series(months)
+
     platform_usage_data = {
-        'labels': ['Ene', 'Feb', 'Mar', 'Abr'],
+        'labels': [MONTH_LABELS[int(month[5:]) - 1] for month in months],
         'datasets': [{
             'label': 'Usuarios Activos',
-            'data': [100, 120, 150, 180],
+            'data': monthly_active,
             'backgroundColor': '#0066cc'
         }]
     }
-    
+
+    roles = ['STUDENT', 'EMPLOYEE', 'ADMIN']
+    by_role = sketches.load('month', [months[-1]], [f'role:{role}' for role in roles])
     user_activity_data = {
-        'labels': ['Estudiantes', 'Empleados', 'Entrenadores'],
+        'labels': ['Estudiantes', 'Empleados', 'Administradores'],
         'datasets': [{
-            'label': 'Actividad',
-            'data': [500, 200, 50],
+            'label': 'Usuarios activos este mes',
+            'data': [sketches.estimate(by_role.get((months[-1], f'role:{role}'), {})) for role in roles],
             'backgroundColor': ['#0066cc', '#00a86b', '#ff6b35']
         }]
     }
-    
+
+    current, previous = monthly_active[-1], monthly_active[-2]
+    totals = counters.platform_totals()
     context = {
+        'campuses': Campus.objects.order_by('name'),
+        'faculties': Faculty.objects.order_by('name'),
         'platform_usage_data': json.dumps(platform_usage_data),
         'user_activity_data': json.dumps(user_activity_data),
         'general_stats': [
-            {'metric': 'Usuarios Registrados', 'value': 1000, 'change': 5.2},
-            {'metric': 'Rutinas Creadas', 'value': 500, 'change': 10.5},
+            {'metric': 'Usuarios Registrados', 'value': totals['users'], 'change': 0},
+            {'metric': 'Rutinas Creadas', 'value': totals['routines'], 'change': 0},
+            {'metric': 'Usuarios Activos (mes)', 'value': current,
+             'change': round((current - previous) * 100 / previous, 1) if previous else 0},
+            {'metric': 'Usuarios Activos (semestre)',
+             'value': sketches.active_users('month', sketches.semester_months(now)), 'change': 0},
         ],
     }
-    
+
     return render(request, 'fitness/admin_reports.html', context)
+
+
+def _parse_day(value):
+    return datetime.strptime(value, '%Y-%m-%d') if value else None
+
+
+def _parse_code(value):
+    return int(value) if value not in (None, '') else None
+
+
+@login_required
+def admin_progress_export(request):
+    """
+    Descarga CSV de todo el progreso de un rango de fechas, opcionalmente
+    filtrado por campus, facultad o rol. Se genera en streaming.
+    """
+    if request.user.role != 'ADMIN':
+        messages.error(request, 'No tienes permisos para acceder a esta sección')
+        return redirect('student_dashboard')
+
+    try:
+        date_from = _parse_day(request.GET.get('date_from'))
+        date_to = _parse_day(request.GET.get('date_to'))
+        campus = _parse_code(request.GET.get('campus'))
+        faculty = _parse_code(request.GET.get('faculty'))
+    except ValueError:
+        messages.error(request, 'Filtros inválidos: use fechas YYYY-MM-DD y códigos numéricos.')
+        return redirect('admin_reports')
+    role = request.GET.get('role') or None
+    if role not in (None, 'STUDENT', 'EMPLOYEE', 'ADMIN'):
+        messages.error(request, 'Rol inválido.')
+        return redirect('admin_reports')
+
+    if date_to:
+        date_to += timedelta(days=1)  # la fecha final es inclusiva
+    filename = 'progreso_{}_{}.csv'.format(
+        request.GET.get('date_from') or 'inicio', request.GET.get('date_to') or 'hoy')
+
+    response = StreamingHttpResponse(
+        progress_export.stream_csv(date_from, date_to, campus=campus, faculty=faculty, role=role),
+        content_type='text/csv; charset=utf-8',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['X-Accel-Buffering'] = 'no'  # que nginx no acumule la respuesta
+    return response
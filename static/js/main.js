@@ -112,6 +112,43 @@ function setupSearch(inputId, targetSelector) {
     });
 }
 
+// Llena un <select> con resultados del servidor mientras se escribe en `input`.
+// `url` debe responder {"results": [{id, name, type}, ...]}.
+function setupRemoteSelect(input, select, url, delay = 250) {
+    let timer = null;
+    let lastQuery = null;
+
+    function load() {
+        const query = input.value.trim();
+        if (query === lastQuery) return;
+        lastQuery = query;
+
+        fetch(`${url}?q=${encodeURIComponent(query)}`, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json())
+            .then(data => {
+                if (query !== lastQuery) return;  // llegó tarde; hay una búsqueda más reciente
+                const selected = select.value;
+                const keep = selected ? select.querySelector(`option[value="${selected}"]`) : null;
+                select.innerHTML = '<option value="">Seleccionar ejercicio...</option>';
+                if (keep) select.appendChild(keep);
+                data.results.forEach(item => {
+                    if (item.id === selected) return;
+                    const option = document.createElement('option');
+                    option.value = item.id;
+                    option.textContent = `${item.name} (${item.type})`;
+                    select.appendChild(option);
+                });
+            })
+            .catch(() => showNotification('No se pudo buscar ejercicios', 'error'));
+    }
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(load, delay);
+    });
+    select.addEventListener('focus', load, { once: true });
+}
+
 // ===== Tabs =====
 function initTabs(containerSelector) {
     const container = document.querySelector(containerSelector);
@@ -207,7 +244,12 @@ function createProgressChart(canvasId, data) {
                 backgroundColor: 'rgba(0, 102, 204, 0.1)',
                 tension: 0.4,
                 fill: true
-            }]
+            }, ...(data.extraDatasets || []).map(dataset => ({
+                borderColor: '#ff9900',
+                tension: 0.4,
+                fill: false,
+                ...dataset
+            }))]
         },
         options: {
             responsive: true,
@@ -294,6 +336,7 @@ window.confirmDelete = confirmDelete;
 window.formatDate = formatDate;
 window.formatDateTime = formatDateTime;
 window.setupSearch = setupSearch;
+window.setupRemoteSelect = setupRemoteSelect;
 window.initTabs = initTabs;
 window.openModal = openModal;
 window.closeModal = closeModal;
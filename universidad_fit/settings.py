@@ -14,8 +14,10 @@ from mongoengine import connect
 from urllib.parse import quote_plus
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -126,6 +128,97 @@ connect(
     alias="fitness",
     host=MONGO_URL)
 
+# ===== CONFIGURACIÓN FITNESS =====
+# Caché en memoria del catálogo de ejercicios (ver fitness/catalog.py)
+FITNESS_CATALOG_MAX_ENTRIES = int(os.getenv('FITNESS_CATALOG_MAX_ENTRIES', 10000))
+FITNESS_CATALOG_CHECK_INTERVAL = float(os.getenv('FITNESS_CATALOG_CHECK_INTERVAL', 1.0))  # segundos
+FITNESS_CATALOG_WARMUP = True
+
+# Guardar Progress en una colección time-series (requiere MongoDB 7.0+).
+# Migrar los datos existentes con: python manage.py migrate_progress_timeseries
+FITNESS_PROGRESS_TIMESERIES = os.getenv('FITNESS_PROGRESS_TIMESERIES', '') == '1'
+
+# Tamaño de página por defecto de los listados paginados por cursor
+FITNESS_PAGE_SIZE = int(os.getenv('FITNESS_PAGE_SIZE', 20))
+
+# Envíos masivos de recomendaciones (ver fitness/fanout.py)
+FITNESS_FANOUT_WORKERS = int(os.getenv('FITNESS_FANOUT_WORKERS', 2))
+FITNESS_FANOUT_BATCH_SIZE = int(os.getenv('FITNESS_FANOUT_BATCH_SIZE', 500))
+
+# Máximo de notificaciones guardadas por usuario (ver fitness/notifications.py)
+FITNESS_FEED_MAX_ITEMS = int(os.getenv('FITNESS_FEED_MAX_ITEMS', 100))
+
+# Hash de contraseñas (ver accounts/hashers.py). Política: strong (1.000.000
+# iteraciones de PBKDF2), balanced (600.000) o fast (310.000);
+# PASSWORD_PBKDF2_ITERATIONS fija el costo a mano. Al cambiarla, cada login
+# correcto vuelve a hashear con el costo nuevo. Medir con: python manage.py bench_login
+PASSWORD_HASH_POLICIES = {
+    'strong': 1_000_000,
+    'balanced': 600_000,
+    'fast': 310_000,
+}
+PASSWORD_HASH_POLICY = os.getenv('PASSWORD_HASH_POLICY', 'strong')
+PASSWORD_PBKDF2_ITERATIONS = (int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 0))
+                              or PASSWORD_HASH_POLICIES[PASSWORD_HASH_POLICY])
+
+PASSWORD_HASHERS = [
+    'accounts.hashers.PolicyPBKDF2PasswordHasher',
+    'accounts.hashers.PolicyPBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# ===== SESIONES Y CACHÉ =====
+# SESSION_MODE=db: sesiones en django_session (una consulta por request autenticado).
+# SESSION_MODE=cache: caché con escritura a la base (ver core/sessions.py).
+# SESSION_CACHE_BACKEND elige el caché de sesiones: file (procesos de un
+# mismo host; en /dev/shm si existe, si no en el tmp del sistema), redis
+# (REDIS_URL, requiere el paquete redis) o locmem. Por defecto redis si hay
+# REDIS_URL, si no file. locmem es un caché por proceso: con varios workers
+# un logout solo limpia el del worker que lo atendió y los demás siguen
+# sirviendo la sesión, así que requiere SESSION_CACHE_SINGLE_PROCESS=1.
+# Medir con: python manage.py bench_sessions
+SESSION_MODE = os.getenv('SESSION_MODE', 'db')
+REDIS_URL = os.getenv('REDIS_URL')
+SESSION_CACHE_BACKEND = os.getenv('SESSION_CACHE_BACKEND', 'redis' if REDIS_URL else 'file')
+SESSION_CACHE_SINGLE_PROCESS = os.getenv('SESSION_CACHE_SINGLE_PROCESS', '') == '1'
+SESSION_CACHE_LOCATION = os.getenv('SESSION_CACHE_LOCATION') or (
+    '/dev/shm/universidad_fit_sessions' if os.path.isdir('/dev/shm')
+    else os.path.join(tempfile.gettempdir(), 'universidad_fit_sessions'))
+SESSION_CLEANUP_INTERVAL = int(os.getenv('SESSION_CLEANUP_INTERVAL', 3600))  # segundos; 0 desactiva
+
+_SESSION_CACHES = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': SESSION_CACHE_LOCATION,
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL or 'redis://127.0.0.1:6379/0',
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': _SESSION_CACHES[SESSION_CACHE_BACKEND],
+}
+
+if SESSION_MODE == 'cache':
+    if SESSION_CACHE_BACKEND == 'locmem' and not SESSION_CACHE_SINGLE_PROCESS:
+        raise ImproperlyConfigured(
+            "SESSION_MODE=cache con SESSION_CACHE_BACKEND=locmem solo es válido con un único proceso "
+            "(SESSION_CACHE_SINGLE_PROCESS=1); use file o redis.")
+    SESSION_ENGINE = 'core.sessions'
+    SESSION_CACHE_ALIAS = 'sessions'
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'universidad_fit.settings')
 
 application = get_wsgi_application()
+
+# Precarga de MongoDB solo en el proceso web (ver FitnessConfig.warm_up)
+from django.apps import apps  # noqa: E402
+
+apps.get_app_config('fitness').warm_up()